@@ -0,0 +1,136 @@
+"""
+Benchmark the due index backends against the original full tick scan.
+
+Simulates interval jobs (1s up to --max-interval) over a window of virtual
+time, one tick per second, and reschedules every job that fires. No real
+sleeping is involved, so the numbers are pure bookkeeping cost per tick.
+
+    python benchmarks/bench_due_index.py --jobs 10000 100000 1000000 --ticks 60
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+if str(project_root / "src") not in sys.path:
+    sys.path.insert(0, str(project_root / "src"))
+
+from scheduler.due_index import (  # noqa: E402
+    EspressoHeapDueIndex,
+    EspressoTimingWheelDueIndex,
+)
+from scheduler.models import EspressoJobDefinition, EspressoSchedule  # noqa: E402
+from scheduler.runtime import EspressoJobRuntimeState  # noqa: E402
+
+
+def _make_states(num_jobs: int, max_interval: int, start: datetime, seed: int = 42):
+    rng = random.Random(seed)
+    states = {}
+    for i in range(num_jobs):
+        job = EspressoJobDefinition(
+            id=f"job{i}",
+            type="espresso_job",
+            module="testing.test",
+            function="just_run",
+            schedule=EspressoSchedule(
+                kind="interval", every_seconds=rng.randint(1, max_interval)
+            ),
+        )
+        states[job.id] = EspressoJobRuntimeState(
+            definition=job,
+            next_run_time=start + timedelta(seconds=rng.randint(1, max_interval)),
+        )
+    return states
+
+
+def _fire(state: EspressoJobRuntimeState, now: datetime):
+    state.last_run_time = now
+    state.schedule_next_run(now)
+
+
+def bench_tick_scan(states, ticks: int, start: datetime):
+    """The pre-index loop: inspect every job state on every tick."""
+    fired = 0
+    began = time.perf_counter()
+    for tick in range(1, ticks + 1):
+        now = start + timedelta(seconds=tick)
+        for job_id, job_state in list(states.items()):
+            job = job_state.definition
+            if not job_state.can_execute():
+                continue
+            if job.trigger and job.trigger.kind == "input":
+                continue
+            if job_state.next_run_time is None:
+                continue
+            if now >= job_state.next_run_time:
+                _fire(job_state, now)
+                fired += 1
+    return time.perf_counter() - began, 0.0, fired
+
+
+def bench_index(index, states, ticks: int, start: datetime):
+    began = time.perf_counter()
+    for job_id, job_state in states.items():
+        index.schedule(job_id, job_state.next_run_time)
+    load_time = time.perf_counter() - began
+
+    fired = 0
+    began = time.perf_counter()
+    for tick in range(1, ticks + 1):
+        now = start + timedelta(seconds=tick)
+        for job_id in index.pop_due(now):
+            job_state = states[job_id]
+            if not job_state.can_execute():
+                continue
+            _fire(job_state, now)
+            index.schedule(job_id, job_state.next_run_time)
+            fired += 1
+    return time.perf_counter() - began, load_time, fired
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--jobs", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--ticks", type=int, default=60)
+    parser.add_argument("--max-interval", type=int, default=300)
+    parser.add_argument("--resolution", type=float, default=1.0)
+    args = parser.parse_args()
+
+    start = datetime(2025, 1, 1, 12, 0, 0)
+
+    print(
+        f"{'jobs':>10} {'backend':>14} {'load (s)':>10} {'run (s)':>10} "
+        f"{'per tick (ms)':>14} {'fired':>10}"
+    )
+    for num_jobs in args.jobs:
+        backends = {
+            "tick_scan": lambda states: bench_tick_scan(states, args.ticks, start),
+            "heap": lambda states: bench_index(
+                EspressoHeapDueIndex(), states, args.ticks, start
+            ),
+            "timing_wheel": lambda states: bench_index(
+                EspressoTimingWheelDueIndex(
+                    resolution_seconds=args.resolution, now=start
+                ),
+                states,
+                args.ticks,
+                start,
+            ),
+        }
+        for name, run in backends.items():
+            states = _make_states(num_jobs, args.max_interval, start)
+            run_time, load_time, fired = run(states)
+            print(
+                f"{num_jobs:>10} {name:>14} {load_time:>10.3f} {run_time:>10.3f} "
+                f"{run_time / args.ticks * 1000:>14.2f} {fired:>10}"
+            )
+
+
+if __name__ == "__main__":
+    main()
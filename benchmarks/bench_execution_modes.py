@@ -0,0 +1,88 @@
+"""
+Benchmark execution modes on a CPU-bound job from testing/test.py.
+
+Runs --jobs copies of testing.test.count_primes through EspressoJobExecutor
+with --workers concurrent slots, once per execution mode, and reports wall
+time. Subinterpreters need Python 3.14+ and are skipped otherwise.
+
+    python benchmarks/bench_execution_modes.py --jobs 16 --workers 4 --limit 200000
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+for path in (project_root, project_root / "src"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from scheduler.input_manager import EspressoInputManager  # noqa: E402
+from scheduler.interpreter_pool import SUBINTERPRETERS_AVAILABLE  # noqa: E402
+from scheduler.models import EspressoJobDefinition, EspressoSchedule  # noqa: E402
+from scheduler.runtime import EspressoJobRuntimeState  # noqa: E402
+from scheduler.worker import EspressoJobExecutor  # noqa: E402
+
+
+async def run_mode(mode: str, num_jobs: int, num_workers: int, limit: int) -> float:
+    executor = EspressoJobExecutor(
+        num_workers=num_workers,
+        num_processes=num_workers,
+        process_preload=[("testing.test", "count_primes")],
+    )
+    input_manager = EspressoInputManager([])
+    states = [
+        EspressoJobRuntimeState(
+            definition=EspressoJobDefinition(
+                id=f"primes_{i}",
+                type="espresso_job",
+                module="testing.test",
+                function="count_primes",
+                schedule=EspressoSchedule(kind="interval", every_seconds=60),
+                args=[limit],
+                kwargs={},
+                execution_mode=mode,
+            )
+        )
+        for i in range(num_jobs)
+    ]
+
+    try:
+        # Pool start-up is paid once per deployment, so keep it out of the timing
+        if mode == "process":
+            await executor._get_process_pool().start()
+        elif mode == "subinterpreter":
+            pool = executor._get_interpreter_pool()
+            await pool.supports("testing.test", "count_primes")
+
+        began = time.perf_counter()
+        tasks = [await executor.submit(state, input_manager) for state in states]
+        await asyncio.gather(*tasks)
+        return time.perf_counter() - began
+    finally:
+        executor.shutdown()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--jobs", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--limit", type=int, default=200_000)
+    args = parser.parse_args()
+
+    modes = ["thread", "process"]
+    if SUBINTERPRETERS_AVAILABLE:
+        modes.append("subinterpreter")
+    else:
+        print("Subinterpreters unavailable on this Python, skipping that mode")
+
+    print(f"{'mode':>16} {'wall (s)':>10} {'jobs/s':>10}")
+    for mode in modes:
+        elapsed = await run_mode(mode, args.jobs, args.workers, args.limit)
+        print(f"{mode:>16} {elapsed:>10.2f} {args.jobs / elapsed:>10.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
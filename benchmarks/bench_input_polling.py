@@ -0,0 +1,94 @@
+"""
+Benchmark targeted per-input polling against polling every adapter.
+
+Registers --inputs list inputs, each holding --items items and delayed by a
+simulated broker round trip of --rtt-ms per poll, then drains them with one
+input-triggered run per input in turn. The "all" path is the old behaviour
+(poll every adapter, keep one result); "targeted" uses poll_input. Items read
+from other inputs and discarded are reported as lost.
+
+    python benchmarks/bench_input_polling.py --inputs 2 4 8 --items 200 --rtt-ms 1
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+if str(project_root / "src") not in sys.path:
+    sys.path.insert(0, str(project_root / "src"))
+
+from scheduler.input_manager import EspressoInputManager  # noqa: E402
+from scheduler.models import EspressoListInputDefinition  # noqa: E402
+
+
+def _make_manager(num_inputs: int, num_items: int, rtt: float):
+    manager = EspressoInputManager(
+        [
+            EspressoListInputDefinition(
+                id=f"input{i}", type="list", items=list(range(num_items))
+            )
+            for i in range(num_inputs)
+        ]
+    )
+    round_trips = [0]
+
+    for adapter in manager.adapters.values():
+        poll_batch = adapter.poll_batch
+
+        async def delayed_poll_batch(batch_size, poll_batch=poll_batch):
+            round_trips[0] += 1
+            await asyncio.sleep(rtt)
+            return await poll_batch(batch_size)
+
+        adapter.poll_batch = delayed_poll_batch
+
+    return manager, round_trips
+
+
+async def drain(manager: EspressoInputManager, targeted: bool, batch_size: int):
+    processed = 0
+    pending = set(manager.adapters)
+    while pending:
+        for input_id in list(pending):
+            if targeted:
+                items = await manager.poll_input(input_id, batch_size)
+            else:
+                items = (await manager.poll(batch_size=batch_size)).get(input_id, [])
+            if not items:
+                pending.discard(input_id)
+            processed += len(items)
+    return processed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--inputs", type=int, nargs="+", default=[2, 4, 8])
+    parser.add_argument("--items", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument("--rtt-ms", type=float, default=1.0)
+    args = parser.parse_args()
+
+    print(
+        f"{'inputs':>7} {'path':>9} {'time (s)':>9} {'round trips':>12} "
+        f"{'processed':>10} {'lost':>8}"
+    )
+    for num_inputs in args.inputs:
+        for name, targeted in (("all", False), ("targeted", True)):
+            manager, round_trips = _make_manager(
+                num_inputs, args.items, args.rtt_ms / 1000
+            )
+            began = time.perf_counter()
+            processed = await drain(manager, targeted, args.batch_size)
+            elapsed = time.perf_counter() - began
+            lost = num_inputs * args.items - processed
+            print(
+                f"{num_inputs:>7} {name:>9} {elapsed:>9.3f} {round_trips[0]:>12} "
+                f"{processed:>10} {lost:>8}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,136 @@
+"""
+Benchmark RabbitMQ basic.get polling against the basic.consume buffer.
+
+Uses an in-process AMQP stand-in so no broker is needed: every basic.get costs
+one simulated round trip of --rtt-ms, while basic.consume pushes deliveries
+whenever fewer than prefetch_count messages are unsettled, each arriving
+--rtt-ms / 2 after the ack that made room for it. Drains --messages messages
+through poll_batch and ack_many and reports messages per second.
+
+    python benchmarks/bench_rabbitmq_consume.py --messages 2000 --rtt-ms 1
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+if str(project_root / "src") not in sys.path:
+    sys.path.insert(0, str(project_root / "src"))
+
+from scheduler.inputs.rabbitmq_input import EspressoRabbitMQInputAdapter  # noqa: E402
+from scheduler.models import EspressoRabbitMQInputDefinition  # noqa: E402
+
+
+class StandInMessage:
+    def __init__(self, broker: "StandInBroker", delivery_tag: int):
+        self.broker = broker
+        self.delivery_tag = delivery_tag
+        self.body = b"{}"
+        # Messages left in the queue, as reported by basic.get-ok
+        self.message_count = broker.ready
+
+    async def ack(self, multiple: bool = False):
+        self.broker.settle(self.delivery_tag, multiple)
+
+    async def nack(self, multiple: bool = False, requeue: bool = True):
+        self.broker.settle(self.delivery_tag, multiple)
+
+
+class StandInBroker:
+    """A single queue with basic.get, basic.consume and a QoS window."""
+
+    def __init__(self, num_messages: int, prefetch_count: int, rtt: float):
+        self.ready = num_messages
+        self.prefetch_count = prefetch_count
+        self.rtt = rtt
+        self.next_tag = 1
+        self.unsettled = set()
+        self.consumer = None
+
+    def _deliver(self) -> StandInMessage:
+        self.ready -= 1
+        message = StandInMessage(self, self.next_tag)
+        self.unsettled.add(self.next_tag)
+        self.next_tag += 1
+        return message
+
+    async def get(self, timeout=None, fail=True):
+        await asyncio.sleep(self.rtt)
+        return self._deliver() if self.ready else None
+
+    async def consume(self, callback):
+        self.consumer = callback
+        self._push()
+        return "ctag"
+
+    def settle(self, delivery_tag: int, multiple: bool):
+        if multiple:
+            self.unsettled = {t for t in self.unsettled if t > delivery_tag}
+        else:
+            self.unsettled.discard(delivery_tag)
+        if self.consumer:
+            asyncio.get_running_loop().call_later(self.rtt / 2, self._push)
+
+    def _push(self):
+        while self.ready and len(self.unsettled) < self.prefetch_count:
+            asyncio.ensure_future(self.consumer(self._deliver()))
+
+
+async def drain(mode: str, num_messages: int, prefetch: int, batch: int, rtt: float):
+    adapter = EspressoRabbitMQInputAdapter(
+        EspressoRabbitMQInputDefinition(
+            id="bench",
+            type="rabbitmq",
+            url="amqp://stand-in",
+            queue="bench",
+            prefetch_count=prefetch,
+            consume_mode=mode,
+        )
+    )
+    broker = StandInBroker(num_messages, prefetch, rtt)
+
+    async def connected():
+        return True
+
+    adapter._ensure_connected = connected
+    adapter.queue = broker
+    if mode == "consume":
+        await broker.consume(adapter._on_message)
+
+    processed = 0
+    began = time.perf_counter()
+    while processed < num_messages:
+        items = await adapter.poll_batch(batch)
+        if not items:
+            await asyncio.sleep(0)
+            continue
+        await adapter.ack_many(items)
+        processed += len(items)
+    return time.perf_counter() - began
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--prefetch", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument("--rtt-ms", type=float, default=1.0)
+    args = parser.parse_args()
+
+    print(f"{'prefetch':>9} {'mode':>8} {'time (s)':>9} {'msg/s':>10}")
+    for prefetch in args.prefetch:
+        for mode in ("get", "consume"):
+            elapsed = await drain(
+                mode, args.messages, prefetch, args.batch_size, args.rtt_ms / 1000
+            )
+            print(
+                f"{prefetch:>9} {mode:>8} {elapsed:>9.3f} "
+                f"{args.messages / elapsed:>10.0f}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,94 @@
+"""
+Benchmark distributed job claims per second against a real Redis.
+
+Seeds --jobs due jobs, then claims and releases each one from --concurrency
+coroutines. The "multi-step" path is the old sequence (SET NX lock, HSET
+is_running, HSET is_running, EVAL of the release source); "script" is one
+EVALSHA claim plus one EVALSHA release.
+
+    redis-server --port 6379 --save "" &
+    python benchmarks/bench_redis_claims.py --redis-url redis://localhost:6379
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+if str(project_root / "src") not in sys.path:
+    sys.path.insert(0, str(project_root / "src"))
+
+from scheduler.distributed_state import (  # noqa: E402
+    DUE_KEY,
+    RELEASE_LOCK_SCRIPT,
+    DistributedJobState,
+)
+
+
+async def _seed(state: DistributedJobState, num_jobs: int, now: datetime):
+    await state.redis.delete(DUE_KEY)
+    state._known.clear()
+    await state.set_job_states(
+        {
+            f"bench{i}": {"next_run_time": now, "status": "active", "is_running": False}
+            for i in range(num_jobs)
+        }
+    )
+    await state.redis.delete(*(state._lock_key(f"bench{i}") for i in range(num_jobs)))
+
+
+async def multi_step(state: DistributedJobState, job_id: str, now: datetime):
+    lock_key = state._lock_key(job_id)
+    if not await state.redis.set(lock_key, state.instance_id, nx=True, ex=300):
+        await state.redis.get(lock_key)
+        return
+    await state.redis.hset(state._job_key(job_id), "is_running", "True")
+    await state.redis.hset(state._job_key(job_id), "is_running", "False")
+    await state.redis.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, state.instance_id)
+
+
+async def script(state: DistributedJobState, job_id: str, now: datetime):
+    token = await state.claim_job(job_id, now, now + timedelta(seconds=300))
+    if token:
+        await state.release_job(job_id, token, {"is_running": False})
+
+
+async def run(state, claim, num_jobs: int, concurrency: int) -> float:
+    now = datetime.now()
+    await _seed(state, num_jobs, now)
+    job_ids = iter([f"bench{i}" for i in range(num_jobs)])
+
+    async def worker():
+        for job_id in job_ids:
+            await claim(state, job_id, now)
+
+    began = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return num_jobs / (time.perf_counter() - began)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--redis-url", default="redis://localhost:6379")
+    parser.add_argument("--jobs", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16])
+    args = parser.parse_args()
+
+    state = DistributedJobState(args.redis_url)
+    await state.connect()
+    try:
+        print(f"{'concurrency':>11} {'path':>11} {'claims/s':>10}")
+        for concurrency in args.concurrency:
+            for name, claim in (("multi-step", multi_step), ("script", script)):
+                rate = await run(state, claim, args.jobs, concurrency)
+                print(f"{concurrency:>11} {name:>11} {rate:>10.0f}")
+    finally:
+        await state.redis.delete(DUE_KEY)
+        await state.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,109 @@
+"""
+Benchmark enqueue-to-start latency of a Redis Streams input job.
+
+Runs the scheduler against a real Redis with one on_demand job on a stream
+input, XADDs --messages messages spaced --interval-ms apart, each stamped with
+its enqueue time, and records when the job first sees it. Compares the default
+tick-driven polling with the long_poll background reader and reports p50/p99.
+
+    docker run --rm -p 6379:6379 redis:7
+    python benchmarks/bench_redis_latency.py --redis-url redis://localhost:6379
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+if str(project_root / "src") not in sys.path:
+    sys.path.insert(0, str(project_root / "src"))
+
+import redis.asyncio as redis  # noqa: E402
+from scheduler.models import (  # noqa: E402
+    EspressoJobDefinition,
+    EspressoRedisStreamsInputDefinition,
+    EspressoSchedule,
+    EspressoTrigger,
+)
+from scheduler.scheduler import EspressoScheduler  # noqa: E402
+
+latencies = []
+
+
+def record_latency(items):
+    started = time.time()
+    for item in items:
+        latencies.append(started - float(item["data"]["enqueued_at"]))
+
+
+async def run(args, long_poll: bool) -> list:
+    latencies.clear()
+    client = redis.Redis.from_url(args.redis_url, decode_responses=True)
+    stream_name = f"espresso_bench_{uuid.uuid4().hex[:8]}"
+    input_def = EspressoRedisStreamsInputDefinition(
+        id="events",
+        type="redis_streams",
+        host=client.connection_pool.connection_kwargs.get("host", "localhost"),
+        port=client.connection_pool.connection_kwargs.get("port", 6379),
+        stream_name=stream_name,
+        consumer_group="bench",
+        long_poll=long_poll,
+    )
+    job = EspressoJobDefinition(
+        id="consume_events",
+        type="espresso_job",
+        module="__main__",
+        function="record_latency",
+        schedule=EspressoSchedule(kind="on_demand"),
+        trigger=EspressoTrigger(kind="input", input_id="events"),
+        batch_size=50,
+    )
+    sched = EspressoScheduler([job], [input_def], tick_seconds=args.tick_seconds)
+    scheduler_task = asyncio.create_task(sched.run_forever())
+
+    try:
+        # Let the adapter create its consumer group
+        await asyncio.sleep(1)
+        for _ in range(args.messages):
+            await client.xadd(stream_name, {"enqueued_at": repr(time.time())})
+            await asyncio.sleep(args.interval_ms / 1000)
+
+        deadline = time.monotonic() + args.tick_seconds * 5 + 5
+        while len(latencies) < args.messages and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+    finally:
+        await sched.stop()
+        scheduler_task.cancel()
+        await client.delete(stream_name)
+        await client.close()
+
+    return list(latencies)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--redis-url", default="redis://localhost:6379")
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--interval-ms", type=float, default=20)
+    parser.add_argument("--tick-seconds", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'mode':>10} {'received':>9} {'p50 (ms)':>9} {'p99 (ms)':>9}")
+    for name, long_poll in (("tick", False), ("long_poll", True)):
+        samples = await run(args, long_poll)
+        if len(samples) < 2:
+            print(f"{name:>10} {len(samples):>9} {'-':>9} {'-':>9}")
+            continue
+        percentiles = statistics.quantiles(samples, n=100)
+        print(
+            f"{name:>10} {len(samples):>9} {percentiles[49] * 1000:>9.1f} "
+            f"{percentiles[98] * 1000:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -2,10 +2,11 @@
 
 from .scheduler import EspressoScheduler
 from . import models
-from .yaml_loader import load_jobs_from_yaml
+from .yaml_loader import load_jobs_from_yaml, load_worker_pools_from_yaml
 
 __all__ = [
     "EspressoScheduler",
     "models",
     "load_jobs_from_yaml",
+    "load_worker_pools_from_yaml",
 ]
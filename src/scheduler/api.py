@@ -9,6 +9,7 @@ from fastapi import FastAPI, HTTPException, status
 from pydantic import BaseModel
 from .scheduler import EspressoScheduler
 from .runtime import EspressoJobRuntimeState
+from .worker import EspressoQueueFullError
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +29,7 @@ class JobStateResponse(BaseModel):
     retries_attempted: int
     total_execution_time: float
     last_execution_duration: Optional[float]
+    timeout_count: int
     created_at: datetime
     schedule_kind: str
     enabled: bool
@@ -56,6 +58,34 @@ class HealthResponse(BaseModel):
     running_jobs: int
     num_workers: int
     tick_seconds: int
+    total_timeouts: int
+    concurrency_limit: int
+    queue_depth: int
+    queue_capacity: int
+    active_runs: int
+    avg_queue_wait_seconds: float
+    max_queue_wait_seconds: float
+    dropped_runs: int
+    rejected_runs: int
+
+
+class WorkerPoolResponse(BaseModel):
+    name: str
+    num_workers: int
+    adaptive: bool
+    utilization: float
+    active_runs: int
+    queue_depth: int
+    queue_capacity: int
+    avg_queue_wait_seconds: float
+    max_queue_wait_seconds: float
+    dropped_runs: int
+    rejected_runs: int
+
+
+class WorkerPoolListResponse(BaseModel):
+    pools: Dict[str, WorkerPoolResponse]
+    total: int
 
 
 def create_api(scheduler: EspressoScheduler) -> FastAPI:
@@ -85,6 +115,7 @@ def create_api(scheduler: EspressoScheduler) -> FastAPI:
             retries_attempted=state.retries_attempted,
             total_execution_time=state.total_execution_time,
             last_execution_duration=state.last_execution_duration,
+            timeout_count=state.timeout_count,
             created_at=state.created_at,
             schedule_kind=state.definition.schedule.kind,
             enabled=state.definition.enabled,
@@ -116,8 +147,24 @@ def create_api(scheduler: EspressoScheduler) -> FastAPI:
             running_jobs=running,
             num_workers=scheduler.executor.num_workers,
             tick_seconds=scheduler.tick_seconds,
+            total_timeouts=scheduler.executor.timeouts_total,
+            **scheduler.executor.queue_stats(),
         )
 
+    @app.get("/pools", response_model=WorkerPoolListResponse, tags=["General"])
+    async def list_pools():
+        """Utilization and queue wait metrics of each worker pool."""
+        pools = {
+            name: WorkerPoolResponse(name=name, **stats)
+            for name, stats in scheduler.executor.pool_stats().items()
+        }
+        return WorkerPoolListResponse(pools=pools, total=len(pools))
+
+    @app.get("/inputs", tags=["General"])
+    async def input_stats() -> Dict[str, Dict[str, Any]]:
+        """Buffered, in-flight and recovered message counts of each input."""
+        return scheduler.input_manager.input_stats()
+
     @app.get("/jobs", response_model=JobListResponse, tags=["Jobs"])
     async def list_jobs():
         """List all jobs with their current state."""
@@ -203,7 +250,12 @@ def create_api(scheduler: EspressoScheduler) -> FastAPI:
     )
     async def trigger_job(job_id: str):
         """Manually trigger a job execution."""
-        success = await scheduler.trigger_job(job_id)
+        try:
+            success = await scheduler.trigger_job(job_id)
+        except EspressoQueueFullError as e:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e)
+            )
         if not success:
             state = await scheduler.get_job(job_id)
             if not state:
@@ -0,0 +1,98 @@
+import logging
+import math
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class EspressoAdaptiveLimiter:
+    """
+    AIMD concurrency limit for a worker pool.
+
+    Completed runs are sampled in windows of window_size. A window whose error
+    rate is above max_error_rate, or whose average latency is more than
+    latency_tolerance times the baseline, shrinks the limit multiplicatively by
+    backoff_ratio. Otherwise, if runs were backlogged, the limit grows by one.
+    The limit always stays within [min_limit, max_limit].
+    """
+
+    def __init__(
+        self,
+        min_limit: int,
+        max_limit: int,
+        initial_limit: Optional[int] = None,
+        latency_tolerance: float = 2.0,
+        max_error_rate: float = 0.1,
+        backoff_ratio: float = 0.9,
+        window_size: int = 10,
+    ):
+        if not 1 <= min_limit <= max_limit:
+            raise ValueError(
+                f"Invalid concurrency bounds: min={min_limit}, max={max_limit}"
+            )
+
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = self._clamp(initial_limit or min_limit)
+        self.latency_tolerance = latency_tolerance
+        self.max_error_rate = max_error_rate
+        self.backoff_ratio = backoff_ratio
+        self.window_size = window_size
+        # Latency of an unloaded run, lowered immediately and raised slowly
+        self.baseline_latency: Optional[float] = None
+
+        self._latencies: List[float] = []
+        self._errors = 0
+        self._backlogged = False
+
+    def _clamp(self, limit: int) -> int:
+        return max(self.min_limit, min(self.max_limit, limit))
+
+    def record(self, latency: float, failed: bool, backlogged: bool) -> int:
+        """Record a completed run and return the possibly updated limit."""
+        self._latencies.append(latency)
+        self._errors += failed
+        self._backlogged = self._backlogged or backlogged
+
+        if len(self._latencies) >= self.window_size:
+            self._adjust()
+        return self.limit
+
+    def _adjust(self) -> None:
+        latency = sum(self._latencies) / len(self._latencies)
+        error_rate = self._errors / len(self._latencies)
+        backlogged = self._backlogged
+        self._latencies = []
+        self._errors = 0
+        self._backlogged = False
+
+        slow = (
+            self.baseline_latency is not None
+            and latency > self.baseline_latency * self.latency_tolerance
+        )
+        if self.baseline_latency is None or latency < self.baseline_latency:
+            self.baseline_latency = latency
+        elif not slow:
+            # Drift up so a lasting change in job duration is not read as overload
+            self.baseline_latency += (latency - self.baseline_latency) * 0.05
+
+        previous = self.limit
+        if slow or error_rate > self.max_error_rate:
+            self.limit = self._clamp(math.floor(self.limit * self.backoff_ratio))
+        elif backlogged:
+            self.limit = self._clamp(self.limit + 1)
+
+        if self.limit != previous:
+            logger.info(
+                f"Concurrency limit {previous} -> {self.limit} "
+                f"(latency {latency:.3f}s, baseline {self.baseline_latency:.3f}s, "
+                f"error rate {error_rate:.0%})"
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "concurrency_limit": self.limit,
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "baseline_latency_seconds": self.baseline_latency,
+        }
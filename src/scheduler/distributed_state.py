@@ -1,20 +1,103 @@
 import asyncio
+import hashlib
 import json
 import logging
+import time
 import uuid
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, List
 from redis.asyncio import Redis
 from redis.exceptions import RedisError
 
 logger = logging.getLogger(__name__)
 
+# Active job IDs scored by next run timestamp
+DUE_KEY = "espresso:due"
+# Live instance IDs scored by the time their heartbeat expires
+INSTANCES_KEY = "espresso:instances"
+
+# KEYS: lock, job hash, due set, fence counter. ARGV: instance ID, lease ms,
+# now and lease end as scores, job ID, lease end as ISO string.
+# Claims a job only if it is still due and unleased, marks it running, moves it
+# out of the due window until the lease ends and returns a new fencing token.
+CLAIM_JOB_SCRIPT = """
+local score = redis.call("zscore", KEYS[3], ARGV[5])
+if not score or tonumber(score) > tonumber(ARGV[3]) then
+    return 0
+end
+if not redis.call("set", KEYS[1], ARGV[1], "NX", "PX", ARGV[2]) then
+    return 0
+end
+local token = redis.call("incr", KEYS[4])
+redis.call("hset", KEYS[2], "is_running", "True", "next_run_time", ARGV[6])
+redis.call("zadd", KEYS[3], ARGV[4], ARGV[5])
+return token
+"""
+
+# KEYS: lock, fence counter, due set. ARGV: instance ID, token, lease ms,
+# lease end as score, job ID. Owner-checked PEXPIRE that also keeps the job
+# out of the due window.
+RENEW_LEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) ~= ARGV[1] or redis.call("get", KEYS[2]) ~= ARGV[2] then
+    return 0
+end
+redis.call("pexpire", KEYS[1], ARGV[3])
+redis.call("zadd", KEYS[3], "XX", ARGV[4], ARGV[5])
+return 1
+"""
+
+# KEYS: lock, job hash, due set, fence counter. ARGV: instance ID, token, job
+# ID, due score ("" to unschedule), then field/value pairs of the final state.
+# Writes only if no newer claim took over the job since this token was issued.
+RELEASE_JOB_SCRIPT = """
+if redis.call("get", KEYS[4]) ~= ARGV[2] then
+    return 0
+end
+if #ARGV > 4 then
+    redis.call("hset", KEYS[2], unpack(ARGV, 5))
+end
+if ARGV[4] == "" then
+    redis.call("zrem", KEYS[3], ARGV[3])
+else
+    redis.call("zadd", KEYS[3], ARGV[4], ARGV[3])
+end
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    redis.call("del", KEYS[1])
+end
+return 1
+"""
+
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+else
+    return 0
+end
+"""
+
+
+def rendezvous_owner(job_id: str, instances: List[str]) -> str:
+    """
+    Owner of a job among instances by rendezvous (highest random weight) hashing.
+
+    Every instance computes the same owner from the same membership, and when
+    an instance joins or leaves only the jobs it gains or loses move.
+    """
+    return max(
+        instances,
+        key=lambda instance: hashlib.blake2b(
+            f"{instance}:{job_id}".encode(), digest_size=8
+        ).digest(),
+    )
+
 
 class DistributedJobState:
     def __init__(self, redis_url: str = "redis://localhost:6379"):
         self.redis_url = redis_url
         self.redis: Optional[Redis] = None
         self.instance_id = str(uuid.uuid4())[:8]
+        # Encoded job hash fields as last read from or written to Redis
+        self._known: Dict[str, Dict[str, str]] = {}
         logger.info(
             f"Distributed state manager initialized (instance: {self.instance_id})"
         )
@@ -26,13 +109,23 @@ class DistributedJobState:
             )
 
             await self.redis.ping()
+            self._register_scripts()
             logger.info(f"✓ Connected to Redis at {self.redis_url}")
         except Exception as e:
             logger.error(f"Failed to connect to Redis: {e}")
             raise
 
+    def _register_scripts(self):
+        # Invoked with EVALSHA, loading the source only if Redis lacks it
+        self._claim_script = self.redis.register_script(CLAIM_JOB_SCRIPT)
+        self._renew_script = self.redis.register_script(RENEW_LEASE_SCRIPT)
+        self._release_script = self.redis.register_script(RELEASE_JOB_SCRIPT)
+        self._release_lock_script = self.redis.register_script(RELEASE_LOCK_SCRIPT)
+
     async def close(self):
         if self.redis:
+            # Leave the membership now so other instances take over our jobs
+            await self.redis.zrem(INSTANCES_KEY, self.instance_id)
             await self.redis.close()
             logger.info("Redis connection closed")
 
@@ -42,6 +135,9 @@ class DistributedJobState:
     def _lock_key(self, job_id: str) -> str:
         return f"espresso:lock:job:{job_id}"
 
+    def _fence_key(self, job_id: str) -> str:
+        return f"espresso:fence:job:{job_id}"
+
     async def acquire_lock(self, job_id: str, ttl_seconds: int = 300) -> bool:
         lock_key = self._lock_key(job_id)
 
@@ -52,25 +148,16 @@ class DistributedJobState:
         if acquired:
             logger.debug(f"[{self.instance_id}] Acquired lock for job {job_id}")
         else:
-            lock_holder = await self.redis.get(lock_key)
-            logger.debug(
-                f"[{self.instance_id}] Lock for job {job_id} held by {lock_holder}"
-            )
+            logger.debug(f"[{self.instance_id}] Lock for job {job_id} is held")
 
         return bool(acquired)
 
     async def release_lock(self, job_id: str):
         lock_key = self._lock_key(job_id)
 
-        lua_script = """
-        if redis.call("get", KEYS[1]) == ARGV[1] then
-            return redis.call("del", KEYS[1])
-        else
-            return 0
-        end
-        """
-
-        result = await self.redis.eval(lua_script, 1, lock_key, self.instance_id)
+        result = await self._release_lock_script(
+            keys=[lock_key], args=[self.instance_id]
+        )
 
         if result:
             logger.debug(f"[{self.instance_id}] Released lock for job {job_id}")
@@ -79,13 +166,109 @@ class DistributedJobState:
                 f"[{self.instance_id}] Could not release lock for job {job_id} (not owner)"
             )
 
-    async def get_job_state(self, job_id: str) -> Optional[Dict[str, Any]]:
-        job_key = self._job_key(job_id)
-        state = await self.redis.hgetall(job_key)
+    async def claim_job(
+        self, job_id: str, now: datetime, until: datetime, ttl_seconds: float = 300
+    ) -> int:
+        """
+        Atomically claim a due job for this instance in one round trip.
+
+        Succeeds only if the job is in the due set at or before now and no
+        instance holds its lock. The lock is taken for ttl_seconds, the job
+        is marked running and its next run moves to until. Returns the run's
+        fencing token, or 0 if the job was not claimed.
+        """
+        next_run = self._encode(until)
+        token = await self._claim_script(
+            keys=[
+                self._lock_key(job_id),
+                self._job_key(job_id),
+                DUE_KEY,
+                self._fence_key(job_id),
+            ],
+            args=[
+                self.instance_id,
+                int(ttl_seconds * 1000),
+                now.timestamp(),
+                until.timestamp(),
+                job_id,
+                next_run,
+            ],
+        )
+        if token:
+            self._known.setdefault(job_id, {}).update(
+                is_running="True", next_run_time=next_run
+            )
+            logger.debug(f"[{self.instance_id}] Claimed job {job_id} (token {token})")
+        return int(token)
+
+    async def renew_lease(
+        self, job_id: str, token: int, until: datetime, ttl_seconds: float
+    ) -> bool:
+        """Extend our lock on a claimed job; False if the lease was lost."""
+        return bool(
+            await self._renew_script(
+                keys=[self._lock_key(job_id), self._fence_key(job_id), DUE_KEY],
+                args=[
+                    self.instance_id,
+                    token,
+                    int(ttl_seconds * 1000),
+                    until.timestamp(),
+                    job_id,
+                ],
+            )
+        )
+
+    async def release_job(self, job_id: str, token: int, state: Dict[str, Any]) -> bool:
+        """
+        Write a finished run's state and drop our lock on the job.
 
-        if not state:
-            return None
+        Fenced: nothing is written if another claim has been made since token
+        was issued, so a run that lost its lease cannot overwrite newer
+        state. Only fields that changed are sent.
+        """
+        known = self._known.get(job_id, {})
+        encoded = {key: self._encode(value) for key, value in state.items()}
+        changed = {
+            key: value for key, value in encoded.items() if known.get(key) != value
+        }
+        merged = {**known, **changed}
+        score = self._due_score(merged)
+
+        released = await self._release_script(
+            keys=[
+                self._lock_key(job_id),
+                self._job_key(job_id),
+                DUE_KEY,
+                self._fence_key(job_id),
+            ],
+            args=[
+                self.instance_id,
+                token,
+                job_id,
+                "" if score is None else score,
+                *(item for pair in changed.items() for item in pair),
+            ],
+        )
+        if released:
+            self._known[job_id] = merged
+        else:
+            logger.warning(
+                f"[{self.instance_id}] Lease on job {job_id} was taken over, "
+                "discarding the state of its run"
+            )
+        return bool(released)
 
+    @staticmethod
+    def _encode(value: Any) -> str:
+        if isinstance(value, datetime):
+            return value.isoformat()
+        if value is None:
+            return ""
+        # bool included: str(True) == "True"
+        return str(value)
+
+    @staticmethod
+    def _decode_state(state: Dict[str, str]) -> Dict[str, Any]:
         result = dict(state)
 
         for time_field in ["next_run_time", "last_run_time", "created_at"]:
@@ -111,37 +294,99 @@ class DistributedJobState:
 
         return result
 
-    async def set_job_state(self, job_id: str, state: Dict[str, Any]):
-        job_key = self._job_key(job_id)
+    @staticmethod
+    def _due_score(fields: Dict[str, str]) -> Optional[float]:
+        """Due-set score for a job's encoded fields, None if it is not scheduled."""
+        if fields.get("next_run_time") and fields.get("status", "active") == "active":
+            return datetime.fromisoformat(fields["next_run_time"]).timestamp()
+        return None
+
+    def _index_due(self, pipe: Any, job_id: str, fields: Dict[str, str]) -> None:
+        """Queue the due-set update for a job's encoded next_run_time and status."""
+        score = self._due_score(fields)
+        if score is not None:
+            pipe.zadd(DUE_KEY, {job_id: score})
+        else:
+            pipe.zrem(DUE_KEY, job_id)
 
-        # Convert values to strings for Redis hash
-        redis_state = {}
-        for key, value in state.items():
-            if isinstance(value, datetime):
-                redis_state[key] = value.isoformat()
-            elif isinstance(value, bool):
-                redis_state[key] = str(value)
-            elif value is None:
-                redis_state[key] = ""
-            else:
-                redis_state[key] = str(value)
+    async def get_due_job_ids(self, now: datetime, limit: int = 1000) -> list[str]:
+        """IDs of active jobs whose next run is at or before now, earliest first."""
+        return await self.redis.zrangebyscore(
+            DUE_KEY, "-inf", now.timestamp(), start=0, num=limit
+        )
+
+    async def get_job_states(self, job_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch the state of many jobs in one pipelined round trip."""
+        job_ids = list(job_ids)
+        if not job_ids:
+            return {}
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for job_id in job_ids:
+                pipe.hgetall(self._job_key(job_id))
+            hashes = await pipe.execute()
+
+        states = {}
+        for job_id, state in zip(job_ids, hashes):
+            if not state:
+                self._known.pop(job_id, None)
+                continue
+            self._known[job_id] = dict(state)
+            states[job_id] = self._decode_state(state)
+        return states
+
+    async def get_job_state(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return (await self.get_job_states([job_id])).get(job_id)
+
+    async def set_job_states(self, states: Dict[str, Dict[str, Any]]) -> int:
+        """
+        Write many job states in one pipelined round trip.
+
+        Only fields that differ from the last state read from or written to
+        Redis are sent; jobs with no changes are skipped. Returns the number
+        of fields written.
+        """
+        changes = {}
+        for job_id, state in states.items():
+            known = self._known.get(job_id, {})
+            encoded = {key: self._encode(value) for key, value in state.items()}
+            changed = {
+                key: value for key, value in encoded.items() if known.get(key) != value
+            }
+            if changed:
+                changes[job_id] = changed
+
+        if not changes:
+            return 0
+
+        merged = {}
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for job_id, changed in changes.items():
+                pipe.hset(self._job_key(job_id), mapping=changed)
+                merged[job_id] = {**self._known.get(job_id, {}), **changed}
+                if "next_run_time" in changed or "status" in changed:
+                    self._index_due(pipe, job_id, merged[job_id])
+            await pipe.execute()
 
-        await self.redis.hset(job_key, mapping=redis_state)
+        self._known.update(merged)
+        return sum(len(changed) for changed in changes.values())
+
+    async def set_job_state(self, job_id: str, state: Dict[str, Any]):
+        await self.set_job_states({job_id: state})
 
     async def update_job_field(self, job_id: str, field: str, value: Any):
         job_key = self._job_key(job_id)
+        value_str = self._encode(value)
 
-        # Convert value to string
-        if isinstance(value, datetime):
-            value_str = value.isoformat()
-        elif isinstance(value, bool):
-            value_str = str(value)
-        elif value is None:
-            value_str = ""
-        else:
-            value_str = str(value)
+        known = {**self._known.get(job_id, {}), field: value_str}
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hset(job_key, field, value_str)
+            if field in ("next_run_time", "status"):
+                self._index_due(pipe, job_id, known)
+            await pipe.execute()
 
-        await self.redis.hset(job_key, field, value_str)
+        self._known[job_id] = known
 
     async def get_all_job_ids(self) -> list[str]:
         pattern = "espresso:job:*:state"
@@ -158,19 +403,20 @@ class DistributedJobState:
         lock_key = self._lock_key(job_id)
 
         await self.redis.delete(job_key, lock_key)
+        await self.redis.zrem(DUE_KEY, job_id)
+        self._known.pop(job_id, None)
         logger.info(f"Deleted state for job {job_id}")
 
     async def heartbeat(self, ttl_seconds: int = 30):
         key = f"espresso:instance:{self.instance_id}:heartbeat"
-        await self.redis.set(key, datetime.now().isoformat(), ex=ttl_seconds)
-
-    async def get_active_instances(self) -> list[str]:
-        pattern = "espresso:instance:*:heartbeat"
-        instances = []
+        now = time.time()
 
-        async for key in self.redis.scan_iter(match=pattern, count=100):
-            # Extract instance_id from key
-            instance_id = key.split(":")[2]
-            instances.append(instance_id)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.set(key, datetime.now().isoformat(), ex=ttl_seconds)
+            pipe.zadd(INSTANCES_KEY, {self.instance_id: now + ttl_seconds})
+            pipe.zremrangebyscore(INSTANCES_KEY, "-inf", now)
+            await pipe.execute()
 
-        return instances
+    async def get_active_instances(self) -> list[str]:
+        """IDs of instances whose heartbeat has not expired, in one read."""
+        return await self.redis.zrangebyscore(INSTANCES_KEY, time.time(), "+inf")
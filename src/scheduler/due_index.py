@@ -0,0 +1,268 @@
+import heapq
+import itertools
+import math
+from datetime import datetime, timedelta
+from typing import Dict, List, Literal, Optional, Protocol, Tuple
+
+DueIndexBackend = Literal["heap", "timing_wheel"]
+
+# Job times are naive local datetimes, so ticks are counted from a naive epoch
+_EPOCH = datetime(1970, 1, 1)
+
+
+class EspressoDueIndex(Protocol):
+    def schedule(self, job_id: str, when: datetime) -> None: ...
+
+    def discard(self, job_id: str) -> None: ...
+
+    def pop_due(self, now: datetime) -> List[str]: ...
+
+    def next_deadline(self) -> Optional[datetime]: ...
+
+    def __len__(self) -> int: ...
+
+    def __contains__(self, job_id: object) -> bool: ...
+
+
+class EspressoHeapDueIndex(EspressoDueIndex):
+    """
+    Min-heap of job deadlines keyed on next run time.
+
+    Rescheduling or discarding a job leaves its old heap entry in place; stale
+    entries are skipped when they reach the top and the heap is rebuilt once
+    they outnumber the live ones.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[datetime, int, str]] = []
+        self._entries: Dict[str, Tuple[datetime, int]] = {}
+        self._counter = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, job_id: object) -> bool:
+        return job_id in self._entries
+
+    def schedule(self, job_id: str, when: datetime) -> None:
+        """Insert a job or move it to a new deadline."""
+        seq = next(self._counter)
+        self._entries[job_id] = (when, seq)
+        heapq.heappush(self._heap, (when, seq, job_id))
+        self._maybe_compact()
+
+    def discard(self, job_id: str) -> None:
+        """Remove a job from the index if present."""
+        if self._entries.pop(job_id, None) is not None:
+            self._maybe_compact()
+
+    def pop_due(self, now: datetime) -> List[str]:
+        """Remove and return every job whose deadline is at or before now."""
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            when, seq, job_id = heapq.heappop(self._heap)
+            if self._entries.get(job_id) == (when, seq):
+                del self._entries[job_id]
+                due.append(job_id)
+        return due
+
+    def next_deadline(self) -> Optional[datetime]:
+        """Return the earliest deadline, or None if the index is empty."""
+        while self._heap:
+            when, seq, job_id = self._heap[0]
+            if self._entries.get(job_id) == (when, seq):
+                return when
+            heapq.heappop(self._heap)
+        return None
+
+    def _maybe_compact(self) -> None:
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._heap = [
+                (when, seq, job_id) for job_id, (when, seq) in self._entries.items()
+            ]
+            heapq.heapify(self._heap)
+
+
+class EspressoTimingWheelDueIndex(EspressoDueIndex):
+    """
+    Hierarchical timing wheel with O(1) insert, removal and expiry.
+
+    Deadlines are rounded up to ``resolution_seconds`` ticks, so a job never
+    fires early but may fire up to one tick late. Level ``L`` has ``wheel_size``
+    slots spanning ``wheel_size ** L`` ticks each; entries are cascaded to the
+    level below when the wheel reaches their slot. Deadlines beyond the top
+    level wait in an overflow bucket until the top level wraps.
+    """
+
+    def __init__(
+        self,
+        resolution_seconds: float = 1.0,
+        wheel_size: int = 64,
+        levels: int = 4,
+        now: Optional[datetime] = None,
+    ):
+        if resolution_seconds <= 0:
+            raise ValueError("resolution_seconds must be positive")
+        if wheel_size < 2 or levels < 1:
+            raise ValueError("wheel_size must be at least 2 and levels at least 1")
+
+        self.resolution_seconds = resolution_seconds
+        self.wheel_size = wheel_size
+        self.levels = levels
+
+        # Ticks spanned by one slot at each level, plus the overflow "level"
+        self._spans = [wheel_size**level for level in range(levels + 1)]
+        self._wheels: List[List[Dict[str, Tuple[int, datetime]]]] = [
+            [{} for _ in range(wheel_size)] for _ in range(levels)
+        ]
+        self._counts = [0] * levels
+        self._overflow: Dict[str, Tuple[int, datetime]] = {}
+        self._ready: Dict[str, datetime] = {}
+        self._locations: Dict[str, Tuple[int, int]] = {}
+
+        # Every tick up to and including this one has already been expired
+        self._tick = self._to_tick_floor(now or datetime.now())
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+    def __contains__(self, job_id: object) -> bool:
+        return job_id in self._locations
+
+    def _to_tick_floor(self, when: datetime) -> int:
+        return math.floor((when - _EPOCH).total_seconds() / self.resolution_seconds)
+
+    def _to_tick_ceil(self, when: datetime) -> int:
+        return math.ceil((when - _EPOCH).total_seconds() / self.resolution_seconds)
+
+    def schedule(self, job_id: str, when: datetime) -> None:
+        """Insert a job or move it to a new deadline."""
+        self.discard(job_id)
+        self._place(job_id, self._to_tick_ceil(when), when)
+
+    def _place(self, job_id: str, tick: int, when: datetime) -> None:
+        if tick <= self._tick:
+            self._ready[job_id] = when
+            self._locations[job_id] = (-1, 0)
+            return
+
+        for level in range(self.levels):
+            # Same block one level up means the slot at this level is unambiguous
+            block = self._spans[level + 1]
+            if tick // block == self._tick // block:
+                slot = (tick // self._spans[level]) % self.wheel_size
+                self._wheels[level][slot][job_id] = (tick, when)
+                self._counts[level] += 1
+                self._locations[job_id] = (level, slot)
+                return
+
+        self._overflow[job_id] = (tick, when)
+        self._locations[job_id] = (self.levels, 0)
+
+    def discard(self, job_id: str) -> None:
+        """Remove a job from the index if present."""
+        location = self._locations.pop(job_id, None)
+        if location is None:
+            return
+
+        level, slot = location
+        if level == -1:
+            del self._ready[job_id]
+        elif level == self.levels:
+            del self._overflow[job_id]
+        else:
+            del self._wheels[level][slot][job_id]
+            self._counts[level] -= 1
+
+    def _cascade(self, level: int) -> None:
+        if level == self.levels:
+            bucket, self._overflow = self._overflow, {}
+        else:
+            slot = (self._tick // self._spans[level]) % self.wheel_size
+            bucket = self._wheels[level][slot]
+            self._wheels[level][slot] = {}
+            self._counts[level] -= len(bucket)
+
+        for job_id, (tick, when) in bucket.items():
+            self._place(job_id, tick, when)
+
+    def _next_tick(self, target: int) -> int:
+        """Skip ahead past stretches of the wheel that hold no entries."""
+        for level in range(self.levels):
+            if self._counts[level]:
+                span = self._spans[level]
+                break
+        else:
+            span = self._spans[self.levels] if self._overflow else None
+
+        if span is None:
+            return target
+        return min(target, (self._tick // span + 1) * span)
+
+    def pop_due(self, now: datetime) -> List[str]:
+        """Remove and return every job whose deadline is at or before now."""
+        target = self._to_tick_floor(now)
+
+        while self._tick < target:
+            self._tick = self._next_tick(target)
+
+            for level in range(self.levels, 0, -1):
+                if self._tick % self._spans[level] == 0:
+                    self._cascade(level)
+
+            bucket = self._wheels[0][self._tick % self.wheel_size]
+            if bucket:
+                self._wheels[0][self._tick % self.wheel_size] = {}
+                self._counts[0] -= len(bucket)
+                for job_id, (_, when) in bucket.items():
+                    self._ready[job_id] = when
+                    self._locations[job_id] = (-1, 0)
+
+        due = list(self._ready)
+        for job_id in due:
+            del self._locations[job_id]
+        self._ready.clear()
+        return due
+
+    def next_deadline(self) -> Optional[datetime]:
+        """
+        Return the earliest time at which pop_due can release a job.
+
+        For entries above level 0 this is the time their slot cascades, which is
+        a lower bound on their deadline.
+        """
+        if self._ready:
+            return min(self._ready.values())
+
+        for level in range(self.levels):
+            if not self._counts[level]:
+                continue
+
+            span = self._spans[level]
+            current = (self._tick // span) % self.wheel_size
+            upper = self._spans[level + 1]
+            block_start = (self._tick // upper) * upper
+            for slot in range(current + 1, self.wheel_size):
+                if self._wheels[level][slot]:
+                    return self._from_tick(block_start + slot * span)
+
+        if self._overflow:
+            top = self._spans[self.levels]
+            return self._from_tick((self._tick // top + 1) * top)
+
+        return None
+
+    def _from_tick(self, tick: int) -> datetime:
+        return _EPOCH + timedelta(seconds=tick * self.resolution_seconds)
+
+
+def create_due_index(
+    backend: DueIndexBackend = "heap", resolution_seconds: float = 1.0
+) -> EspressoDueIndex:
+    """Create the due index backend selected on the scheduler."""
+    if backend == "heap":
+        return EspressoHeapDueIndex()
+    elif backend == "timing_wheel":
+        return EspressoTimingWheelDueIndex(resolution_seconds=resolution_seconds)
+    else:
+        raise ValueError(f"Unknown due index backend: {backend}")
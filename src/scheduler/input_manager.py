@@ -1,13 +1,25 @@
-from typing import List, Any, Dict
+import asyncio
+import logging
+from typing import List, Any, Awaitable, Callable, Dict, Iterable, Tuple
 from .models import EspressoInputDefinition
 from .inputs.base import EspressoInputAdapter
 from .inputs.list_input import EspressoListInputAdapter
 from .inputs.rabbitmq_input import EspressoRabbitMQInputAdapter
-from .inputs.redis_input import EspressoRedisStreamsInputAdapter
+from .inputs.redis_input import (
+    EspressoRedisStreamsGroup,
+    EspressoRedisStreamsInputAdapter,
+)
+
+logger = logging.getLogger(__name__)
 
 
 class EspressoInputManager:
-    def __init__(self, inputs: List[EspressoInputDefinition]):
+    def __init__(
+        self,
+        inputs: List[EspressoInputDefinition],
+        poll_timeout_seconds: float = 5.0,  # Per-adapter deadline in has_data_many
+    ):
+        self.poll_timeout_seconds = poll_timeout_seconds
         self.adapters: Dict[str, EspressoInputAdapter] = {}
         self.input_types: Dict[str, str] = {}
 
@@ -27,29 +39,100 @@ class EspressoInputManager:
             else:
                 raise ValueError(f"Unknown input type: {inp.type}")
 
-    async def poll(self, batch_size: int = 10):
+        self.redis_groups = self._group_redis_adapters()
+
+    def _group_redis_adapters(self) -> List[EspressoRedisStreamsGroup]:
         """
-        Polls for each input adapter, one item at a time or by cursor pagination.
+        Group Redis Streams inputs by server, consumer group and consumer name.
+
+        Each group of two or more streams shares one connection pool and reads
+        all of its streams with a single XREADGROUP.
+        """
+        by_server: Dict[Tuple, Dict[str, EspressoRedisStreamsInputAdapter]] = {}
+        for adapter in self.adapters.values():
+            if isinstance(adapter, EspressoRedisStreamsInputAdapter):
+                key = (
+                    adapter.host,
+                    adapter.port,
+                    adapter.password,
+                    adapter.db,
+                    adapter.consumer_group,
+                    adapter.consumer_name,
+                )
+                # A second input on the same stream keeps reading on its own
+                by_server.setdefault(key, {}).setdefault(adapter.stream_name, adapter)
+
+        return [
+            EspressoRedisStreamsGroup(list(members.values()))
+            for members in by_server.values()
+            if len(members) > 1
+        ]
+
+    async def _gather(
+        self, calls: Dict[str, Awaitable[Any]], default: Any, bounded: bool = True
+    ):
         """
-        results: Dict[str, List[Any]] = {}
+        Awaits one call per input concurrently, so the total wait is that of the
+        slowest adapter rather than the sum of all of them.
 
-        for input_id, adapter in self.adapters.items():
-            items = await adapter.poll_batch(batch_size=batch_size)
-            if items:
-                results[input_id] = items
+        With bounded, each call is cancelled after poll_timeout_seconds and its
+        input gets the default. Only read-only probes may be bounded: cancelling
+        a poll could drop messages the broker has already handed over.
+        """
 
-        return results
+        async def _bounded(input_id: str, call: Awaitable[Any]) -> Any:
+            if not bounded:
+                return await call
+            try:
+                return await asyncio.wait_for(call, self.poll_timeout_seconds)
+            except asyncio.TimeoutError:
+                logger.warning(
+                    f"Input '{input_id}' did not respond within "
+                    f"{self.poll_timeout_seconds}s"
+                )
+                return default
+
+        results = await asyncio.gather(
+            *(_bounded(input_id, call) for input_id, call in calls.items())
+        )
+        return dict(zip(calls, results))
+
+    async def poll(self, batch_size: int = 10):
+        """
+        Polls for each input adapter, one item at a time or by cursor pagination.
+        """
+        results = await self._gather(
+            {
+                input_id: adapter.poll_batch(batch_size=batch_size)
+                for input_id, adapter in self.adapters.items()
+            },
+            default=[],
+            bounded=False,
+        )
+        return {input_id: items for input_id, items in results.items() if items}
+
+    async def poll_input(self, input_id: str, batch_size: int = 10) -> List[Any]:
+        """
+        Polls a batch from a single input adapter, leaving the others untouched.
+        """
+        adapter = self.adapters.get(input_id)
+        if not adapter:
+            raise ValueError(f"Input ID '{input_id}' not found")
+        return await adapter.poll_batch(batch_size=batch_size) or []
 
     async def poll_all(self) -> Dict[str, List[Any]]:
         """ "
         Polls for each input adapter, all available items.
         """
-        results: Dict[str, List[Any]] = {}
-        for input_id, adapter in self.adapters.items():
-            items = await adapter.poll_all()
-            if items:
-                results[input_id] = items
-        return results
+        results = await self._gather(
+            {
+                input_id: adapter.poll_all()
+                for input_id, adapter in self.adapters.items()
+            },
+            default=[],
+            bounded=False,
+        )
+        return {input_id: items for input_id, items in results.items() if items}
 
     async def has_data(self, input_id: str) -> bool:
         """
@@ -60,6 +143,46 @@ class EspressoInputManager:
             return False
         return await adapter.has_data()
 
+    async def has_data_many(self, input_ids: Iterable[str]) -> Dict[str, bool]:
+        """
+        Check several input adapters for data at once.
+        """
+        input_ids = set(input_ids)
+        results = await self._gather(
+            {
+                input_id: self.adapters[input_id].has_data()
+                for input_id in input_ids
+                if input_id in self.adapters
+            },
+            default=False,
+        )
+        return {input_id: results.get(input_id, False) for input_id in input_ids}
+
+    def start_readers(self, on_data: Callable[[str], None]) -> None:
+        """
+        Start the background reader of every input configured with long_poll.
+
+        on_data is called with the input ID whenever a reader buffers new items.
+        """
+        for input_id, adapter in self.adapters.items():
+            if getattr(adapter, "long_poll", False):
+                adapter.start_reader(lambda input_id=input_id: on_data(input_id))
+
+    async def stop_readers(self) -> None:
+        for adapter in self.adapters.values():
+            if getattr(adapter, "long_poll", False):
+                await adapter.stop_reader()
+
+    def input_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Buffer and recovery counters of every input adapter that reports them.
+        """
+        return {
+            input_id: adapter.stats()
+            for input_id, adapter in self.adapters.items()
+            if hasattr(adapter, "stats")
+        }
+
     async def ack_batch(self, input_id: str, items: List[Any]) -> None:
         """
         Acknowledge a batch of messages after successful processing.
@@ -70,8 +193,7 @@ class EspressoInputManager:
 
         input_type = self.input_types.get(input_id)
         if input_type in ("rabbitmq", "redis_streams"):
-            for item in items:
-                await adapter.ack(item)
+            await adapter.ack_many(items)
 
     async def nack_batch(
         self, input_id: str, items: List[Any], requeue: bool = True
@@ -84,12 +206,8 @@ class EspressoInputManager:
             return
 
         input_type = self.input_types.get(input_id)
-        if input_type == "rabbitmq":
-            for item in items:
-                await adapter.nack(item, requeue=requeue)
-        elif input_type == "redis_streams":
-            for item in items:
-                await adapter.nack(item)
+        if input_type in ("rabbitmq", "redis_streams"):
+            await adapter.nack_many(items, requeue=requeue)
 
     def append_to_input(self, input_id: str, item: Any) -> None:
         if input_id not in self.adapters:
@@ -14,6 +14,10 @@ class EspressoInputAdapter(Protocol):
 
     async def nack(self, item: Any) -> None: ...
 
+    async def ack_many(self, items: List[Any]) -> None: ...
+
+    async def nack_many(self, items: List[Any], requeue: bool = True) -> None: ...
+
     def append_item(self, item: Any) -> None: ...
 
     def append_items(self, items: List[Any]) -> None: ...
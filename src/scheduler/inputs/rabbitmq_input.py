@@ -1,6 +1,8 @@
 import asyncio
 import logging
-from typing import List, Any, Dict, Optional
+import time
+from collections import deque
+from typing import List, Any, Awaitable, Callable, Dict, Optional
 from aio_pika import connect_robust, Channel, Connection
 from aio_pika.abc import AbstractIncomingMessage
 from ..models import EspressoRabbitMQInputDefinition
@@ -17,12 +19,22 @@ class EspressoRabbitMQInputAdapter(EspressoInputAdapter):
         self.url = input_def.url
         self.queue_name = input_def.queue
         self.prefetch_count = input_def.prefetch_count
+        self.consume_mode = input_def.consume_mode
+        self.status_ttl_seconds = input_def.status_ttl_seconds
 
         # Lazy initialization - don't connect yet
         self.connection: Optional[Connection] = None
         self.channel: Optional[Channel] = None
         self.queue = None
         self._is_setup = False
+        # Delivered but not yet settled messages on the current channel, by tag
+        self._unacked: Dict[int, AbstractIncomingMessage] = {}
+        # Consumer deliveries not yet handed to a job, at most prefetch_count
+        self._buffer: deque = deque()
+        self._consumer_tag: Optional[str] = None
+        # Last known number of ready messages in the queue, and when it was read
+        self._ready_count = 0
+        self._ready_checked_at: Optional[float] = None
 
         logger.info(
             f"RabbitMQ adapter initialized for queue '{self.queue_name}' (connection pending)"
@@ -50,10 +62,14 @@ class EspressoRabbitMQInputAdapter(EspressoInputAdapter):
 
                 self.connection = await connect_robust(self.url)
                 self.channel = await self.connection.channel()
+                # Deliveries of the old channel are redelivered by the broker
+                self._unacked = {}
+                self._buffer.clear()
+                self._ready_checked_at = None
 
-                if not self._is_setup:
-                    await self._setup_queue()
-                    self._is_setup = True
+                # QoS and consumers belong to the channel, so set them up again
+                await self._setup_queue()
+                self._is_setup = True
 
                 logger.info(
                     f"✓ Successfully connected to RabbitMQ queue '{self.queue_name}'"
@@ -76,6 +92,17 @@ class EspressoRabbitMQInputAdapter(EspressoInputAdapter):
     async def _setup_queue(self):
         await self.channel.set_qos(prefetch_count=self.prefetch_count)
         self.queue = await self.channel.declare_queue(self.queue_name, durable=True)
+        if self.consume_mode == "consume":
+            self._consumer_tag = await self.queue.consume(self._on_message)
+
+    def _note_ready(self, message_count: int) -> None:
+        self._ready_count = message_count
+        self._ready_checked_at = time.monotonic()
+
+    async def _on_message(self, message: AbstractIncomingMessage) -> None:
+        # QoS stops deliveries at prefetch_count unsettled messages, bounding this
+        self._unacked[message.delivery_tag] = message
+        self._buffer.append(message)
 
     async def _close_quietly(self):
         try:
@@ -107,10 +134,19 @@ class EspressoRabbitMQInputAdapter(EspressoInputAdapter):
             return []
 
         items: List[Dict[str, Any]] = []
+        if self.consume_mode == "consume":
+            while self._buffer and len(items) < batch_size:
+                message = self._buffer.popleft()
+                items.append({"body": message.body, "message": message})
+            return items
+
         try:
             for _ in range(batch_size):
                 message = await self.queue.get(timeout=0.1, fail=False)
+                # basic.get-ok carries the remaining queue depth for free
+                self._note_ready((message.message_count or 0) if message else 0)
                 if message:
+                    self._unacked[message.delivery_tag] = message
                     items.append(
                         {
                             "body": message.body,
@@ -137,26 +173,88 @@ class EspressoRabbitMQInputAdapter(EspressoInputAdapter):
 
         return items
 
+    def _forget(self, message: AbstractIncomingMessage) -> None:
+        if self._unacked.get(message.delivery_tag) is message:
+            del self._unacked[message.delivery_tag]
+
     async def ack(self, msg: Dict[str, Any]) -> None:
         message: AbstractIncomingMessage = msg["message"]
+        self._forget(message)
         await message.ack()
 
     async def nack(self, msg: Dict[str, Any], requeue: bool = True) -> None:
         message: AbstractIncomingMessage = msg["message"]
+        self._forget(message)
         await message.nack(requeue=requeue)
 
+    async def _settle_many(
+        self,
+        msgs: List[Dict[str, Any]],
+        settle: Callable[[AbstractIncomingMessage, bool], Awaitable[None]],
+    ) -> None:
+        """
+        Settle a batch with one multiple-flag frame where that is safe.
+
+        A multiple ack/nack settles every outstanding delivery up to its tag, so it
+        only covers batch tags below the lowest unsettled tag outside the batch.
+        Messages beyond that, or from a previous channel, are settled one by one.
+        """
+        messages: List[AbstractIncomingMessage] = [msg["message"] for msg in msgs]
+        batch = {
+            message.delivery_tag: message
+            for message in messages
+            if self._unacked.get(message.delivery_tag) is message
+        }
+        outside = [tag for tag in self._unacked if tag not in batch]
+        limit = min(outside, default=None)
+        covered = {tag for tag in batch if limit is None or tag < limit}
+
+        if len(covered) > 1:
+            await settle(batch[max(covered)], True)
+            for tag in covered:
+                del self._unacked[tag]
+        else:
+            covered = set()
+
+        for message in messages:
+            if (
+                message.delivery_tag in covered
+                and batch[message.delivery_tag] is message
+            ):
+                continue
+            self._forget(message)
+            await settle(message, False)
+
+    async def ack_many(self, msgs: List[Dict[str, Any]]) -> None:
+        await self._settle_many(
+            msgs, lambda message, multiple: message.ack(multiple=multiple)
+        )
+
+    async def nack_many(self, msgs: List[Dict[str, Any]], requeue: bool = True) -> None:
+        await self._settle_many(
+            msgs,
+            lambda message, multiple: message.nack(multiple=multiple, requeue=requeue),
+        )
+
     async def has_data(self) -> bool:
         if not await self._ensure_connected():
             return False
 
+        # The broker pushes deliveries into the buffer as they arrive and stops
+        # counting them as ready, so the buffer is the whole readiness signal
+        if self.consume_mode == "consume":
+            return bool(self._buffer)
+
+        if (
+            self._ready_checked_at is not None
+            and time.monotonic() - self._ready_checked_at < self.status_ttl_seconds
+        ):
+            return self._ready_count > 0
+
         try:
-            queue = await self.channel.declare_queue(
-                self.queue_name,
-                durable=True,
-                passive=False,  # Re-declare to get fresh metadata
-            )
-            message_count = queue.declaration_result.message_count
-            return message_count > 0
+            queue = await self.channel.declare_queue(self.queue_name, passive=True)
+            self._note_ready(queue.declaration_result.message_count)
+            return self._ready_count > 0
         except Exception as e:
             logger.error(f"Error checking queue status: {e}")
             await self._close_quietly()
@@ -164,6 +262,9 @@ class EspressoRabbitMQInputAdapter(EspressoInputAdapter):
 
     async def close(self) -> None:
         try:
+            if self._consumer_tag and self.channel and not self.channel.is_closed:
+                await self.queue.cancel(self._consumer_tag)
+            self._consumer_tag = None
             if self.channel:
                 await self.channel.close()
         finally:
@@ -1,6 +1,8 @@
 import asyncio
 import logging
-from typing import List, Any, Dict, Optional, AsyncIterator
+import time
+from collections import deque
+from typing import List, Any, Callable, Dict, Optional, AsyncIterator, Set, Tuple
 import redis.asyncio as redis
 from redis.exceptions import ResponseError
 from ..models import EspressoRedisStreamsInputDefinition
@@ -9,6 +11,12 @@ from .base import EspressoInputAdapter
 logger = logging.getLogger(__name__)
 
 
+def _stream_id(message_id: str) -> Tuple[int, int]:
+    """Parse a stream ID such as "1637012345678-0" into a comparable tuple."""
+    milliseconds, _, sequence = message_id.partition("-")
+    return int(milliseconds), int(sequence or 0)
+
+
 class EspressoRedisStreamsInputAdapter(EspressoInputAdapter):
     def __init__(self, input_def: EspressoRedisStreamsInputDefinition):
         # Store configuration
@@ -20,10 +28,36 @@ class EspressoRedisStreamsInputAdapter(EspressoInputAdapter):
         self.consumer_group = input_def.consumer_group
         self.consumer_name = input_def.consumer_name
         self.start_id = input_def.start_id
+        self.health_check_interval = input_def.health_check_interval
+        self.long_poll = input_def.long_poll
+        self.block_ms = input_def.block_ms
+        self.buffer_size = input_def.buffer_size
+        self.claim_min_idle_ms = input_def.claim_min_idle_ms
+        self.claim_interval_seconds = input_def.claim_interval_seconds
+        self.claim_count = input_def.claim_count
+        self.retention = input_def.retention
+        self.retention_maxlen = input_def.retention_maxlen
+        self.retention_age_seconds = input_def.retention_age_seconds
+        self.trim_interval_seconds = input_def.trim_interval_seconds
 
         # Lazy initialization
         self.redis_client: Optional[redis.Redis] = None
         self._is_setup = False
+        # Messages already read into this consumer's PEL but not yet handed out
+        self._buffer: deque = deque()
+        self._reader: Optional[asyncio.Task] = None
+        self._buffer_space = asyncio.Event()
+        # IDs handed to a job and not yet acked or nacked
+        self._in_flight: Set[str] = set()
+        # None claims on first use, recovering what a previous process left behind
+        self._last_claim: Optional[float] = None
+        self.reclaimed_total = 0
+        self.deleted_total = 0
+        self._trimmer: Optional[asyncio.Task] = None
+        self._last_trim: Optional[float] = None
+        self.trimmed_total = 0
+        # Set when the input manager groups this adapter with others on its server
+        self._group: Optional["EspressoRedisStreamsGroup"] = None
 
         logger.info(
             f"Redis Streams adapter initialized for stream '{self.stream_name}' "
@@ -33,26 +67,35 @@ class EspressoRedisStreamsInputAdapter(EspressoInputAdapter):
     async def _ensure_connected(
         self, max_retries: int = 3, retry_delay: float = 2.0
     ) -> bool:
-        if self.redis_client:
+        # Stale pooled connections are detected by the pool's health check, so
+        # there is no PING per call; failed commands drop the client instead
+        if self.redis_client is None and self._group and self._group.redis_client:
+            # Another input of the group already connected the shared pool
+            self.redis_client = self._group.redis_client
             try:
-                await self.redis_client.ping()
-                return True
-            except Exception:
-                await self._close_quietly()
+                if not self._is_setup:
+                    await self._setup_consumer_group()
+                    self._is_setup = True
+            except Exception as e:
+                logger.warning(
+                    f"Consumer group setup on '{self.stream_name}' failed: {e}"
+                )
+                self.redis_client = None
+                return False
+
+        if self.redis_client:
+            return True
 
         for attempt in range(1, max_retries + 1):
             try:
                 logger.info(f"Connecting to Redis (attempt {attempt}/{max_retries})...")
 
-                self.redis_client = redis.Redis(
-                    host=self.host,
-                    port=self.port,
-                    password=self.password,
-                    db=self.db,
-                    decode_responses=True,
-                )
+                client = self._connect(health_check_interval=self.health_check_interval)
 
-                await self.redis_client.ping()
+                await client.ping()
+                self.redis_client = client
+                if self._group is not None:
+                    self._group.redis_client = client
 
                 if not self._is_setup:
                     await self._setup_consumer_group()
@@ -91,12 +134,191 @@ class EspressoRedisStreamsInputAdapter(EspressoInputAdapter):
             else:
                 raise
 
+    def _connect(self, **kwargs: Any) -> redis.Redis:
+        return redis.Redis(
+            host=self.host,
+            port=self.port,
+            password=self.password,
+            db=self.db,
+            decode_responses=True,
+            **kwargs,
+        )
+
+    async def _read_group(
+        self, client: redis.Redis, count: int, block: Optional[int]
+    ) -> List[Dict[str, Any]]:
+        if self._group is not None:
+            return await self._group.read_for(self, client, count, block)
+
+        # XREADGROUP returns: [('stream_name', [('msg_id', {'field': 'value'}), ...])]
+        response = await client.xreadgroup(
+            groupname=self.consumer_group,
+            consumername=self.consumer_name,
+            streams={self.stream_name: ">"},
+            count=count,
+            block=block,
+        )
+        return [
+            {"id": message_id, "data": data, "stream": stream_name}
+            for stream_name, messages in response or []
+            for message_id, data in messages
+        ]
+
+    async def reclaim_pending(self) -> List[Dict[str, Any]]:
+        """
+        Claim entries pending for at least claim_min_idle_ms with XAUTOCLAIM.
+
+        This recovers messages of crashed consumers as well as this consumer's own
+        nacked ones, claim_count at a time until the PEL has been scanned or a full
+        buffer has been recovered. Each item carries its delivery_count.
+        """
+        items: List[Dict[str, Any]] = []
+        # Entries already held here are only re-claimed to reset their idle time
+        held = self._in_flight | {item["id"] for item in self._buffer}
+        start_id = "0-0"
+        while len(items) < self.buffer_size:
+            response = await self.redis_client.xautoclaim(
+                self.stream_name,
+                self.consumer_group,
+                self.consumer_name,
+                min_idle_time=self.claim_min_idle_ms,
+                start_id=start_id,
+                count=self.claim_count,
+            )
+            start_id, messages = response[0], response[1]
+
+            # Entries trimmed from the stream: Redis 7 drops them from the PEL and
+            # lists their IDs, Redis 6.2 claims them with no data
+            trimmed = [message_id for message_id, data in messages if data is None]
+            if trimmed:
+                await self.redis_client.xack(
+                    self.stream_name, self.consumer_group, *trimmed
+                )
+            self.deleted_total += len(trimmed) + len(
+                response[2] if len(response) > 2 else []
+            )
+
+            # A job still working on an entry, or one buffered for a job, keeps it
+            items.extend(
+                {"id": message_id, "data": data, "stream": self.stream_name}
+                for message_id, data in messages
+                if data is not None and message_id not in held
+            )
+            if start_id in ("0-0", "0"):
+                break
+
+        if items:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for item in items:
+                    pipe.xpending_range(
+                        self.stream_name,
+                        self.consumer_group,
+                        min=item["id"],
+                        max=item["id"],
+                        count=1,
+                    )
+                pending = await pipe.execute()
+            for item, entry in zip(items, pending):
+                item["delivery_count"] = entry[0]["times_delivered"] if entry else None
+
+            self.reclaimed_total += len(items)
+            logger.info(
+                f"Reclaimed {len(items)} pending messages on stream "
+                f"'{self.stream_name}'"
+            )
+
+        return items
+
+    async def _reclaim_if_due(self) -> List[Dict[str, Any]]:
+        if (
+            self._last_claim is not None
+            and time.monotonic() - self._last_claim < self.claim_interval_seconds
+        ):
+            return []
+        self._last_claim = time.monotonic()
+
+        try:
+            return await self.reclaim_pending()
+        except Exception as e:
+            logger.error(f"Error reclaiming pending messages: {e}")
+            return []
+
+    async def _reclaim_into_buffer(self) -> None:
+        self._buffer.extend(await self._reclaim_if_due())
+
+    async def _retention_minid(self) -> Optional[str]:
+        if self.retention == "age":
+            cutoff = int((time.time() - self.retention_age_seconds) * 1000)
+            return f"{max(cutoff, 0)}-0"
+
+        # Keep what any group on the stream has not read, or read and not acked
+        floors = []
+        for group in await self.redis_client.xinfo_groups(self.stream_name):
+            floors.append(group["last-delivered-id"])
+            if group["pending"]:
+                summary = await self.redis_client.xpending(
+                    self.stream_name, group["name"]
+                )
+                floors.append(summary["min"])
+        return min(floors, key=_stream_id) if floors else None
+
+    async def trim(self) -> int:
+        """
+        Trim the stream according to the retention policy.
+
+        Trimming is approximate (~): Redis only drops whole macro nodes, which
+        is cheap, and may keep a few entries past the limit. Returns the
+        number of entries removed.
+        """
+        if self.retention == "maxlen":
+            trimmed = await self.redis_client.xtrim(
+                self.stream_name, maxlen=self.retention_maxlen, approximate=True
+            )
+        else:
+            minid = await self._retention_minid()
+            if minid is None:
+                return 0
+            trimmed = await self.redis_client.xtrim(
+                self.stream_name, minid=minid, approximate=True
+            )
+
+        self.trimmed_total += trimmed
+        return trimmed
+
+    async def _trim_quietly(self) -> None:
+        try:
+            trimmed = await self.trim()
+            if trimmed:
+                logger.debug(f"Trimmed {trimmed} entries from '{self.stream_name}'")
+        except Exception as e:
+            logger.error(f"Error trimming stream '{self.stream_name}': {e}")
+
+    def _trim_if_due(self) -> None:
+        """Start a trim in the background, so polling never waits for one."""
+        if self.retention == "none" or self.redis_client is None:
+            return
+        if self._trimmer is not None and not self._trimmer.done():
+            return
+        if (
+            self._last_trim is not None
+            and time.monotonic() - self._last_trim < self.trim_interval_seconds
+        ):
+            return
+        self._last_trim = time.monotonic()
+        self._trimmer = asyncio.create_task(self._trim_quietly())
+
     async def _close_quietly(self):
+        if self._group is not None:
+            # The pool is shared: close it once and make every member reconnect
+            await self._group.drop_client(self.redis_client)
+            return
+
         try:
             if self.redis_client:
                 await self.redis_client.close()
         except Exception:
             pass
+        self.redis_client = None
 
     async def poll(self) -> List[Dict[str, Any]]:
         return await self.poll_batch(batch_size=1)
@@ -117,29 +339,39 @@ class EspressoRedisStreamsInputAdapter(EspressoInputAdapter):
             logger.warning("Cannot poll: Redis connection unavailable")
             return []
 
-        items: List[Dict[str, Any]] = []
+        self._trim_if_due()
         try:
-            # XREADGROUP returns: [('stream_name', [('msg_id', {'field': 'value'}), ...])]
-            response = await self.redis_client.xreadgroup(
-                groupname=self.consumer_group,
-                consumername=self.consumer_name,
-                streams={self.stream_name: ">"},
-                count=batch_size,
-                block=100,  # Block for 100ms if no messages
-            )
-
-            if response:
-                for stream_name, messages in response:
-                    for message_id, data in messages:
-                        items.append(
-                            {"id": message_id, "data": data, "stream": stream_name}
-                        )
+            # The background reader, when running, does all the reading
+            if self._reader is None:
+                self._buffer.extend(await self._reclaim_if_due())
+
+            # A grouped read that already filled the buffer saves a round trip
+            grouped_hit = self._group is not None and self._buffer
+            if (
+                self._reader is None
+                and len(self._buffer) < batch_size
+                and not grouped_hit
+            ):
+                # Buffer before returning so a claimed message is never dropped
+                self._buffer.extend(
+                    await self._read_group(
+                        self.redis_client,
+                        batch_size - len(self._buffer),
+                        # Block for 100ms if no messages, unless some are buffered
+                        None if self._buffer else 100,
+                    )
+                )
 
         except Exception as e:
             logger.error(f"Error polling messages: {e}", exc_info=True)
             await self._close_quietly()
 
-        return items
+        batch = [
+            self._buffer.popleft() for _ in range(min(batch_size, len(self._buffer)))
+        ]
+        self._in_flight.update(item["id"] for item in batch)
+        self._buffer_space.set()
+        return batch
 
     async def poll_all(self) -> List[Dict[str, Any]]:
         """Get all available messages at once."""
@@ -154,37 +386,117 @@ class EspressoRedisStreamsInputAdapter(EspressoInputAdapter):
         return items
 
     async def poll_stream(
-        self, batch_size: int = 10
+        self, batch_size: int = 10, block_ms: Optional[int] = None
     ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Yield batches until the stream is drained.
+
+        With block_ms, hold a blocking XREADGROUP open on a dedicated connection
+        instead and keep yielding batches as they arrive, never stopping.
+        """
+        if block_ms is None:
+            while True:
+                batch = await self.poll_batch(batch_size=batch_size)
+                if not batch:
+                    break
+                yield batch
+            return
+
+        if not await self._ensure_connected():
+            raise ConnectionError("Redis connection unavailable")
+
+        client = self._connect(single_connection_client=True)
+        try:
+            while True:
+                reclaimed = await self._reclaim_if_due()
+                if reclaimed:
+                    yield reclaimed
+
+                batch = await self._read_group(client, batch_size, block_ms)
+                if batch:
+                    yield batch
+        finally:
+            await client.close()
+
+    def start_reader(self, on_data: Callable[[], None]) -> None:
+        """
+        Start reading in the background into a buffer of at most buffer_size.
+
+        on_data is called whenever a batch arrives, so the scheduler can start
+        the input's jobs right away instead of on its next tick.
+        """
+        if self._group is not None:
+            self._group.start_reader(self, on_data)
+        elif self._reader is None:
+            self._reader = asyncio.create_task(self._reader_loop(on_data))
+            logger.info(f"Background reader started for stream '{self.stream_name}'")
+
+    async def _reader_loop(self, on_data: Callable[[], None]) -> None:
+        read_size = max(1, self.buffer_size // 2)
         while True:
-            batch = await self.poll_batch(batch_size=batch_size)
-            if not batch:
-                break
-            yield batch
+            try:
+                async for batch in self.poll_stream(read_size, block_ms=self.block_ms):
+                    self._buffer.extend(batch)
+                    on_data()
+
+                    # Read again only once a full read fits in the buffer
+                    while len(self._buffer) > self.buffer_size - read_size:
+                        self._buffer_space.clear()
+                        await self._buffer_space.wait()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Background reader for '{self.stream_name}' failed: {e}")
+                await asyncio.sleep(1)
+
+    async def stop_reader(self) -> None:
+        if self._reader is not None:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except asyncio.CancelledError:
+                pass
+            self._reader = None
 
     async def has_data(self) -> bool:
+        """
+        Check for undelivered messages without reading any.
+
+        Uses the consumer group's lag from XINFO GROUPS, falling back to comparing
+        its last-delivered ID with the newest entry where lag is unknown.
+        """
+        if self._buffer:
+            return True
+
+        # Every new message passes through the background reader's buffer
+        if self._reader is not None:
+            return False
+
         if not await self._ensure_connected():
             return False
 
-        try:
-            # Check pending messages for this consumer group
-            pending_info = await self.redis_client.xpending(
-                name=self.stream_name, groupname=self.consumer_group
-            )
+        self._trim_if_due()
+        # Recovered entries are ready even when nothing new was added. Shielded
+        # because has_data_many may cancel this probe, and entries XAUTOCLAIM
+        # already assigned to us must still reach the buffer
+        await asyncio.shield(self._reclaim_into_buffer())
+        if self._buffer:
+            return True
 
-            if pending_info and pending_info.get("pending", 0) > 0:
-                return True
+        try:
+            groups = await self.redis_client.xinfo_groups(self.stream_name)
+            group = next((g for g in groups if g["name"] == self.consumer_group), None)
+            if group is None:
+                return False
 
-            # Also check for new messages
-            response = await self.redis_client.xreadgroup(
-                groupname=self.consumer_group,
-                consumername=self.consumer_name,
-                streams={self.stream_name: ">"},
-                count=1,
-                block=0,  # Non-blocking
-            )
+            # Redis 7+; None after deletions or trims make it undeterminable
+            if group.get("lag") is not None:
+                return group["lag"] > 0
 
-            return bool(response and response[0][1])
+            newest = await self.redis_client.xrevrange(self.stream_name, count=1)
+            if not newest:
+                return False
+            return _stream_id(newest[0][0]) > _stream_id(group["last-delivered-id"])
 
         except Exception as e:
             logger.error(f"Error checking stream status: {e}")
@@ -196,6 +508,7 @@ class EspressoRedisStreamsInputAdapter(EspressoInputAdapter):
             logger.warning("Cannot ACK: Redis connection unavailable")
             return
 
+        self._in_flight.discard(msg["id"])
         try:
             message_id = msg["id"]
             stream_name = msg.get("stream", self.stream_name)
@@ -204,14 +517,222 @@ class EspressoRedisStreamsInputAdapter(EspressoInputAdapter):
         except Exception as e:
             logger.error(f"Error acknowledging message: {e}")
 
+    async def ack_many(self, msgs: List[Dict[str, Any]]) -> None:
+        """Acknowledge a batch with one multi-ID XACK per stream, pipelined."""
+        if not msgs:
+            return
+
+        if not await self._ensure_connected():
+            logger.warning("Cannot ACK: Redis connection unavailable")
+            return
+
+        ids_by_stream: Dict[str, List[str]] = {}
+        for msg in msgs:
+            self._in_flight.discard(msg["id"])
+            stream_name = msg.get("stream", self.stream_name)
+            ids_by_stream.setdefault(stream_name, []).append(msg["id"])
+
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for stream_name, message_ids in ids_by_stream.items():
+                    pipe.xack(stream_name, self.consumer_group, *message_ids)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"Error acknowledging {len(msgs)} messages: {e}")
+
     async def nack(self, msg: Dict[str, Any]) -> None:
-        logger.warning(
-            f"NACK called for message {msg.get('id')}. "
-            "Redis Streams doesn't support NACK - message remains pending."
-        )
+        await self.nack_many([msg])
+
+    async def nack_many(self, msgs: List[Dict[str, Any]], requeue: bool = True) -> None:
+        """
+        Leave messages pending so reclaim_pending redelivers them.
+
+        Redis Streams has no NACK; once a message has idled for claim_min_idle_ms
+        it is claimed again, by this consumer or another one.
+        """
+        for msg in msgs:
+            self._in_flight.discard(msg["id"])
+        if msgs:
+            logger.warning(
+                f"NACK called for {len(msgs)} messages, redelivering them after "
+                f"{self.claim_min_idle_ms}ms idle"
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "buffered": len(self._buffer),
+            "in_flight": len(self._in_flight),
+            "reclaimed_total": self.reclaimed_total,
+            "deleted_total": self.deleted_total,
+            "trimmed_total": self.trimmed_total,
+        }
 
     async def close(self) -> None:
         """Close the Redis connection."""
-        if self.redis_client:
-            await self.redis_client.close()
-            logger.info("Redis connection closed")
+        await self.stop_reader()
+        if self._trimmer is not None:
+            self._trimmer.cancel()
+        client, self.redis_client = self.redis_client, None
+        if client is None:
+            return
+        if self._group is not None:
+            # The pool is shared: only the last member using it closes it
+            members = self._group.adapters.values()
+            if any(adapter.redis_client is client for adapter in members):
+                return
+            if self._group.redis_client is client:
+                self._group.redis_client = None
+        await client.close()
+        logger.info("Redis connection closed")
+
+
+def _parse_streams(response: Any) -> Dict[str, List[Dict[str, Any]]]:
+    """Map an XREADGROUP response to message dicts per stream."""
+    return {
+        stream_name: [
+            {"id": message_id, "data": data, "stream": stream_name}
+            for message_id, data in messages
+        ]
+        for stream_name, messages in response or []
+    }
+
+
+class EspressoRedisStreamsGroup:
+    """
+    Redis Streams inputs that share a server, consumer group and consumer.
+
+    Members share one connection pool, and a read for any of them is a single
+    multi-stream XREADGROUP that also fills the other members' buffers. Inputs
+    with long_poll share one background reader on one dedicated connection.
+    """
+
+    def __init__(self, adapters: List[EspressoRedisStreamsInputAdapter]):
+        self.adapters = {adapter.stream_name: adapter for adapter in adapters}
+        self.consumer_group = adapters[0].consumer_group
+        self.consumer_name = adapters[0].consumer_name
+        self.redis_client: Optional[redis.Redis] = None
+        self._lock = asyncio.Lock()
+        self._buffer_space = asyncio.Event()
+        self._reader: Optional[asyncio.Task] = None
+        self._on_data: Dict[str, Callable[[], None]] = {}
+
+        for adapter in adapters:
+            adapter._group = self
+            adapter._buffer_space = self._buffer_space
+
+        logger.info(
+            f"Grouped {len(adapters)} Redis streams into one reader "
+            f"(group: {self.consumer_group}, consumer: {self.consumer_name})"
+        )
+
+    async def drop_client(self, client: Optional[redis.Redis]) -> None:
+        """Close a failed shared pool and detach it from the group and its members."""
+        for adapter in self.adapters.values():
+            if adapter.redis_client is client:
+                adapter.redis_client = None
+        if self.redis_client is client:
+            self.redis_client = None
+
+        try:
+            if client:
+                await client.close()
+        except Exception:
+            pass
+
+    async def _xreadgroup(
+        self, client: redis.Redis, streams: List[str], count: int, block: Optional[int]
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        response = await client.xreadgroup(
+            groupname=self.consumer_group,
+            consumername=self.consumer_name,
+            streams={stream_name: ">" for stream_name in streams},
+            count=count,
+            block=block,
+        )
+        return _parse_streams(response)
+
+    async def read_for(
+        self,
+        requester: EspressoRedisStreamsInputAdapter,
+        client: redis.Redis,
+        count: int,
+        block: Optional[int],
+    ) -> List[Dict[str, Any]]:
+        """
+        Read for one member, topping up every other polled member on the way.
+
+        Only members with room for a full read, no background reader and a
+        consumer group in place are included besides the requester.
+        """
+        streams = [requester.stream_name] + [
+            adapter.stream_name
+            for adapter in self.adapters.values()
+            if adapter is not requester
+            and adapter._is_setup
+            and adapter._reader is None
+            and len(adapter._buffer) + count <= adapter.buffer_size
+        ]
+
+        async with self._lock:
+            batches = await self._xreadgroup(client, streams, count, block)
+
+        for stream_name, items in batches.items():
+            if stream_name != requester.stream_name:
+                self.adapters[stream_name]._buffer.extend(items)
+        return batches.get(requester.stream_name, [])
+
+    def start_reader(
+        self, adapter: EspressoRedisStreamsInputAdapter, on_data: Callable[[], None]
+    ) -> None:
+        """Add a member to the shared background reader, starting it if needed."""
+        self._on_data[adapter.stream_name] = on_data
+        if self._reader is None:
+            self._reader = asyncio.create_task(self._reader_loop(adapter))
+            logger.info(
+                f"Background reader started for Redis consumer group "
+                f"'{self.consumer_group}'"
+            )
+        adapter._reader = self._reader
+
+    async def _reader_loop(self, first: EspressoRedisStreamsInputAdapter) -> None:
+        read_size = max(1, first.buffer_size // 2)
+        client = first._connect(single_connection_client=True)
+        try:
+            while True:
+                try:
+                    members = [self.adapters[name] for name in self._on_data]
+                    for adapter in members:
+                        if not await adapter._ensure_connected():
+                            raise ConnectionError("Redis connection unavailable")
+                        reclaimed = await adapter._reclaim_if_due()
+                        if reclaimed:
+                            adapter._buffer.extend(reclaimed)
+                            self._on_data[adapter.stream_name]()
+
+                    # Read again only for streams a full read fits in
+                    streams = [
+                        adapter.stream_name
+                        for adapter in members
+                        if len(adapter._buffer) + read_size <= adapter.buffer_size
+                    ]
+                    if not streams:
+                        self._buffer_space.clear()
+                        await self._buffer_space.wait()
+                        continue
+
+                    batches = await self._xreadgroup(
+                        client, streams, read_size, first.block_ms
+                    )
+                    for stream_name, items in batches.items():
+                        self.adapters[stream_name]._buffer.extend(items)
+                        self._on_data[stream_name]()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(
+                        f"Background reader for consumer group "
+                        f"'{self.consumer_group}' failed: {e}"
+                    )
+                    await asyncio.sleep(1)
+        finally:
+            await client.close()
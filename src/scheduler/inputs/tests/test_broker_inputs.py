@@ -0,0 +1,552 @@
+"""Tests for the RabbitMQ and Redis Streams input adapters."""
+
+import pytest
+import asyncio
+from types import SimpleNamespace
+from scheduler.inputs.rabbitmq_input import EspressoRabbitMQInputAdapter
+from scheduler.input_manager import EspressoInputManager
+from scheduler.inputs.redis_input import EspressoRedisStreamsInputAdapter, _stream_id
+from scheduler.models import (
+    EspressoRabbitMQInputDefinition,
+    EspressoRedisStreamsInputDefinition,
+)
+
+
+class FakeMessage:
+    """Records basic.ack/basic.nack frames instead of sending them."""
+
+    def __init__(self, delivery_tag, frames):
+        self.delivery_tag = delivery_tag
+        self.frames = frames
+        self.body = str(delivery_tag).encode()
+
+    async def ack(self, multiple=False):
+        self.frames.append(("ack", self.delivery_tag, multiple))
+
+    async def nack(self, multiple=False, requeue=True):
+        self.frames.append(("nack", self.delivery_tag, multiple))
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = redis.commands
+        self.results = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def xack(self, stream_name, group, *ids):
+        self.commands.append(("XACK", stream_name, group, *ids))
+        self.results.append(len(ids))
+
+    def xpending_range(self, name, groupname, min, max, count):
+        entry = self.redis.pending.get(min)
+        self.results.append(
+            [{"message_id": min, "times_delivered": entry[1]}] if entry else []
+        )
+
+    async def execute(self):
+        self.commands.append(("EXEC",))
+        return self.results
+
+
+class FakeRedis:
+    def __init__(self, groups=(), entries=(), pending=None):
+        self.commands = []
+        self.groups = list(groups)
+        self.entries = list(entries)
+        # Idle pending entries by ID: (fields, times delivered)
+        self.pending = dict(pending or {})
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def xautoclaim(
+        self, name, groupname, consumername, min_idle_time, start_id, count
+    ):
+        self.commands.append(("XAUTOCLAIM", start_id, count))
+        ids = sorted(i for i in self.pending if _stream_id(i) >= _stream_id(start_id))
+        page, rest = ids[:count], ids[count:]
+        for message_id in page:
+            data, deliveries = self.pending[message_id]
+            self.pending[message_id] = (data, deliveries + 1)
+        claimed = [(message_id, self.pending[message_id][0]) for message_id in page]
+        return [rest[0] if rest else "0-0", claimed, []]
+
+    async def xack(self, name, groupname, *ids):
+        self.commands.append(("XACK", name, groupname, *ids))
+        for message_id in ids:
+            self.pending.pop(message_id, None)
+
+    async def close(self):
+        self.closed = True
+
+    async def xgroup_create(self, name, groupname, id, mkstream):
+        self.commands.append(("XGROUP CREATE", name, groupname))
+
+    async def xpending(self, name, groupname):
+        self.commands.append(("XPENDING", groupname))
+        return {"pending": len(self.pending), "min": min(self.pending, key=_stream_id)}
+
+    async def xtrim(self, name, maxlen=None, approximate=True, minid=None):
+        self.commands.append(("XTRIM", maxlen, minid, approximate))
+        return 7
+
+    async def xinfo_groups(self, name):
+        self.commands.append(("XINFO GROUPS", name))
+        return self.groups
+
+    async def xrevrange(self, name, max="+", min="-", count=None):
+        self.commands.append(("XREVRANGE", name))
+        return list(reversed(self.entries))[:count]
+
+    async def xreadgroup(self, groupname, consumername, streams, count, block):
+        self.commands.append(("XREADGROUP", count, block))
+        waited = 0
+        while block and not self.entries and waited < block:
+            await asyncio.sleep(0.005)
+            waited += 5
+        batch, self.entries = self.entries[:count], self.entries[count:]
+        return [(name, batch) for name in streams] if batch else []
+
+
+def _redis_adapter(client):
+    adapter = EspressoRedisStreamsInputAdapter(
+        EspressoRedisStreamsInputDefinition(
+            id="redis", type="redis_streams", stream_name="events"
+        )
+    )
+    adapter.redis_client = client
+    return adapter
+
+
+def _rabbitmq_adapter(tags):
+    adapter = EspressoRabbitMQInputAdapter(
+        EspressoRabbitMQInputDefinition(
+            id="rabbit", type="rabbitmq", url="amqp://localhost", queue="jobs"
+        )
+    )
+    frames = []
+    items = []
+    for tag in tags:
+        message = FakeMessage(tag, frames)
+        adapter._unacked[tag] = message
+        items.append({"body": b"", "message": message})
+    return adapter, items, frames
+
+
+@pytest.mark.asyncio
+async def test_rabbitmq_ack_many_sends_one_multiple_ack():
+    adapter, items, frames = _rabbitmq_adapter([1, 2, 3, 4])
+
+    await adapter.ack_many(items)
+
+    assert frames == [("ack", 4, True)]
+    assert adapter._unacked == {}
+
+
+@pytest.mark.asyncio
+async def test_rabbitmq_ack_many_skips_other_outstanding_deliveries():
+    """Test that a multiple ack never covers a delivery outside the batch."""
+    adapter, items, frames = _rabbitmq_adapter([1, 2, 3, 4, 5])
+
+    await adapter.ack_many([items[0], items[1], items[3]])
+
+    assert frames == [("ack", 2, True), ("ack", 4, False)]
+    assert list(adapter._unacked) == [3, 5]
+
+
+@pytest.mark.asyncio
+async def test_rabbitmq_nack_many():
+    adapter, items, frames = _rabbitmq_adapter([7, 8])
+
+    await adapter.nack_many(items, requeue=True)
+
+    assert frames == [("nack", 8, True)]
+
+
+@pytest.mark.asyncio
+async def test_rabbitmq_consume_mode_drains_buffer():
+    """Test that consumer deliveries are buffered and polled without a round trip."""
+    adapter = EspressoRabbitMQInputAdapter(
+        EspressoRabbitMQInputDefinition(
+            id="rabbit",
+            type="rabbitmq",
+            url="amqp://localhost",
+            queue="jobs",
+            consume_mode="consume",
+        )
+    )
+
+    async def connected():
+        return True
+
+    adapter._ensure_connected = connected
+    frames = []
+    for tag in (1, 2, 3):
+        await adapter._on_message(FakeMessage(tag, frames))
+
+    assert await adapter.has_data()
+    batch = await adapter.poll_batch(batch_size=2)
+    assert [item["body"] for item in batch] == [b"1", b"2"]
+
+    await adapter.ack_many(batch)
+    assert frames == [("ack", 2, True)]
+    assert [item["body"] for item in await adapter.poll_batch(batch_size=2)] == [b"3"]
+    assert await adapter.poll_batch(batch_size=2) == []
+
+
+class FakeChannel:
+    """Answers passive queue declares with a fixed depth, counting the RPCs."""
+
+    def __init__(self, message_count):
+        self.message_count = message_count
+        self.declares = 0
+
+    async def declare_queue(self, name, passive=False, **kwargs):
+        self.declares += 1
+        return SimpleNamespace(
+            declaration_result=SimpleNamespace(message_count=self.message_count)
+        )
+
+
+@pytest.mark.asyncio
+async def test_rabbitmq_has_data_caches_queue_depth():
+    adapter, _, _ = _rabbitmq_adapter([])
+    adapter.channel = FakeChannel(message_count=3)
+
+    async def connected():
+        return True
+
+    adapter._ensure_connected = connected
+
+    assert await adapter.has_data()
+    assert await adapter.has_data()
+    assert adapter.channel.declares == 1
+
+    adapter._ready_checked_at -= adapter.status_ttl_seconds
+    adapter.channel.message_count = 0
+    assert not await adapter.has_data()
+    assert adapter.channel.declares == 2
+
+
+@pytest.mark.asyncio
+async def test_rabbitmq_consume_mode_has_data_needs_no_broker_call():
+    adapter, _, frames = _rabbitmq_adapter([])
+    adapter.consume_mode = "consume"
+    adapter.channel = FakeChannel(message_count=3)
+
+    async def connected():
+        return True
+
+    adapter._ensure_connected = connected
+
+    assert not await adapter.has_data()
+    await adapter._on_message(FakeMessage(1, frames))
+    assert await adapter.has_data()
+    assert adapter.channel.declares == 0
+
+
+@pytest.mark.asyncio
+async def test_redis_ack_many_uses_one_xack_per_stream():
+    adapter = _redis_adapter(FakeRedis())
+
+    await adapter.ack_many(
+        [
+            {"id": "1-0", "data": {}, "stream": "events"},
+            {"id": "2-0", "data": {}, "stream": "events"},
+            {"id": "3-0", "data": {}, "stream": "other"},
+        ]
+    )
+
+    assert adapter.redis_client.commands == [
+        ("XACK", "events", "espresso_group", "1-0", "2-0"),
+        ("XACK", "other", "espresso_group", "3-0"),
+        ("EXEC",),
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "group,entries,expected",
+    [
+        ({"lag": 2}, [], True),
+        ({"lag": 0}, [("5-0", {})], False),
+        ({"lag": None, "last-delivered-id": "5-0"}, [("5-1", {})], True),
+        ({"lag": None, "last-delivered-id": "5-1"}, [("5-1", {})], False),
+    ],
+)
+async def test_redis_has_data_reads_nothing(group, entries, expected):
+    """Test that readiness comes from group metadata, never from XREADGROUP."""
+    client = FakeRedis(groups=[{"name": "espresso_group", **group}], entries=entries)
+    adapter = _redis_adapter(client)
+
+    assert await adapter.has_data() is expected
+    assert not any(command[0] == "XREADGROUP" for command in client.commands)
+
+
+@pytest.mark.asyncio
+async def test_redis_poll_batch_serves_buffer_first():
+    client = FakeRedis(entries=[(f"{i}-0", {"n": i}) for i in range(1, 4)])
+    adapter = _redis_adapter(client)
+    adapter._buffer.append({"id": "0-1", "data": {}, "stream": "events"})
+
+    batch = await adapter.poll_batch(batch_size=3)
+
+    assert [item["id"] for item in batch] == ["0-1", "1-0", "2-0"]
+    assert client.commands == [("XAUTOCLAIM", "0-0", 100), ("XREADGROUP", 2, None)]
+
+
+@pytest.mark.asyncio
+async def test_redis_background_reader_buffers_and_wakes():
+    """Test that the reader pushes arrivals into a bounded buffer and signals them."""
+    client = FakeRedis()
+    adapter = _redis_adapter(client)
+    adapter.buffer_size = 4
+    adapter._connect = lambda **kwargs: client
+    arrivals = []
+
+    adapter.start_reader(lambda: arrivals.append(len(adapter._buffer)))
+    try:
+        await asyncio.sleep(0.02)
+        assert not await adapter.has_data()
+
+        client.entries = [(f"{i}-0", {"n": i}) for i in range(1, 11)]
+        await asyncio.sleep(0.05)
+        assert arrivals
+        assert len(adapter._buffer) <= adapter.buffer_size
+
+        received = []
+        while len(received) < 10:
+            received.extend(await adapter.poll_batch(batch_size=3))
+            await asyncio.sleep(0.01)
+    finally:
+        await adapter.stop_reader()
+
+    assert [item["id"] for item in received] == [f"{i}-0" for i in range(1, 11)]
+    assert max(arrivals) <= adapter.buffer_size
+
+
+@pytest.mark.asyncio
+async def test_redis_reclaims_idle_pending_entries_in_pages():
+    """Test that idle entries are claimed page by page, skipping in-flight ones."""
+    client = FakeRedis(
+        pending={
+            "1-0": ({"n": 1}, 1),
+            "2-0": ({"n": 2}, 3),
+            "3-0": (None, 1),
+            "4-0": ({"n": 4}, 1),
+        }
+    )
+    adapter = _redis_adapter(client)
+    adapter.claim_count = 2
+    adapter._in_flight.add("4-0")
+
+    assert await adapter.has_data()
+    batch = await adapter.poll_batch(batch_size=10)
+
+    assert [(item["id"], item["delivery_count"]) for item in batch] == [
+        ("1-0", 2),
+        ("2-0", 4),
+    ]
+    assert ("XACK", "events", "espresso_group", "3-0") in client.commands
+    assert [c for c in client.commands if c[0] == "XAUTOCLAIM"] == [
+        ("XAUTOCLAIM", "0-0", 2),
+        ("XAUTOCLAIM", "3-0", 2),
+    ]
+    assert adapter.stats()["reclaimed_total"] == 2
+    assert adapter.stats()["deleted_total"] == 1
+
+    # Nacked items stay pending and are eligible for the next claim
+    await adapter.nack_many(batch)
+    assert adapter._in_flight == {"4-0"}
+    assert await adapter.reclaim_pending() != []
+
+
+@pytest.mark.asyncio
+async def test_redis_reclaim_skips_buffered_entries():
+    """Test that entries read ahead into the buffer are not delivered twice."""
+    client = FakeRedis(pending={"1-0": ({"n": 1}, 1), "2-0": ({"n": 2}, 1)})
+    adapter = _redis_adapter(client)
+    adapter._buffer.append({"id": "1-0", "data": {"n": 1}, "stream": "events"})
+
+    reclaimed = await adapter.reclaim_pending()
+
+    assert [item["id"] for item in reclaimed] == ["2-0"]
+    assert list(adapter._buffer) == [
+        {"id": "1-0", "data": {"n": 1}, "stream": "events"}
+    ]
+
+
+@pytest.mark.asyncio
+async def test_redis_has_data_cancelled_mid_reclaim_keeps_claimed_entries():
+    """Test that entries claimed by a cancelled has_data probe are still buffered."""
+    client = FakeRedis(pending={"1-0": ({"n": 1}, 1)})
+    xautoclaim = client.xautoclaim
+
+    async def slow_xautoclaim(*args, **kwargs):
+        await asyncio.sleep(0.05)
+        return await xautoclaim(*args, **kwargs)
+
+    client.xautoclaim = slow_xautoclaim
+    adapter = _redis_adapter(client)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(adapter.has_data(), 0.01)
+    await asyncio.sleep(0.1)
+
+    assert [item["id"] for item in adapter._buffer] == ["1-0"]
+    assert await adapter.has_data()
+
+
+class FakeMultiStreamRedis(FakeRedis):
+    def __init__(self, streams):
+        super().__init__()
+        self.streams = streams
+
+    async def xreadgroup(self, groupname, consumername, streams, count, block):
+        self.commands.append(("XREADGROUP", sorted(streams), count))
+        response = []
+        for name in streams:
+            batch, self.streams[name] = (
+                self.streams[name][:count],
+                self.streams[name][count:],
+            )
+            if batch:
+                response.append((name, batch))
+        return response
+
+
+@pytest.mark.asyncio
+async def test_redis_inputs_on_one_server_share_a_multi_stream_read():
+    """Test that one XREADGROUP fills the buffers of every grouped stream."""
+    client = FakeMultiStreamRedis(
+        {
+            "orders": [("1-0", {"n": 1}), ("2-0", {"n": 2})],
+            "events": [("1-0", {"e": 1})],
+        }
+    )
+    manager = EspressoInputManager(
+        [
+            EspressoRedisStreamsInputDefinition(
+                id=name, type="redis_streams", stream_name=name
+            )
+            for name in ("orders", "events")
+        ]
+        + [
+            EspressoRedisStreamsInputDefinition(
+                id="remote", type="redis_streams", stream_name="events", db=1
+            )
+        ]
+    )
+    assert len(manager.redis_groups) == 1
+    group = manager.redis_groups[0]
+    group.redis_client = client
+    for adapter in group.adapters.values():
+        adapter._is_setup = True
+        adapter._last_claim = float("inf")
+    assert manager.adapters["remote"]._group is None
+
+    orders = await manager.poll_input("orders", batch_size=10)
+    events = await manager.poll_input("events", batch_size=10)
+
+    assert [item["id"] for item in orders] == ["1-0", "2-0"]
+    assert events == [{"id": "1-0", "data": {"e": 1}, "stream": "events"}]
+    assert client.commands == [("XREADGROUP", ["events", "orders"], 10)]
+
+
+@pytest.mark.asyncio
+async def test_redis_acked_retention_keeps_what_groups_still_need():
+    """Test that MINID is the oldest unread or unacked entry over all groups."""
+    client = FakeRedis(
+        groups=[
+            {"name": "espresso_group", "last-delivered-id": "9-0", "pending": 2},
+            {"name": "audit", "last-delivered-id": "5-0", "pending": 0},
+        ],
+        pending={"3-0": ({}, 1), "8-0": ({}, 1)},
+    )
+    adapter = _redis_adapter(client)
+    adapter.retention = "acked"
+
+    assert await adapter.trim() == 7
+    assert client.commands[-1] == ("XTRIM", None, "3-0", True)
+
+
+@pytest.mark.asyncio
+async def test_redis_trims_in_background_once_per_interval():
+    client = FakeRedis()
+    adapter = _redis_adapter(client)
+    adapter.retention = "maxlen"
+    adapter.retention_maxlen = 1000
+    adapter._last_claim = float("inf")
+
+    await adapter.has_data()
+    await adapter.has_data()
+    await asyncio.sleep(0)
+
+    trims = [command for command in client.commands if command[0] == "XTRIM"]
+    assert trims == [("XTRIM", 1000, None, True)]
+    assert adapter.stats()["trimmed_total"] == 7
+
+
+@pytest.mark.asyncio
+async def test_redis_group_failure_closes_and_detaches_shared_pool():
+    client = FakeRedis()
+    manager = EspressoInputManager(
+        [
+            EspressoRedisStreamsInputDefinition(
+                id=name, type="redis_streams", stream_name=name
+            )
+            for name in ("orders", "events")
+        ]
+    )
+    group = manager.redis_groups[0]
+    group.redis_client = client
+    for adapter in group.adapters.values():
+        adapter.redis_client = client
+
+    await manager.adapters["orders"]._close_quietly()
+
+    assert client.closed
+    assert group.redis_client is None
+    assert all(a.redis_client is None for a in group.adapters.values())
+
+
+@pytest.mark.asyncio
+async def test_redis_group_members_set_up_on_the_shared_pool():
+    """Test that every member creates its consumer group on the shared client."""
+    client = FakeMultiStreamRedis(
+        {"orders": [("1-0", {"n": 1})], "events": [("1-0", {"e": 1})]}
+    )
+    manager = EspressoInputManager(
+        [
+            EspressoRedisStreamsInputDefinition(
+                id=name, type="redis_streams", stream_name=name
+            )
+            for name in ("orders", "events")
+        ]
+    )
+    group = manager.redis_groups[0]
+    group.redis_client = client
+    for adapter in group.adapters.values():
+        adapter._last_claim = float("inf")
+
+    assert [item["id"] for item in await manager.poll_input("orders")] == ["1-0"]
+    assert [item["id"] for item in await manager.poll_input("events")] == ["1-0"]
+    assert [c for c in client.commands if c[0] == "XGROUP CREATE"] == [
+        ("XGROUP CREATE", "orders", "espresso_group"),
+        ("XGROUP CREATE", "events", "espresso_group"),
+    ]
+
+    # Closing one member leaves the pool open for the other
+    await manager.adapters["orders"].close()
+    assert not hasattr(client, "closed")
+    assert manager.adapters["events"].redis_client is client
+
+    await manager.adapters["events"].close()
+    assert client.closed
+    assert group.redis_client is None
@@ -0,0 +1,86 @@
+import asyncio
+import importlib
+import logging
+import pickle
+from typing import Any, Dict, Iterable, Optional, Tuple
+from .process_pool import _init_worker, _run_job
+
+try:
+    from concurrent.futures import InterpreterPoolExecutor
+except ImportError:  # Python < 3.14
+    InterpreterPoolExecutor = None
+
+logger = logging.getLogger(__name__)
+
+SUBINTERPRETERS_AVAILABLE = InterpreterPoolExecutor is not None
+
+
+def _probe(module_name: str, function_name: str) -> bool:
+    """Check whether a job function can be imported in an isolated interpreter."""
+    try:
+        module = importlib.import_module(module_name)
+        getattr(module, function_name)
+        return True
+    except Exception:
+        return False
+
+
+class EspressoInterpreterPool:
+    """
+    Subinterpreters with their own GIL for parallel pure-Python jobs.
+
+    Cheaper than worker processes and nothing is forked, but every module a job
+    imports must support running in an isolated interpreter. Each job function
+    is probed once; callers fall back to another backend when the probe fails.
+    """
+
+    def __init__(self, num_interpreters: int, preload: Iterable[Tuple[str, str]] = ()):
+        if not SUBINTERPRETERS_AVAILABLE:
+            raise RuntimeError("Subinterpreter pools require Python 3.14 or newer")
+
+        self.num_interpreters = num_interpreters
+        self.preload = tuple(preload)
+        self._executor: Optional[InterpreterPoolExecutor] = None
+        self._supported: Dict[Tuple[str, str], bool] = {}
+
+    def _get_executor(self) -> InterpreterPoolExecutor:
+        if self._executor is None:
+            self._executor = InterpreterPoolExecutor(
+                max_workers=self.num_interpreters,
+                initializer=_init_worker,
+                initargs=(self.preload,),
+            )
+            logger.info(
+                f"Subinterpreter pool started with {self.num_interpreters} workers"
+            )
+        return self._executor
+
+    async def supports(self, module_name: str, function_name: str) -> bool:
+        """Return whether module.function is importable inside a subinterpreter."""
+        key = (module_name, function_name)
+        if key not in self._supported:
+            loop = asyncio.get_running_loop()
+            self._supported[key] = await loop.run_in_executor(
+                self._get_executor(), _probe, module_name, function_name
+            )
+            if not self._supported[key]:
+                logger.warning(
+                    f"{module_name}.{function_name} cannot be imported in a "
+                    "subinterpreter"
+                )
+        return self._supported[key]
+
+    async def run(
+        self, module_name: str, function_name: str, args: list, kwargs: dict
+    ) -> Any:
+        """Run module.function(*args, **kwargs) in the next free subinterpreter."""
+        payload = pickle.dumps((args, kwargs), protocol=pickle.HIGHEST_PROTOCOL)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_executor(), _run_job, module_name, function_name, payload
+        )
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
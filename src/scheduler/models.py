@@ -5,6 +5,12 @@ from datetime import datetime
 ScheduleKind = Literal["cron", "interval", "one_off", "on_demand"]
 InputType = Literal["list", "rabbitmq", "redis_streams"]
 TriggerKind = Literal["input"]
+ExecutionMode = Literal["thread", "process", "subinterpreter"]
+OverflowPolicy = Literal["block", "drop_oldest", "reject"]
+RabbitMQConsumeMode = Literal["get", "consume"]
+RedisRetention = Literal["none", "maxlen", "acked", "age"]
+
+DEFAULT_POOL = "default"
 
 
 @dataclass
@@ -36,6 +42,19 @@ class EspressoJobDefinition:
     retry_delay_seconds: int = 60
     timeout_seconds: int = 300
     enabled: bool = True
+    execution_mode: ExecutionMode = "thread"
+    worker_pool: str = DEFAULT_POOL
+
+
+@dataclass
+class EspressoWorkerPoolDefinition:
+    id: str
+    num_workers: int
+    queue_size: int = 1000
+    overflow_policy: OverflowPolicy = "block"
+    # Either bound enables the adaptive concurrency limit, starting at num_workers
+    min_workers: Optional[int] = None
+    max_workers: Optional[int] = None
 
 
 @dataclass
@@ -54,6 +73,10 @@ class EspressoRabbitMQInputDefinition(EspressoInputDefinition):
     url: str = None
     queue: str = None
     prefetch_count: int = 10
+    # "get" polls with basic.get; "consume" buffers basic.consume deliveries
+    consume_mode: RabbitMQConsumeMode = "get"
+    # How long a queue depth read by has_data in "get" mode stays valid
+    status_ttl_seconds: float = 1.0
 
 
 @dataclass
@@ -66,3 +89,22 @@ class EspressoRedisStreamsInputDefinition(EspressoInputDefinition):
     consumer_group: str = "espresso_group"
     consumer_name: str = "worker_1"
     start_id: str = "0"
+    # Seconds a pooled connection may idle before it is checked with a PING
+    health_check_interval: int = 30
+    # Read in the background with a blocking XREADGROUP of up to block_ms,
+    # buffering at most buffer_size messages
+    long_poll: bool = False
+    block_ms: int = 5000
+    buffer_size: int = 100
+    # Every claim_interval_seconds, XAUTOCLAIM entries pending for claim_min_idle_ms,
+    # claim_count per call. Keep the idle time above the jobs' timeout_seconds.
+    claim_min_idle_ms: int = 600_000
+    claim_interval_seconds: float = 30.0
+    claim_count: int = 100
+    # Every trim_interval_seconds, approximately trim the stream to the newest
+    # retention_maxlen entries ("maxlen"), to what every group has acked ("acked"),
+    # or to entries younger than retention_age_seconds ("age")
+    retention: RedisRetention = "none"
+    retention_maxlen: int = 100_000
+    retention_age_seconds: float = 86_400.0
+    trim_interval_seconds: float = 60.0
@@ -0,0 +1,176 @@
+import asyncio
+import importlib
+import logging
+import multiprocessing
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Callables resolved so far inside this worker process
+_callables: Dict[Tuple[str, str], Callable] = {}
+
+
+def _resolve(module_name: str, function_name: str) -> Callable:
+    key = (module_name, function_name)
+    func = _callables.get(key)
+    if func is None:
+        module = importlib.import_module(module_name)
+        func = getattr(module, function_name)
+        _callables[key] = func
+    return func
+
+
+def _init_worker(preload: Tuple[Tuple[str, str], ...]) -> None:
+    for module_name, function_name in preload:
+        try:
+            _resolve(module_name, function_name)
+        except Exception as e:
+            logger.warning(f"Could not preload {module_name}.{function_name}: {e}")
+
+
+class EspressoDeadlineExceeded(Exception):
+    """Raised by wait_for_deadline when the deadline itself expired."""
+
+
+async def wait_for_deadline(call: Awaitable, timeout: Optional[float]) -> Any:
+    """
+    Await call with asyncio.wait_for, telling an expired deadline apart.
+
+    Since Python 3.11 asyncio.TimeoutError is the builtin TimeoutError, so a
+    TimeoutError or socket.timeout raised by the call would pass for one.
+    Those propagate unchanged; only expiry raises EspressoDeadlineExceeded.
+    """
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    try:
+        return await asyncio.wait_for(call, timeout)
+    except asyncio.TimeoutError:
+        if timeout is None or loop.time() - started < timeout:
+            raise
+        raise EspressoDeadlineExceeded(f"Deadline of {timeout}s exceeded") from None
+
+
+def _ping() -> bool:
+    return True
+
+
+def _run_job(module_name: str, function_name: str, payload: bytes) -> Any:
+    func = _resolve(module_name, function_name)
+    args, kwargs = pickle.loads(payload)
+
+    if asyncio.iscoroutinefunction(func):
+        return asyncio.run(func(*args, **kwargs))
+    return func(*args, **kwargs)
+
+
+class EspressoProcessPool:
+    """
+    Preloaded worker processes for CPU-bound jobs.
+
+    Each worker is a single-process executor checked out for one job at a time,
+    so a broken worker can be replaced without disturbing the others. Workers
+    are started with the ``spawn`` method so they never inherit open broker
+    connections from the scheduler process.
+    """
+
+    def __init__(self, num_processes: int, preload: Iterable[Tuple[str, str]] = ()):
+        self.num_processes = num_processes
+        self.preload = tuple(preload)
+        self._context = multiprocessing.get_context("spawn")
+        self._workers: List[ProcessPoolExecutor] = []
+        self._idle: Optional[asyncio.Queue] = None
+
+    def _spawn(self) -> ProcessPoolExecutor:
+        worker = ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=self._context,
+            initializer=_init_worker,
+            initargs=(self.preload,),
+        )
+        self._workers.append(worker)
+        return worker
+
+    def _retire(self, worker: ProcessPoolExecutor) -> None:
+        if worker in self._workers:
+            self._workers.remove(worker)
+        worker.shutdown(wait=False, cancel_futures=True)
+
+    def _kill(self, worker: ProcessPoolExecutor) -> None:
+        terminate = getattr(worker, "terminate_workers", None)  # Python 3.14+
+        if terminate is not None:
+            terminate()
+        else:
+            for process in list((worker._processes or {}).values()):
+                process.terminate()
+        self._retire(worker)
+
+    async def start(self) -> None:
+        """Start every worker process and run its preload before the first job."""
+        if self._idle is not None:
+            return
+
+        self._idle = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+        workers = [self._spawn() for _ in range(self.num_processes)]
+
+        await asyncio.gather(*(loop.run_in_executor(w, _ping) for w in workers))
+        for worker in workers:
+            self._idle.put_nowait(worker)
+
+        logger.info(f"Process pool started with {self.num_processes} workers")
+
+    async def run(
+        self,
+        module_name: str,
+        function_name: str,
+        args: list,
+        kwargs: dict,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """
+        Run module.function(*args, **kwargs) on the next idle worker process.
+
+        A call that exceeds timeout kills its worker process and replaces it, then
+        raises EspressoDeadlineExceeded.
+        """
+        await self.start()
+
+        # Pickle the call once, at the highest protocol, instead of per argument
+        payload = pickle.dumps((args, kwargs), protocol=pickle.HIGHEST_PROTOCOL)
+
+        loop = asyncio.get_running_loop()
+        worker = await self._idle.get()
+        try:
+            return await wait_for_deadline(
+                loop.run_in_executor(
+                    worker, _run_job, module_name, function_name, payload
+                ),
+                timeout,
+            )
+        except EspressoDeadlineExceeded:
+            logger.warning(
+                f"Worker process running {module_name}.{function_name} "
+                "timed out, killing and replacing it"
+            )
+            self._kill(worker)
+            worker = self._spawn()
+            raise
+        except BrokenProcessPool:
+            logger.warning("Worker process died, replacing it")
+            self._retire(worker)
+            worker = self._spawn()
+            raise
+        finally:
+            if self._idle is None:
+                # Shut down while this call ran, nothing to hand the worker back to
+                self._retire(worker)
+            else:
+                self._idle.put_nowait(worker)
+
+    def shutdown(self) -> None:
+        for worker in list(self._workers):
+            self._retire(worker)
+        self._idle = None
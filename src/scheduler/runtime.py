@@ -14,11 +14,13 @@ class EspressoJobRuntimeState:
     next_run_time: Optional[datetime] = None
     retries_attempted: int = 0
     is_running: bool = False
+    is_queued: bool = False
     last_error: Optional[str] = None
     status: JobStatus = "active"
     execution_count: int = 0
     total_execution_time: float = 0.0
     last_execution_duration: Optional[float] = None
+    timeout_count: int = 0
     created_at: datetime = field(default_factory=datetime.now)
 
     def schedule_next_run(self, current_time: datetime):
@@ -44,7 +46,7 @@ class EspressoJobRuntimeState:
 
     def can_execute(self) -> bool:
         """Check if job can be executed based on status."""
-        return self.status == "active" and not self.is_running
+        return self.status == "active" and not self.is_running and not self.is_queued
 
     def pause(self):
         """Pause the job."""
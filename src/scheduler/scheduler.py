@@ -1,15 +1,44 @@
 import logging
 import asyncio
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
-from .models import EspressoJobDefinition, EspressoInputDefinition
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Any
+from .models import (
+    EspressoJobDefinition,
+    EspressoInputDefinition,
+    EspressoWorkerPoolDefinition,
+    OverflowPolicy,
+)
 from .runtime import EspressoJobRuntimeState
-from .worker import EspressoJobExecutor
+from .worker import EspressoJobExecutor, EspressoQueueFullError
 from .input_manager import EspressoInputManager
-from .distributed_state import DistributedJobState
+from .distributed_state import DistributedJobState, rendezvous_owner
+from .due_index import DueIndexBackend, EspressoDueIndex, create_due_index
+from .utils import _get_next_cron_times
+from .interpreter_pool import SUBINTERPRETERS_AVAILABLE
 
 logger = logging.getLogger(__name__)
 
+# Lease on a claimed job without a timeout, renewed every third of it
+DEFAULT_LEASE_SECONDS = 300
+# Minimum time an instance stays a member after its last heartbeat
+HEARTBEAT_TTL_SECONDS = 10
+
+
+def _redis_fields(state: EspressoJobRuntimeState) -> Dict[str, Any]:
+    """The job state fields shared between instances in distributed mode."""
+    return {
+        "next_run_time": state.next_run_time,
+        "last_run_time": state.last_run_time,
+        "retries_attempted": state.retries_attempted,
+        "is_running": state.is_running,
+        "last_error": state.last_error or "",
+        "status": state.status,
+        "execution_count": state.execution_count,
+        "total_execution_time": state.total_execution_time,
+        "last_execution_duration": state.last_execution_duration,
+        "created_at": state.created_at,
+    }
+
 
 class EspressoScheduler:
     def __init__(
@@ -19,24 +48,82 @@ class EspressoScheduler:
         tick_seconds: int = 1,
         num_workers: int = 5,
         redis_url: Optional[str] = None,  # If set, enables distributed mode
+        due_index_backend: DueIndexBackend = "heap",
+        wheel_resolution_seconds: float = 1.0,
+        num_processes: Optional[int] = None,  # Workers for process/subinterpreter jobs
+        queue_size: int = 1000,  # Runs waiting for a free worker
+        overflow_policy: OverflowPolicy = "block",
+        worker_pools: Optional[List[EspressoWorkerPoolDefinition]] = None,
+        min_workers: Optional[int] = None,  # Either bound makes num_workers adaptive
+        max_workers: Optional[int] = None,
     ):
         self.tick_seconds = tick_seconds
-        self.executor = EspressoJobExecutor(num_workers=num_workers)
+        self.executor = EspressoJobExecutor(
+            num_workers=num_workers,
+            num_processes=num_processes,
+            process_preload=[
+                (job.module, job.function)
+                for job in jobs
+                if job.execution_mode != "thread"
+            ],
+            queue_size=queue_size,
+            overflow_policy=overflow_policy,
+            worker_pools=worker_pools or [],
+            min_workers=min_workers,
+            max_workers=max_workers,
+        )
+        for job in jobs:
+            if job.worker_pool not in self.executor.pools:
+                raise ValueError(
+                    f"Job {job.id} assigned to unknown worker pool '{job.worker_pool}'"
+                )
         self.input_manager = EspressoInputManager(inputs)
         self._lock = asyncio.Lock()
         self._running = False
+        self._wakeup = asyncio.Event()
+        self._sleep_until: Optional[datetime] = None
+        self.due_index: EspressoDueIndex = create_due_index(
+            due_index_backend, resolution_seconds=wheel_resolution_seconds
+        )
 
         self.distributed_mode = redis_url is not None
         self.distributed_state = DistributedJobState(redis_url) if redis_url else None
+        # Jobs whose state changed locally since the last write to Redis
+        self._dirty_jobs: Set[str] = set()
+        # Fencing token and renewal task of each job this instance has claimed
+        self._leases: Dict[str, Tuple[int, asyncio.Task]] = {}
+        # Live instances and, for that membership, the owner of each job
+        self._instances: List[str] = []
+        self._owners: Dict[str, str] = {}
 
         now = datetime.now()
 
+        # Resolve every cron job's first run in one batch; other jobs start right away
+        cron_jobs = [
+            job for job in jobs if job.schedule.kind == "cron" and job.schedule.cron
+        ]
+        first_runs = dict(
+            zip(
+                (job.id for job in cron_jobs),
+                _get_next_cron_times((job.schedule.cron for job in cron_jobs), now),
+            )
+        )
+
         self.job_states: Dict[str, EspressoJobRuntimeState] = {}
         for job in jobs:
-            next_run = now
+            next_run = first_runs.get(job.id, now)
             self.job_states[job.id] = EspressoJobRuntimeState(
                 definition=job, next_run_time=next_run
             )
+            self._reschedule(self.job_states[job.id])
+
+        if not SUBINTERPRETERS_AVAILABLE and any(
+            job.execution_mode == "subinterpreter" for job in jobs
+        ):
+            logger.warning(
+                "Subinterpreter pools require Python 3.14+, "
+                "subinterpreter jobs will run in worker processes"
+            )
 
         if self.distributed_mode:
             logger.info("🌐 Scheduler initialized in DISTRIBUTED mode (Redis enabled)")
@@ -45,39 +132,166 @@ class EspressoScheduler:
                 "🖥️  Scheduler initialized in SINGLE-SERVER mode (local state only)"
             )
 
-    async def _sync_state_to_redis(self, job_id: str):
+    def _reschedule(
+        self, state: EspressoJobRuntimeState, not_before: Optional[datetime] = None
+    ):
+        """Re-index a job after its next run time or status changed."""
+        job_id = state.definition.id
+
+        if state.status != "active" or state.next_run_time is None:
+            self.due_index.discard(job_id)
+            return
+
+        when = state.next_run_time
+        if not_before and when < not_before:
+            when = not_before
+
+        self.due_index.schedule(job_id, when)
+
+        # Only a deadline before the current wake-up time changes how long to sleep
+        if self._sleep_until is None or when < self._sleep_until:
+            self._wakeup.set()
+
+    def _on_input_data(self, input_id: str) -> None:
+        """Make on_demand jobs of an input due as soon as its reader buffers data."""
+        for state in self.job_states.values():
+            job = state.definition
+            if (
+                job.schedule.kind == "on_demand"
+                and job.trigger
+                and job.trigger.input_id == input_id
+                and state.can_execute()
+            ):
+                self._reschedule(state)
+
+    async def _sleep_until_next_run(self):
+        """Sleep until the earliest deadline in the due index or an external wakeup."""
+        timeout = None
+        deadline = self.due_index.next_deadline()
+        if deadline is not None:
+            timeout = max((deadline - datetime.now()).total_seconds(), 0)
+
+        if self.distributed_mode:
+            # Other instances change job state in Redis, so keep refreshing every tick
+            timeout = (
+                self.tick_seconds
+                if timeout is None
+                else min(timeout, self.tick_seconds)
+            )
+
+        self._sleep_until = (
+            datetime.now() + timedelta(seconds=timeout) if timeout is not None else None
+        )
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _refresh_membership(self):
+        """Send our heartbeat and pick up the instances that are alive."""
+        distributed_state = self.distributed_state
+        await distributed_state.heartbeat(
+            ttl_seconds=max(3 * self.tick_seconds, HEARTBEAT_TTL_SECONDS)
+        )
+        instances = set(await distributed_state.get_active_instances())
+        instances.add(distributed_state.instance_id)
+
+        if instances != set(self._instances):
+            logger.info(
+                f"[DISTRIBUTED] {len(instances)} active instances, rebalancing jobs"
+            )
+            self._instances = sorted(instances)
+            self._owners.clear()
+
+    def _owns(self, job_id: str) -> bool:
+        owner = self._owners.get(job_id)
+        if owner is None:
+            owner = rendezvous_owner(job_id, self._instances)
+            self._owners[job_id] = owner
+        return owner == self.distributed_state.instance_id
+
+    def _lease_seconds(self, job: EspressoJobDefinition) -> float:
+        """A lease covers a whole run up to its timeout, renewed beyond that."""
+        if job.timeout_seconds:
+            return min(job.timeout_seconds + self.tick_seconds, DEFAULT_LEASE_SECONDS)
+        return DEFAULT_LEASE_SECONDS
+
+    async def _renew_lease(self, job_id: str, token: int, lease_seconds: float):
+        while True:
+            await asyncio.sleep(lease_seconds / 3)
+            until = datetime.now() + timedelta(seconds=lease_seconds)
+            try:
+                renewed = await self.distributed_state.renew_lease(
+                    job_id, token, until, lease_seconds
+                )
+            except Exception as e:
+                logger.warning(f"[DISTRIBUTED] Could not renew lease on {job_id}: {e}")
+                continue
+
+            if not renewed:
+                logger.warning(
+                    f"[DISTRIBUTED] Lost lease on job {job_id}, "
+                    "the state of this run will not be written"
+                )
+                return
+
+    async def _release_lease(self, job_id: str):
+        lease = self._leases.pop(job_id, None)
+        if lease is None:
+            # Already released by stop() or an earlier callback
+            return
+        token, renewer = lease
+        renewer.cancel()
+        try:
+            await self.distributed_state.release_job(
+                job_id, token, _redis_fields(self.job_states[job_id])
+            )
+        except Exception as e:
+            # The lease runs out on its own and the job becomes due again
+            logger.error(f"[DISTRIBUTED] Could not release job {job_id}: {e}")
+
+    def _finish(self, job_id: str):
+        """Publish a finished run, through its lease when it holds one."""
+        if job_id in self._leases:
+            asyncio.create_task(self._release_lease(job_id))
+        else:
+            self._mark_dirty(job_id)
+
+    def _mark_dirty(self, job_id: str):
+        """Queue a job's state for the next batched write to Redis."""
+        if self.distributed_mode:
+            self._dirty_jobs.add(job_id)
+
+    async def _sync_states_to_redis(self, job_ids: Iterable[str]):
+        """Write the state of many jobs in one round trip, changed fields only."""
         if not self.distributed_mode:
             return
 
-        state = self.job_states[job_id]
-        await self.distributed_state.set_job_state(
-            job_id,
-            {
-                "next_run_time": state.next_run_time,
-                "last_run_time": state.last_run_time,
-                "retries_attempted": state.retries_attempted,
-                "is_running": state.is_running,
-                "last_error": state.last_error or "",
-                "status": state.status,
-                "execution_count": state.execution_count,
-                "total_execution_time": state.total_execution_time,
-                "last_execution_duration": state.last_execution_duration,
-                "created_at": state.created_at,
-            },
+        await self.distributed_state.set_job_states(
+            {job_id: _redis_fields(self.job_states[job_id]) for job_id in job_ids}
         )
 
-    async def _sync_state_from_redis(self, job_id: str):
+    async def _flush_dirty_states(self):
+        dirty, self._dirty_jobs = self._dirty_jobs, set()
+        try:
+            await self._sync_states_to_redis(dirty)
+        except Exception:
+            self._dirty_jobs |= dirty
+            raise
+
+    async def _sync_states_from_redis(self, job_ids: Iterable[str]):
+        """Refresh the state of many jobs from Redis in one round trip."""
         if not self.distributed_mode:
             return
 
-        redis_state = await self.distributed_state.get_job_state(job_id)
-        if redis_state:
+        redis_states = await self.distributed_state.get_job_states(job_ids)
+        for job_id, redis_state in redis_states.items():
             state = self.job_states[job_id]
-
+            # is_running stays local: a holder that died leaves the flag set in
+            # Redis, and the lease lock already keeps other instances out
             state.next_run_time = redis_state.get("next_run_time")
             state.last_run_time = redis_state.get("last_run_time")
             state.retries_attempted = redis_state.get("retries_attempted", 0)
-            state.is_running = redis_state.get("is_running", False)
             state.last_error = redis_state.get("last_error")
             state.status = redis_state.get("status", "active")
             state.execution_count = redis_state.get("execution_count", 0)
@@ -89,9 +303,25 @@ class EspressoScheduler:
         state.last_run_time = datetime.now()
         start_time = datetime.now()
 
-        task = await self.executor.submit(state, self.input_manager)
+        # The job is re-indexed from the completion callback
+        self.due_index.discard(job.id)
+
+        try:
+            task = await self.executor.submit(state, self.input_manager)
+        except EspressoQueueFullError:
+            self._reschedule(
+                state, not_before=datetime.now() + timedelta(seconds=self.tick_seconds)
+            )
+            raise
 
         def _callback(fut):
+            if fut.cancelled():
+                # Dropped from the queue before it started, not a failed attempt
+                state.schedule_next_run(datetime.now())
+                self._finish(job.id)
+                self._reschedule(state)
+                return
+
             try:
                 fut.result()
 
@@ -101,8 +331,8 @@ class EspressoScheduler:
                 state.total_execution_time += duration
                 state.last_execution_duration = duration
 
-                if self.distributed_mode:
-                    asyncio.create_task(self._sync_state_to_redis(job.id))
+                self._finish(job.id)
+                self._reschedule(state)
 
             except Exception:
                 state.retries_attempted += 1
@@ -114,8 +344,8 @@ class EspressoScheduler:
                     delay = job.retry_delay_seconds
                     state.next_run_time = datetime.now() + timedelta(seconds=delay)
 
-                if self.distributed_mode:
-                    asyncio.create_task(self._sync_state_to_redis(job.id))
+                self._finish(job.id)
+                self._reschedule(state)
 
         task.add_done_callback(_callback)
 
@@ -130,122 +360,154 @@ class EspressoScheduler:
 
         if self.distributed_mode:
             await self.distributed_state.connect()
+            await self._sync_states_to_redis(self.job_states)
 
-            for job_id in self.job_states:
-                await self._sync_state_to_redis(job_id)
+        self.input_manager.start_readers(self._on_input_data)
 
         logger.info("Scheduler started")
 
         while self._running:
-            now = datetime.now()
+            self._wakeup.clear()
 
             if self.distributed_mode:
-                await self.distributed_state.heartbeat()
+                await self._refresh_membership()
 
             async with self._lock:
-                for job_id, job_state in list(self.job_states.items()):
-                    job = job_state.definition
+                now = datetime.now()
+                if self.distributed_mode:
+                    # Publish local completions before reading other instances' state
+                    await self._flush_dirty_states()
+
+                    # Refresh only jobs due here or in Redis, then re-index them
+                    candidates = set(self.due_index.pop_due(now))
+                    candidates.update(await self.distributed_state.get_due_job_ids(now))
+                    # Only this instance's share; the others evaluate the rest
+                    candidates = {
+                        job_id
+                        for job_id in candidates
+                        if job_id in self.job_states and self._owns(job_id)
+                    }
+                    await self._sync_states_from_redis(candidates)
+                    for job_id in candidates:
+                        job_state = self.job_states[job_id]
+                        if not job_state.is_running:
+                            self._reschedule(job_state)
+
+                due = []
+                for job_id in self.due_index.pop_due(now):
+                    job_state = self.job_states.get(job_id)
+                    if job_state is None or not job_state.can_execute():
+                        # Re-indexed by resume/enable or the completion callback
+                        continue
+                    due.append(job_state)
+
+                # One concurrent check for every input a due job is waiting on
+                has_data = await self.input_manager.has_data_many(
+                    state.definition.trigger.input_id
+                    for state in due
+                    if state.definition.trigger
+                    and state.definition.trigger.kind == "input"
+                    and state.definition.trigger.input_id
+                )
+
+                for job_state in due:
+                    try:
+                        if self.distributed_mode:
+                            await self._dispatch_distributed(job_state, now, has_data)
+                        else:
+                            await self._dispatch(job_state, now, has_data)
+                    except EspressoQueueFullError as e:
+                        logger.warning(f"{e}, retrying in {self.tick_seconds}s")
 
-                    if self.distributed_mode:
-                        await self._sync_state_from_redis(job_id)
+            await self._sleep_until_next_run()
 
-                    if not job_state.can_execute():
-                        continue
+    async def _dispatch(
+        self,
+        job_state: EspressoJobRuntimeState,
+        now: datetime,
+        has_data: Dict[str, bool],
+    ):
+        job = job_state.definition
+        job_id = job.id
+
+        if job.trigger and job.trigger.kind == "input":
+            input_id = job.trigger.input_id
+
+            if input_id and has_data.get(input_id):
+                logger.info(f"Triggering input-based job {job_id} (scheduled)")
+                await self._run(job_state)
+            else:
+                logger.debug(
+                    f"No data available for job {job_id}, scheduling next check"
+                )
+                job_state.schedule_next_run(now - timedelta(seconds=1))
+                self._reschedule(
+                    job_state, not_before=now + timedelta(seconds=self.tick_seconds)
+                )
+            return
 
-                    if self.distributed_mode:
-                        should_run = False
-
-                        if job.trigger and job.trigger.kind == "input":
-                            input_id = job.trigger.input_id
-                            if (
-                                job_state.next_run_time
-                                and now >= job_state.next_run_time
-                            ):
-                                if input_id and await self.input_manager.has_data(
-                                    input_id
-                                ):
-                                    should_run = True
-                        else:
-                            if (
-                                job_state.next_run_time
-                                and now >= job_state.next_run_time
-                            ):
-                                should_run = True
-
-                        if not should_run:
-                            continue
-
-                        lock_acquired = await self.distributed_state.acquire_lock(
-                            job_id, ttl_seconds=300
-                        )
-                        if not lock_acquired:
-                            logger.debug(
-                                f"[DISTRIBUTED] Job {job_id} locked by another instance, skipping"
-                            )
-                            continue
-
-                        await self.distributed_state.update_job_field(
-                            job_id, "is_running", True
-                        )
-
-                        try:
-                            if job.trigger and job.trigger.kind == "input":
-                                input_id = job.trigger.input_id
-                                logger.info(
-                                    f"[DISTRIBUTED] Triggering input-based job {job_id}"
-                                )
-                                await self._run(job_state)
-                            else:
-                                logger.info(
-                                    f"[DISTRIBUTED] Scheduling job {job_id} for execution"
-                                )
-                                await self._run(job_state)
-                        finally:
-                            await self.distributed_state.update_job_field(
-                                job_id, "is_running", False
-                            )
-                            await self.distributed_state.release_lock(job_id)
-
-                    else:
-                        if job.trigger and job.trigger.kind == "input":
-                            if not job_state.is_running:
-                                input_id = job.trigger.input_id
-
-                                if (
-                                    job_state.next_run_time
-                                    and now >= job_state.next_run_time
-                                ):
-                                    if input_id and await self.input_manager.has_data(
-                                        input_id
-                                    ):
-                                        logger.info(
-                                            f"Triggering input-based job {job_id} (scheduled)"
-                                        )
-                                        await self._run(job_state)
-                                    else:
-                                        logger.debug(
-                                            f"No data available for job {job_id}, scheduling next check"
-                                        )
-                                        job_state.schedule_next_run(
-                                            now - timedelta(seconds=1)
-                                        )
-                            continue
-
-                        if job_state.next_run_time is None:
-                            continue
-
-                        if now >= job_state.next_run_time:
-                            logger.info(f"Scheduling job {job_id} for execution")
-                            await self._run(job_state)
-
-            await asyncio.sleep(self.tick_seconds)
+        logger.info(f"Scheduling job {job_id} for execution")
+        await self._run(job_state)
+
+    async def _dispatch_distributed(
+        self,
+        job_state: EspressoJobRuntimeState,
+        now: datetime,
+        has_data: Dict[str, bool],
+    ):
+        job = job_state.definition
+        job_id = job.id
+        retry_at = now + timedelta(seconds=self.tick_seconds)
+
+        if job.trigger and job.trigger.kind == "input":
+            input_id = job.trigger.input_id
+            if not (input_id and has_data.get(input_id)):
+                self._reschedule(job_state, not_before=retry_at)
+                return
+
+        # Due-check, lock, running flag and next run time in one atomic call.
+        # Other instances see the job as not due while the lease lasts.
+        lease_seconds = self._lease_seconds(job)
+        token = await self.distributed_state.claim_job(
+            job_id, now, now + timedelta(seconds=lease_seconds), lease_seconds
+        )
+        if not token:
+            logger.debug(
+                f"[DISTRIBUTED] Job {job_id} no longer due or claimed by another "
+                "instance, skipping"
+            )
+            self._reschedule(job_state, not_before=retry_at)
+            return
+
+        # Held until the completion callback releases it
+        self._leases[job_id] = (
+            token,
+            asyncio.create_task(self._renew_lease(job_id, token, lease_seconds)),
+        )
+        try:
+            if job.trigger and job.trigger.kind == "input":
+                logger.info(f"[DISTRIBUTED] Triggering input-based job {job_id}")
+            else:
+                logger.info(f"[DISTRIBUTED] Scheduling job {job_id} for execution")
+            await self._run(job_state)
+        except BaseException:
+            # Never submitted, so no completion callback will release it
+            await self._release_lease(job_id)
+            raise
 
     async def stop(self):
         """Stop the scheduler gracefully."""
         logger.info("Stopping scheduler...")
         self._running = False
+        self._wakeup.set()
+        self.executor.shutdown()
+        await self.input_manager.stop_readers()
 
         if self.distributed_mode:
+            # Hand back held jobs now rather than when their leases run out
+            for job_id in list(self._leases):
+                await self._release_lease(job_id)
+            await self._flush_dirty_states()
             await self.distributed_state.close()
 
     async def get_job(self, job_id: str) -> Optional[EspressoJobRuntimeState]:
@@ -263,6 +525,7 @@ class EspressoScheduler:
         async with self._lock:
             if job_id in self.job_states:
                 self.job_states[job_id].pause()
+                self._reschedule(self.job_states[job_id])
                 logger.info(f"Job {job_id} paused")
                 return True
             return False
@@ -272,6 +535,7 @@ class EspressoScheduler:
         async with self._lock:
             if job_id in self.job_states:
                 self.job_states[job_id].resume()
+                self._reschedule(self.job_states[job_id])
                 logger.info(f"Job {job_id} resumed")
                 return True
             return False
@@ -281,6 +545,7 @@ class EspressoScheduler:
         async with self._lock:
             if job_id in self.job_states:
                 self.job_states[job_id].stop()
+                self._reschedule(self.job_states[job_id])
                 logger.info(f"Job {job_id} stopped")
                 return True
             return False
@@ -290,6 +555,7 @@ class EspressoScheduler:
         async with self._lock:
             if job_id in self.job_states:
                 self.job_states[job_id].enable()
+                self._reschedule(self.job_states[job_id])
                 logger.info(f"Job {job_id} enabled")
                 return True
             return False
@@ -0,0 +1,45 @@
+"""
+Tests for the adaptive concurrency limiter.
+"""
+
+import pytest
+from scheduler.concurrency import EspressoAdaptiveLimiter
+
+
+def _window(limiter, latency, failed=False, backlogged=False):
+    for _ in range(limiter.window_size):
+        limit = limiter.record(latency, failed, backlogged)
+    return limit
+
+
+def test_limit_grows_while_backlogged():
+    limiter = EspressoAdaptiveLimiter(min_limit=1, max_limit=3, initial_limit=1)
+
+    assert _window(limiter, 0.1, backlogged=True) == 2
+    assert _window(limiter, 0.1, backlogged=False) == 2
+    assert _window(limiter, 0.1, backlogged=True) == 3
+    assert _window(limiter, 0.1, backlogged=True) == 3
+
+
+def test_limit_backs_off_on_latency():
+    limiter = EspressoAdaptiveLimiter(min_limit=2, max_limit=50, initial_limit=20)
+
+    _window(limiter, 0.1, backlogged=True)
+    assert limiter.limit == 21
+
+    assert _window(limiter, 0.5, backlogged=True) == 18
+    assert limiter.baseline_latency == pytest.approx(0.1)
+
+
+def test_limit_backs_off_on_errors_down_to_min():
+    limiter = EspressoAdaptiveLimiter(min_limit=2, max_limit=10, initial_limit=4)
+
+    for _ in range(5):
+        _window(limiter, 0.1, failed=True, backlogged=True)
+
+    assert limiter.limit == 2
+
+
+def test_invalid_bounds():
+    with pytest.raises(ValueError):
+        EspressoAdaptiveLimiter(min_limit=5, max_limit=2)
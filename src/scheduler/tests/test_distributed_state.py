@@ -0,0 +1,375 @@
+"""
+Tests for state sync, claims and membership in DistributedJobState.
+"""
+
+import pytest
+import asyncio
+from datetime import datetime, timedelta
+from scheduler.distributed_state import (
+    CLAIM_JOB_SCRIPT,
+    DUE_KEY,
+    RELEASE_JOB_SCRIPT,
+    RENEW_LEASE_SCRIPT,
+    DistributedJobState,
+    rendezvous_owner,
+)
+from scheduler.models import EspressoJobDefinition, EspressoSchedule
+from scheduler.scheduler import EspressoScheduler
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def hgetall(self, key):
+        self.calls.append(lambda: dict(self.redis.hashes.get(key, {})))
+
+    def hset(self, key, field=None, value=None, mapping=None):
+        mapping = mapping or {field: value}
+        self.redis.writes.append((key, dict(mapping)))
+        self.calls.append(lambda: self.redis.hashes.setdefault(key, {}).update(mapping))
+
+    def set(self, key, value, ex=None):
+        self.calls.append(lambda: True)
+
+    def zadd(self, key, mapping):
+        self.calls.append(lambda: self.redis.zset(key).update(mapping))
+
+    def zrem(self, key, member):
+        self.calls.append(lambda: self.redis.zset(key).pop(member, None))
+
+    def zremrangebyscore(self, key, min, max):
+        zset = self.redis.zset(key)
+        self.calls.append(
+            lambda: [zset.pop(m) for m, score in list(zset.items()) if score <= max]
+        )
+
+    async def execute(self):
+        self.redis.round_trips += 1
+        return [call() for call in self.calls]
+
+
+class FakeRedis:
+    def __init__(self, hashes=None):
+        self.hashes = hashes or {}
+        self.writes = []
+        self.round_trips = 0
+        self.zsets = {}
+        self.locks = {}
+        self.fences = {}
+        self.script_calls = []
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def zset(self, key):
+        return self.zsets.setdefault(key, {})
+
+    @property
+    def due(self):
+        return self.zset(DUE_KEY)
+
+    def register_script(self, source):
+        """Python stand-ins for the Lua scripts, invoked like AsyncScript."""
+
+        async def claim(keys, args):
+            lock, job, _, fence = keys
+            owner, _, now, until, job_id, next_run = args
+            score = self.due.get(job_id)
+            if score is None or score > now or lock in self.locks:
+                return 0
+            self.locks[lock] = owner
+            self.fences[fence] = self.fences.get(fence, 0) + 1
+            self.hashes.setdefault(job, {}).update(
+                is_running="True", next_run_time=next_run
+            )
+            self.due[job_id] = until
+            return self.fences[fence]
+
+        async def renew(keys, args):
+            lock, fence, _ = keys
+            owner, token, _, until, job_id = args
+            if self.locks.get(lock) != owner or self.fences.get(fence) != token:
+                return 0
+            self.due[job_id] = until
+            return 1
+
+        async def release(keys, args):
+            lock, job, _, fence = keys
+            owner, token, job_id, score, *pairs = args
+            if self.fences.get(fence) != token:
+                return 0
+            self.hashes.setdefault(job, {}).update(zip(pairs[::2], pairs[1::2]))
+            if score == "":
+                self.due.pop(job_id, None)
+            else:
+                self.due[job_id] = score
+            if self.locks.get(lock) == owner:
+                del self.locks[lock]
+            return 1
+
+        scripts = {
+            CLAIM_JOB_SCRIPT: claim,
+            RENEW_LEASE_SCRIPT: renew,
+            RELEASE_JOB_SCRIPT: release,
+        }
+
+        async def call(keys, args):
+            self.script_calls.append(source)
+            return await scripts[source](keys, args)
+
+        return call
+
+    async def zrangebyscore(self, key, min, max, start=0, num=None):
+        min, max = float(min), float(max)
+        members = sorted((score, m) for m, score in self.zset(key).items())
+        in_range = [m for score, m in members if min <= score <= max]
+        return in_range[start:] if num is None else in_range[start : start + num]
+
+    async def zrem(self, key, member):
+        return int(self.zset(key).pop(member, None) is not None)
+
+    async def close(self):
+        pass
+
+
+def _state(**overrides):
+    state = {
+        "next_run_time": datetime(2024, 1, 1, 12, 0),
+        "is_running": False,
+        "execution_count": 3,
+        "last_error": "",
+    }
+    state.update(overrides)
+    return state
+
+
+@pytest.mark.asyncio
+async def test_get_job_states_uses_one_round_trip():
+    redis = FakeRedis(
+        {
+            "espresso:job:a:state": {"is_running": "True", "execution_count": "2"},
+            "espresso:job:b:state": {"next_run_time": "2024-01-01T12:00:00"},
+        }
+    )
+    distributed = DistributedJobState()
+    distributed.redis = redis
+
+    states = await distributed.get_job_states(["a", "b", "missing"])
+
+    assert redis.round_trips == 1
+    assert set(states) == {"a", "b"}
+    assert states["a"]["is_running"] is True
+    assert states["a"]["execution_count"] == 2
+    assert states["b"]["next_run_time"] == datetime(2024, 1, 1, 12, 0)
+
+
+@pytest.mark.asyncio
+async def test_set_job_states_writes_only_changed_fields():
+    redis = FakeRedis()
+    distributed = DistributedJobState()
+    distributed.redis = redis
+
+    assert await distributed.set_job_states({"a": _state(), "b": _state()}) == 8
+    assert redis.round_trips == 1
+
+    redis.writes.clear()
+    written = await distributed.set_job_states(
+        {"a": _state(execution_count=4), "b": _state()}
+    )
+
+    assert written == 1
+    assert redis.round_trips == 2
+    assert redis.writes == [("espresso:job:a:state", {"execution_count": "4"})]
+
+    # Nothing changed: no round trip at all
+    assert await distributed.set_job_states({"b": _state()}) == 0
+    assert redis.round_trips == 2
+
+
+@pytest.mark.asyncio
+async def test_due_set_follows_next_run_time_and_status():
+    redis = FakeRedis()
+    distributed = DistributedJobState()
+    distributed.redis = redis
+    noon = datetime(2024, 1, 1, 12, 0)
+
+    await distributed.set_job_states(
+        {
+            "early": _state(next_run_time=noon, status="active"),
+            "late": _state(next_run_time=datetime(2024, 1, 2), status="active"),
+            "paused": _state(next_run_time=noon, status="paused"),
+        }
+    )
+    assert await distributed.get_due_job_ids(noon) == ["early"]
+
+    await distributed.update_job_field("early", "status", "paused")
+    await distributed.update_job_field("late", "next_run_time", noon)
+
+    assert await distributed.get_due_job_ids(noon) == ["late"]
+    assert await distributed.get_due_job_ids(noon, limit=0) == []
+
+
+def _claimers(redis):
+    claimers = DistributedJobState(), DistributedJobState()
+    for distributed in claimers:
+        distributed.redis = redis
+        distributed._register_scripts()
+    return claimers
+
+
+@pytest.mark.asyncio
+async def test_claim_job_is_exclusive_and_moves_job_out_of_due_window():
+    redis = FakeRedis()
+    first, second = _claimers(redis)
+    noon = datetime(2024, 1, 1, 12, 0)
+    lease_end = datetime(2024, 1, 1, 12, 5)
+    await first.set_job_states({"a": _state(next_run_time=noon)})
+
+    token = await first.claim_job("a", noon, lease_end)
+    assert token == 1
+    assert not await second.claim_job("a", noon, lease_end)
+    assert await first.get_due_job_ids(noon) == []
+    assert redis.hashes["espresso:job:a:state"]["is_running"] == "True"
+
+    next_run = datetime(2024, 1, 1, 12, 1)
+    assert await first.release_job("a", token, _state(next_run_time=next_run))
+    assert redis.hashes["espresso:job:a:state"]["is_running"] == "False"
+    assert await second.get_due_job_ids(next_run) == ["a"]
+    assert await second.claim_job("a", next_run, lease_end) == 2
+
+
+@pytest.mark.asyncio
+async def test_run_that_lost_its_lease_cannot_write_state():
+    redis = FakeRedis()
+    first, second = _claimers(redis)
+    noon = datetime(2024, 1, 1, 12, 0)
+    lease_end = datetime(2024, 1, 1, 12, 5)
+    await first.set_job_states({"a": _state(next_run_time=noon)})
+
+    stale = await first.claim_job("a", noon, lease_end)
+    assert await first.renew_lease("a", stale, lease_end, 300)
+
+    # The lease runs out and another instance claims the job
+    redis.locks.clear()
+    assert await second.claim_job("a", lease_end, datetime(2024, 1, 1, 12, 10))
+
+    assert not await first.renew_lease("a", stale, lease_end, 300)
+    assert not await first.release_job("a", stale, _state(execution_count=99))
+    assert redis.hashes["espresso:job:a:state"]["execution_count"] == "3"
+    assert redis.locks
+
+
+@pytest.mark.asyncio
+async def test_expired_lease_is_taken_over_through_the_scheduler():
+    redis = FakeRedis()
+    crashed, _ = _claimers(redis)
+    job = EspressoJobDefinition(
+        id="a",
+        type="espresso_job",
+        module="testing.test",
+        function="print_hello_world",
+        schedule=EspressoSchedule(kind="interval", every_seconds=3600),
+    )
+    sched = EspressoScheduler([job], [], num_workers=1, redis_url="redis://fake")
+    sched.job_states["a"].next_run_time = datetime.now() + timedelta(hours=1)
+    sched._reschedule(sched.job_states["a"])
+
+    async def connect():
+        sched.distributed_state.redis = redis
+        sched.distributed_state._register_scripts()
+
+    sched.distributed_state.connect = connect
+    runner = asyncio.create_task(sched.run_forever())
+    while sched.distributed_state.instance_id not in redis.zset("espresso:instances"):
+        await asyncio.sleep(0.01)
+
+    # Another instance claims the job, then dies without releasing it
+    now = datetime.now()
+    redis.due["a"] = now.timestamp()
+    assert await crashed.claim_job("a", now, now - timedelta(seconds=1))
+    assert redis.hashes["espresso:job:a:state"]["is_running"] == "True"
+    redis.locks.clear()
+
+    for _ in range(300):
+        await asyncio.sleep(0.01)
+        if sched.job_states["a"].execution_count:
+            break
+
+    await sched.stop()
+    await asyncio.wait_for(runner, timeout=1)
+
+    assert sched.job_states["a"].execution_count == 1
+    assert redis.fences["espresso:fence:job:a"] == 2
+    assert redis.hashes["espresso:job:a:state"]["is_running"] == "False"
+    assert not redis.locks
+
+
+@pytest.mark.asyncio
+async def test_stop_releases_leases_of_running_jobs():
+    redis = FakeRedis()
+    job = EspressoJobDefinition(
+        id="slow",
+        type="espresso_job",
+        module="testing.test",
+        function="async_sleep_for",
+        schedule=EspressoSchedule(kind="interval", every_seconds=3600),
+        kwargs={"seconds": 0.5},
+    )
+    sched = EspressoScheduler([job], [], num_workers=1, redis_url="redis://fake")
+
+    async def connect():
+        sched.distributed_state.redis = redis
+        sched.distributed_state._register_scripts()
+
+    sched.distributed_state.connect = connect
+    runner = asyncio.create_task(sched.run_forever())
+    while not redis.locks:
+        await asyncio.sleep(0.01)
+
+    await sched.stop()
+    await asyncio.wait_for(runner, timeout=1)
+
+    assert not sched._leases
+    assert not redis.locks
+    # Due again as soon as another instance looks, not once the lease expires
+    assert redis.due["slow"] <= datetime.now().timestamp()
+
+
+def test_rendezvous_moves_only_the_new_instances_share():
+    job_ids = [f"job{i}" for i in range(2000)]
+    before = {
+        job_id: rendezvous_owner(job_id, ["a", "b", "c", "d"]) for job_id in job_ids
+    }
+    after = {
+        job_id: rendezvous_owner(job_id, ["a", "b", "c", "d", "e"])
+        for job_id in job_ids
+    }
+
+    moved = [job_id for job_id in job_ids if before[job_id] != after[job_id]]
+    assert all(after[job_id] == "e" for job_id in moved)
+    assert 300 < len(moved) < 500
+    # Same answer on every instance, whatever order membership is listed in
+    assert rendezvous_owner("job1", ["d", "c", "b", "a"]) == before["job1"]
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_membership_drops_expired_instances():
+    redis = FakeRedis()
+    first, second = _claimers(redis)
+
+    await first.heartbeat(ttl_seconds=30)
+    await second.heartbeat(ttl_seconds=30)
+    assert sorted(await first.get_active_instances()) == sorted(
+        [first.instance_id, second.instance_id]
+    )
+
+    redis.zset("espresso:instances")[second.instance_id] = 0
+    assert await first.get_active_instances() == [first.instance_id]
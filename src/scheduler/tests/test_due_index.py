@@ -0,0 +1,223 @@
+"""
+Tests for the due index and the deadline-driven scheduler loop.
+"""
+
+import pytest
+import asyncio
+import random
+from datetime import datetime, timedelta
+from scheduler.due_index import (
+    EspressoHeapDueIndex,
+    EspressoTimingWheelDueIndex,
+    create_due_index,
+)
+from scheduler.models import (
+    EspressoJobDefinition,
+    EspressoListInputDefinition,
+    EspressoSchedule,
+    EspressoTrigger,
+)
+from scheduler.scheduler import EspressoScheduler
+
+
+@pytest.fixture
+def interval_job():
+    """Create an interval job definition."""
+    return EspressoJobDefinition(
+        id="interval_job",
+        type="espresso_job",
+        module="testing.test",
+        function="print_hello_world",
+        schedule=EspressoSchedule(kind="interval", every_seconds=3600),
+        args=[],
+        kwargs={},
+    )
+
+
+def test_heap_index_pops_only_due_jobs():
+    """Test that only jobs at or before now are returned, in deadline order."""
+    index = EspressoHeapDueIndex()
+    now = datetime(2025, 1, 1, 12, 0, 0)
+
+    index.schedule("late", now + timedelta(minutes=5))
+    index.schedule("second", now - timedelta(seconds=1))
+    index.schedule("first", now - timedelta(minutes=1))
+
+    assert index.pop_due(now) == ["first", "second"]
+    assert "late" in index
+    assert len(index) == 1
+    assert index.next_deadline() == now + timedelta(minutes=5)
+
+
+def test_heap_index_reschedule_and_discard():
+    """Test that rescheduled and discarded jobs leave no stale entries behind."""
+    index = EspressoHeapDueIndex()
+    now = datetime(2025, 1, 1, 12, 0, 0)
+
+    index.schedule("job", now - timedelta(minutes=1))
+    index.schedule("job", now + timedelta(minutes=1))
+    assert index.pop_due(now) == []
+    assert index.next_deadline() == now + timedelta(minutes=1)
+
+    index.discard("job")
+    assert index.next_deadline() is None
+    assert index.pop_due(now + timedelta(hours=1)) == []
+
+
+def test_heap_index_compacts_stale_entries():
+    """Test that repeated rescheduling does not grow the heap without bound."""
+    index = EspressoHeapDueIndex()
+    now = datetime(2025, 1, 1, 12, 0, 0)
+
+    for i in range(10_000):
+        index.schedule("job", now + timedelta(seconds=i))
+
+    assert len(index) == 1
+    assert len(index._heap) < 200
+
+
+def test_timing_wheel_never_fires_early():
+    """Test that wheel entries fire on the first tick at or after their deadline."""
+    start = datetime(2025, 1, 1, 12, 0, 0)
+    index = EspressoTimingWheelDueIndex(
+        resolution_seconds=1.0, wheel_size=8, levels=2, now=start
+    )
+
+    index.schedule("soon", start + timedelta(seconds=2.5))
+    index.schedule("far", start + timedelta(seconds=500))
+
+    assert index.pop_due(start + timedelta(seconds=2)) == []
+    assert index.pop_due(start + timedelta(seconds=3)) == ["soon"]
+    assert index.next_deadline() <= start + timedelta(seconds=500)
+    assert index.pop_due(start + timedelta(seconds=499)) == []
+    assert index.pop_due(start + timedelta(seconds=500)) == ["far"]
+    assert len(index) == 0
+
+
+def test_timing_wheel_matches_heap():
+    """Test that the wheel releases the same jobs as the heap across cascades."""
+    rng = random.Random(7)
+    start = datetime(2025, 1, 1, 12, 0, 0)
+    heap = EspressoHeapDueIndex()
+    wheel = EspressoTimingWheelDueIndex(
+        resolution_seconds=1.0, wheel_size=4, levels=3, now=start
+    )
+
+    for i in range(500):
+        when = start + timedelta(seconds=rng.randint(1, 400))
+        heap.schedule(f"job{i}", when)
+        wheel.schedule(f"job{i}", when)
+
+    for i in range(0, 500, 5):
+        heap.discard(f"job{i}")
+        wheel.discard(f"job{i}")
+
+    now = start
+    while len(heap):
+        now += timedelta(seconds=rng.randint(1, 30))
+        assert sorted(wheel.pop_due(now)) == sorted(heap.pop_due(now))
+
+        for job_id in rng.sample(range(500), 3):
+            when = now + timedelta(seconds=rng.randint(1, 100))
+            heap.schedule(f"job{job_id}", when)
+            wheel.schedule(f"job{job_id}", when)
+
+        if now > start + timedelta(hours=1):
+            break
+
+    assert sorted(wheel.pop_due(now + timedelta(hours=1))) == sorted(
+        heap.pop_due(now + timedelta(hours=1))
+    )
+    assert len(wheel) == len(heap) == 0
+
+
+def test_create_due_index_rejects_unknown_backend():
+    """Test that an unknown backend name is rejected."""
+    assert isinstance(create_due_index("timing_wheel"), EspressoTimingWheelDueIndex)
+    with pytest.raises(ValueError):
+        create_due_index("calendar_queue")
+
+
+@pytest.mark.asyncio
+async def test_pause_resume_updates_index(interval_job):
+    """Test that pausing removes a job from the index and resuming restores it."""
+    sched = EspressoScheduler([interval_job], [], num_workers=1)
+    assert "interval_job" in sched.due_index
+
+    await sched.pause_job("interval_job")
+    assert "interval_job" not in sched.due_index
+
+    await sched.resume_job("interval_job")
+    assert "interval_job" in sched.due_index
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", ["heap", "timing_wheel"])
+async def test_run_forever_reschedules_after_run(interval_job, backend):
+    """Test that a completed run puts the job back at its next deadline."""
+    sched = EspressoScheduler(
+        [interval_job], [], num_workers=1, due_index_backend=backend
+    )
+    runner = asyncio.create_task(sched.run_forever())
+
+    for _ in range(300):
+        await asyncio.sleep(0.01)
+        if sched.job_states["interval_job"].execution_count:
+            break
+
+    await sched.stop()
+    await asyncio.wait_for(runner, timeout=1)
+
+    state = sched.job_states["interval_job"]
+    assert state.execution_count == 1
+    assert sched.due_index.next_deadline() <= state.next_run_time
+    assert "interval_job" in sched.due_index
+    assert state.next_run_time > datetime.now() + timedelta(minutes=59)
+
+
+@pytest.mark.asyncio
+async def test_cron_jobs_start_at_next_fire_time(interval_job):
+    """Test that cron jobs are initialized to their next fire time, not now."""
+    cron_job = EspressoJobDefinition(
+        id="cron_job",
+        type="espresso_job",
+        module="testing.test",
+        function="print_hello_world",
+        schedule=EspressoSchedule(kind="cron", cron="0 0 1 1 *"),
+        args=[],
+        kwargs={},
+    )
+    before = datetime.now()
+    sched = EspressoScheduler([interval_job, cron_job], [], num_workers=1)
+
+    assert sched.job_states["interval_job"].next_run_time <= datetime.now()
+    cron_next = sched.job_states["cron_job"].next_run_time
+    assert cron_next > before
+    assert (cron_next.month, cron_next.day, cron_next.hour) == (1, 1, 0)
+
+
+@pytest.mark.asyncio
+async def test_input_data_makes_on_demand_job_due():
+    """Test that a reader's arrival callback indexes the input's job right away."""
+    job = EspressoJobDefinition(
+        id="on_demand_job",
+        type="espresso_job",
+        module="testing.test",
+        function="send_welcome_email",
+        schedule=EspressoSchedule(kind="on_demand"),
+        trigger=EspressoTrigger(kind="input", input_id="users"),
+    )
+    sched = EspressoScheduler(
+        [job], [EspressoListInputDefinition(id="users", type="list", items=[])]
+    )
+    now = datetime.now()
+    state = sched.job_states[job.id]
+    state.schedule_next_run(now - timedelta(seconds=1))
+    sched._reschedule(state, not_before=now + timedelta(seconds=60))
+    assert sched.due_index.pop_due(now) == []
+
+    sched._on_input_data("other")
+    assert sched.due_index.pop_due(now) == []
+
+    sched._on_input_data("users")
+    assert sched.due_index.pop_due(now) == [job.id]
@@ -0,0 +1,68 @@
+"""
+Tests for concurrent polling in EspressoInputManager.
+"""
+
+import pytest
+import asyncio
+import time
+from scheduler.input_manager import EspressoInputManager
+from scheduler.models import EspressoListInputDefinition
+
+
+def _manager(delays, poll_timeout_seconds=5.0) -> EspressoInputManager:
+    """List inputs whose adapter calls each take the given delay."""
+    manager = EspressoInputManager(
+        [
+            EspressoListInputDefinition(id=input_id, type="list", items=[input_id])
+            for input_id in delays
+        ],
+        poll_timeout_seconds=poll_timeout_seconds,
+    )
+    for input_id, adapter in manager.adapters.items():
+        delay = delays[input_id]
+        poll_batch, has_data = adapter.poll_batch, adapter.has_data
+
+        async def slow_poll_batch(batch_size, delay=delay, poll_batch=poll_batch):
+            await asyncio.sleep(delay)
+            return await poll_batch(batch_size)
+
+        async def slow_has_data(delay=delay, has_data=has_data):
+            await asyncio.sleep(delay)
+            return await has_data()
+
+        adapter.poll_batch = slow_poll_batch
+        adapter.has_data = slow_has_data
+    return manager
+
+
+@pytest.mark.asyncio
+async def test_poll_waits_for_slowest_adapter_only():
+    manager = _manager({"a": 0.2, "b": 0.2, "c": 0.2})
+
+    began = time.monotonic()
+    result = await manager.poll()
+
+    assert time.monotonic() - began < 0.4
+    assert result == {"a": ["a"], "b": ["b"], "c": ["c"]}
+
+
+@pytest.mark.asyncio
+async def test_poll_is_not_cut_off_by_deadline():
+    """Test that a slow poll is awaited, since cancelling it could lose messages."""
+    manager = _manager({"fast": 0.0, "slow": 0.3}, poll_timeout_seconds=0.1)
+
+    result = await manager.poll()
+
+    assert result == {"fast": ["fast"], "slow": ["slow"]}
+
+
+@pytest.mark.asyncio
+async def test_has_data_many():
+    manager = _manager({"a": 0.2, "b": 0.2, "stuck": 10.0}, poll_timeout_seconds=0.5)
+    await manager.poll_input("b")
+
+    began = time.monotonic()
+    result = await manager.has_data_many(["a", "b", "stuck", "missing"])
+
+    assert time.monotonic() - began < 1.0
+    assert result == {"a": True, "b": False, "stuck": False, "missing": False}
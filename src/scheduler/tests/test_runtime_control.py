@@ -225,3 +225,29 @@ async def test_execution_metrics():
     # Calculate average
     avg_time = state.total_execution_time / state.execution_count
     assert avg_time == pytest.approx(5.1, 0.01)
+
+
+@pytest.mark.asyncio
+async def test_full_queue_does_not_block_api_calls():
+    """Test that triggering into a full "block" queue holds up no API call."""
+    jobs = [
+        EspressoJobDefinition(
+            id=f"slow{i}",
+            type="espresso_job",
+            module="testing.test",
+            function="async_sleep_for",
+            schedule=EspressoSchedule(kind="interval", every_seconds=3600),
+            kwargs={"seconds": 0.5},
+        )
+        for i in range(4)
+    ]
+    sched = EspressoScheduler(jobs, [], num_workers=1, queue_size=1)
+
+    try:
+        for job in jobs:
+            assert await asyncio.wait_for(sched.trigger_job(job.id), 0.1)
+        assert len(await asyncio.wait_for(sched.list_jobs(), 0.1)) == 4
+        assert await asyncio.wait_for(sched.pause_job("slow0"), 0.1)
+        assert sched.job_states["slow3"].is_queued
+    finally:
+        sched.executor.shutdown()
@@ -0,0 +1,111 @@
+"""
+Tests for cron parsing and next run time calculation.
+"""
+
+import pytest
+import random
+from datetime import datetime, timedelta
+from scheduler.utils import (
+    _compile_cron,
+    _get_next_cron_time,
+    _get_next_cron_times,
+    _get_upcoming_cron_times,
+    _parse_cron_field,
+)
+
+
+def _brute_force_next(cron_expr: str, current_time: datetime) -> datetime:
+    """Reference implementation that checks every minute."""
+    parts = cron_expr.split()
+    minutes = _parse_cron_field(parts[0], 0, 59)
+    hours = _parse_cron_field(parts[1], 0, 23)
+    days = _parse_cron_field(parts[2], 1, 31)
+    months = _parse_cron_field(parts[3], 1, 12)
+    weekdays = [(d + 6) % 7 for d in _parse_cron_field(parts[4], 0, 6)]
+
+    next_time = current_time.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    while True:
+        if (
+            next_time.minute in minutes
+            and next_time.hour in hours
+            and next_time.day in days
+            and next_time.month in months
+            and next_time.weekday() in weekdays
+        ):
+            return next_time
+        next_time += timedelta(minutes=1)
+
+
+@pytest.mark.parametrize(
+    "cron_expr,current_time,expected",
+    [
+        ("0 9 * * *", datetime(2025, 3, 10, 8, 59, 30), datetime(2025, 3, 10, 9, 0)),
+        ("0 9 * * *", datetime(2025, 3, 10, 9, 0), datetime(2025, 3, 11, 9, 0)),
+        ("*/15 * * * *", datetime(2025, 3, 10, 9, 46), datetime(2025, 3, 10, 10, 0)),
+        ("30 23 31 12 *", datetime(2025, 6, 1), datetime(2025, 12, 31, 23, 30)),
+        ("0 0 29 2 *", datetime(2025, 3, 1), datetime(2028, 2, 29, 0, 0)),
+        # 2025-03-10 is a Monday; 1-5 is Monday to Friday
+        ("0 9 * * 1-5", datetime(2025, 3, 8, 12, 0), datetime(2025, 3, 10, 9, 0)),
+        ("0 9 * * 0", datetime(2025, 3, 10, 12, 0), datetime(2025, 3, 16, 9, 0)),
+    ],
+)
+def test_next_cron_time(cron_expr, current_time, expected):
+    assert _get_next_cron_time(cron_expr, current_time) == expected
+
+
+def test_next_cron_time_matches_minute_scan():
+    """Test the field-by-field search against a minute-by-minute scan."""
+    rng = random.Random(3)
+    expressions = [
+        "*/7 */5 * * *",
+        "0 12 1,15 * *",
+        "5-10 3 * 1,7 *",
+        "0 0 * * 6",
+        "45 18 10-20 */2 2,4",
+    ]
+    for cron_expr in expressions:
+        for _ in range(8):
+            current_time = datetime(2025, 1, 1) + timedelta(
+                minutes=rng.randint(0, 366 * 24 * 60)
+            )
+            assert _get_next_cron_time(cron_expr, current_time) == _brute_force_next(
+                cron_expr, current_time
+            )
+
+
+def test_compiled_cron_is_shared():
+    """Test that jobs using the same expression share one compiled object."""
+    assert _compile_cron("0 9 * * 1-5") is _compile_cron("0 9 * * 1-5")
+
+
+@pytest.mark.parametrize(
+    "cron_expr", ["* * * *", "60 * * * *", "0 0 31 2 *", "0 0 * 13 *"]
+)
+def test_invalid_cron_expression(cron_expr):
+    with pytest.raises(ValueError):
+        _get_next_cron_time(cron_expr, datetime(2025, 1, 1))
+
+
+def test_bulk_next_cron_times_match_single_calls():
+    """Test that the batch API agrees with one-at-a-time calculation."""
+    current_time = datetime(2025, 3, 10, 9, 46)
+    expressions = ["0 9 * * *", "*/15 * * * *", "0 9 * * *", "0 0 29 2 *"]
+
+    assert _get_next_cron_times(expressions, current_time) == [
+        _get_next_cron_time(cron_expr, current_time) for cron_expr in expressions
+    ]
+
+
+def test_upcoming_cron_times():
+    """Test that the next K fire times follow each other across day boundaries."""
+    current_time = datetime(2025, 3, 10, 22, 50)
+    expressions = ["*/20 22-23 * * *", "0 9 * * 1-5"]
+
+    upcoming = _get_upcoming_cron_times(expressions, current_time, 5)
+
+    for cron_expr, fire_times in zip(expressions, upcoming):
+        assert len(fire_times) == 5
+        previous = current_time
+        for fire_time in fire_times:
+            assert fire_time == _get_next_cron_time(cron_expr, previous)
+            previous = fire_time
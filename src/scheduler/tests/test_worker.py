@@ -0,0 +1,423 @@
+"""
+Tests for job execution in EspressoJobExecutor.
+"""
+
+import pytest
+import asyncio
+from scheduler.input_manager import EspressoInputManager
+from scheduler.process_pool import EspressoProcessPool
+from scheduler.models import (
+    EspressoJobDefinition,
+    EspressoListInputDefinition,
+    EspressoSchedule,
+    EspressoTrigger,
+    EspressoWorkerPoolDefinition,
+)
+from scheduler.runtime import EspressoJobRuntimeState
+from scheduler.worker import (
+    EspressoJobExecutor,
+    EspressoJobTimeoutError,
+    EspressoQueueFullError,
+    _picklable_items,
+)
+
+
+def _input_job(function: str, execution_mode: str = "thread") -> EspressoJobDefinition:
+    return EspressoJobDefinition(
+        id=f"{function}_job",
+        type="espresso_job",
+        module="testing.test",
+        function=function,
+        schedule=EspressoSchedule(kind="on_demand"),
+        trigger=EspressoTrigger(kind="input", input_id="users"),
+        batch_size=10,
+        args=[],
+        kwargs={},
+        execution_mode=execution_mode,
+    )
+
+
+@pytest.fixture
+def input_manager():
+    return EspressoInputManager(
+        [EspressoListInputDefinition(id="users", type="list", items=[1, 2, 3])]
+    )
+
+
+def test_picklable_items_strips_message_handles():
+    items = [{"body": b"{}", "message": object()}, {"id": "1-0"}, 42]
+
+    assert _picklable_items(items) == [{"body": b"{}"}, {"id": "1-0"}, 42]
+
+
+@pytest.mark.asyncio
+async def test_process_mode_runs_input_job(input_manager):
+    """Test that a process-mode job receives its input batch in a worker process."""
+    executor = EspressoJobExecutor(num_workers=2, num_processes=1)
+    state = EspressoJobRuntimeState(
+        definition=_input_job("send_welcome_email", execution_mode="process")
+    )
+
+    try:
+        await (await executor.submit(state, input_manager))
+    finally:
+        executor.shutdown()
+
+    assert state.last_error is None
+    assert state.retries_attempted == 0
+    assert not await input_manager.has_data("users")
+
+
+@pytest.mark.asyncio
+async def test_process_mode_propagates_job_errors(input_manager):
+    """Test that an exception raised in the worker process fails the run."""
+    executor = EspressoJobExecutor(num_workers=2, num_processes=1)
+    state = EspressoJobRuntimeState(
+        definition=_input_job("process_order", execution_mode="process")
+    )
+
+    try:
+        with pytest.raises(TypeError):
+            await (await executor.submit(state, input_manager))
+    finally:
+        executor.shutdown()
+
+    assert state.retries_attempted == 1
+    assert "TypeError" in state.last_error
+
+
+@pytest.mark.asyncio
+async def test_process_run_finishing_after_shutdown():
+    """Test that a run still in flight at shutdown completes without error."""
+    pool = EspressoProcessPool(num_processes=1)
+    await pool.start()
+
+    run = asyncio.create_task(
+        pool.run("testing.test", "sleep_for", [], {"seconds": 0.5})
+    )
+    await asyncio.sleep(0.1)
+    pool.shutdown()
+
+    assert await asyncio.wait_for(run, 10) is None
+    assert pool._workers == []
+
+
+@pytest.mark.asyncio
+async def test_subinterpreter_mode_runs_input_job(input_manager):
+    """Test that subinterpreter jobs run, falling back to a process when needed."""
+    executor = EspressoJobExecutor(num_workers=2, num_processes=1)
+    state = EspressoJobRuntimeState(
+        definition=_input_job("send_welcome_email", execution_mode="subinterpreter")
+    )
+
+    try:
+        await (await executor.submit(state, input_manager))
+    finally:
+        executor.shutdown()
+
+    assert state.last_error is None
+    assert not await input_manager.has_data("users")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "function,execution_mode",
+    [
+        ("async_sleep_for", "thread"),
+        ("sleep_for", "thread"),
+        ("sleep_for", "process"),
+    ],
+)
+async def test_timeout_fails_run_and_frees_slot(function, execution_mode):
+    """Test that a job over timeout_seconds fails and releases its worker slot."""
+    executor = EspressoJobExecutor(num_workers=1, num_processes=1)
+    input_manager = EspressoInputManager([])
+    state = EspressoJobRuntimeState(
+        definition=EspressoJobDefinition(
+            id="slow_job",
+            type="espresso_job",
+            module="testing.test",
+            function=function,
+            schedule=EspressoSchedule(kind="interval", every_seconds=60),
+            args=[],
+            kwargs={"seconds": 3},
+            timeout_seconds=1,
+            execution_mode=execution_mode,
+        )
+    )
+
+    try:
+        with pytest.raises(EspressoJobTimeoutError):
+            await asyncio.wait_for(await executor.submit(state, input_manager), 10)
+    finally:
+        executor.shutdown()
+
+    assert executor.active == 0
+    assert state.timeout_count == 1
+    assert executor.timeouts_total == 1
+    assert state.is_running is False
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("execution_mode", ["thread", "process"])
+async def test_job_raising_timeout_error_is_not_a_timeout(execution_mode):
+    """Test that a job's own TimeoutError fails the run without counting a timeout."""
+    executor = EspressoJobExecutor(num_workers=1, num_processes=1)
+    state = EspressoJobRuntimeState(
+        definition=EspressoJobDefinition(
+            id="flaky_job",
+            type="espresso_job",
+            module="testing.test",
+            function="raise_timeout",
+            schedule=EspressoSchedule(kind="interval", every_seconds=60),
+            timeout_seconds=300,
+            execution_mode=execution_mode,
+        )
+    )
+
+    pool = executor._get_process_pool()
+    await pool.start()
+    workers = list(pool._workers)
+
+    try:
+        with pytest.raises(TimeoutError) as raised:
+            await (await executor.submit(state, EspressoInputManager([])))
+        # A process worker is handed back, not killed and replaced
+        assert pool._workers == workers
+    finally:
+        executor.shutdown()
+
+    assert not isinstance(raised.value, EspressoJobTimeoutError)
+    assert "downstream service" in state.last_error
+    assert state.timeout_count == 0
+    assert executor.timeouts_total == 0
+
+
+@pytest.mark.asyncio
+async def test_timed_out_input_items_are_nacked(input_manager):
+    """Test that items held by a timed-out run are handed back to the input."""
+    executor = EspressoJobExecutor(num_workers=1)
+    job = _input_job("async_sleep_for")
+    job.timeout_seconds = 1
+    state = EspressoJobRuntimeState(definition=job)
+    nacked = []
+
+    async def nack_batch(input_id, items, requeue=True):
+        nacked.extend(items)
+
+    input_manager.nack_batch = nack_batch
+
+    try:
+        with pytest.raises(EspressoJobTimeoutError):
+            await (await executor.submit(state, input_manager))
+    finally:
+        executor.shutdown()
+
+    assert nacked == [1, 2, 3]
+
+
+def _sleep_job(job_id: str, worker_pool: str = "default") -> EspressoJobRuntimeState:
+    return EspressoJobRuntimeState(
+        definition=EspressoJobDefinition(
+            id=job_id,
+            type="espresso_job",
+            module="testing.test",
+            function="async_sleep_for",
+            schedule=EspressoSchedule(kind="interval", every_seconds=60),
+            args=[],
+            kwargs={"seconds": 0.2},
+            worker_pool=worker_pool,
+        )
+    )
+
+
+@pytest.mark.asyncio
+async def test_full_queue_rejects_runs():
+    """Test that the reject policy refuses runs once the queue is full."""
+    executor = EspressoJobExecutor(
+        num_workers=1, queue_size=1, overflow_policy="reject"
+    )
+    input_manager = EspressoInputManager([])
+
+    try:
+        running = await executor.submit(_sleep_job("running"), input_manager)
+        await asyncio.sleep(0.05)
+        queued = await executor.submit(_sleep_job("queued"), input_manager)
+
+        with pytest.raises(EspressoQueueFullError):
+            await executor.submit(_sleep_job("rejected"), input_manager)
+
+        await asyncio.gather(running, queued)
+    finally:
+        executor.shutdown()
+
+    stats = executor.queue_stats()
+    assert stats["rejected_runs"] == 1
+    assert stats["queue_depth"] == 0
+    assert stats["max_queue_wait_seconds"] > 0.1
+
+
+@pytest.mark.asyncio
+async def test_full_queue_drops_oldest_run():
+    """Test that the drop_oldest policy cancels the longest-waiting run."""
+    executor = EspressoJobExecutor(
+        num_workers=1, queue_size=1, overflow_policy="drop_oldest"
+    )
+    input_manager = EspressoInputManager([])
+    oldest_state = _sleep_job("oldest")
+
+    try:
+        running = await executor.submit(_sleep_job("running"), input_manager)
+        await asyncio.sleep(0.05)
+        oldest = await executor.submit(oldest_state, input_manager)
+        newest = await executor.submit(_sleep_job("newest"), input_manager)
+
+        await asyncio.gather(running, newest)
+    finally:
+        executor.shutdown()
+
+    assert oldest.cancelled()
+    assert oldest_state.is_queued is False
+    assert executor.queue_stats()["dropped_runs"] == 1
+
+
+@pytest.mark.asyncio
+async def test_worker_pools_isolate_jobs():
+    """Test that a saturated pool does not hold up jobs in another pool."""
+    executor = EspressoJobExecutor(
+        num_workers=1,
+        worker_pools=[EspressoWorkerPoolDefinition(id="reports", num_workers=1)],
+    )
+    input_manager = EspressoInputManager([])
+
+    try:
+        slow = [
+            await executor.submit(_sleep_job(f"slow{i}"), input_manager)
+            for i in range(3)
+        ]
+        await asyncio.sleep(0.05)
+        report = await executor.submit(_sleep_job("report", "reports"), input_manager)
+        await asyncio.sleep(0.05)
+
+        stats = executor.pool_stats()
+        assert stats["default"]["queue_depth"] == 2
+        assert stats["default"]["utilization"] == 1.0
+        assert stats["reports"]["queue_depth"] == 0
+
+        await asyncio.wait_for(report, 0.5)
+        assert not all(run.done() for run in slow)
+        await asyncio.gather(*slow)
+    finally:
+        executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_full_blocking_pool_does_not_hold_up_other_pools():
+    """Test that submitting to a full "block" pool returns at once, in order."""
+    executor = EspressoJobExecutor(
+        num_workers=1,
+        worker_pools=[
+            EspressoWorkerPoolDefinition(id="reports", num_workers=1, queue_size=1)
+        ],
+    )
+    input_manager = EspressoInputManager([])
+    reports = [_sleep_job(f"report{i}", "reports") for i in range(4)]
+    for state in reports:
+        state.definition.kwargs = {"seconds": 0.4}
+    finished = []
+
+    try:
+        held = []
+        for state in reports:
+            run = await asyncio.wait_for(executor.submit(state, input_manager), 0.1)
+            run.add_done_callback(
+                lambda _, job_id=state.definition.id: finished.append(job_id)
+            )
+            held.append(run)
+        assert not any(run.done() for run in held)
+
+        fast = await executor.submit(_sleep_job("fast"), input_manager)
+        await asyncio.wait_for(fast, 0.5)
+        assert executor.pool_stats()["reports"]["queue_depth"] == 3
+
+        await asyncio.wait_for(asyncio.gather(*held), 3)
+    finally:
+        executor.shutdown()
+
+    assert finished == [state.definition.id for state in reports]
+    assert executor.pool_stats()["reports"]["queue_depth"] == 0
+
+
+@pytest.mark.asyncio
+async def test_unknown_worker_pool_is_rejected():
+    executor = EspressoJobExecutor(num_workers=1)
+
+    with pytest.raises(ValueError):
+        await executor.submit(_sleep_job("job", "missing"), EspressoInputManager([]))
+
+
+@pytest.mark.asyncio
+async def test_pool_follows_limiter():
+    """Test that a backlogged adaptive pool adds workers up to max_workers."""
+    executor = EspressoJobExecutor(num_workers=1, min_workers=1, max_workers=3)
+    pool = executor.pools["default"]
+    pool.limiter.window_size = 1
+    input_manager = EspressoInputManager([])
+
+    try:
+        runs = [
+            await executor.submit(_sleep_job(f"job{i}"), input_manager)
+            for i in range(6)
+        ]
+        await asyncio.gather(*runs)
+    finally:
+        executor.shutdown()
+
+    assert pool.num_workers == 3
+    assert executor.queue_stats()["concurrency_limit"] == 3
+
+
+@pytest.mark.asyncio
+async def test_pool_shrinks_without_interrupting_runs():
+    executor = EspressoJobExecutor(num_workers=3)
+    pool = executor.pools["default"]
+    input_manager = EspressoInputManager([])
+
+    try:
+        runs = [
+            await executor.submit(_sleep_job(f"job{i}"), input_manager)
+            for i in range(2)
+        ]
+        await asyncio.sleep(0.05)
+        pool.resize(1)
+
+        await asyncio.gather(*runs)
+        assert len(pool._workers) == 1
+    finally:
+        executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_input_job_polls_only_its_own_input():
+    """Test that a run leaves items of other inputs in place."""
+    executor = EspressoJobExecutor(num_workers=1)
+    input_manager = EspressoInputManager(
+        [
+            EspressoListInputDefinition(id="users", type="list", items=[1, 2, 3]),
+            EspressoListInputDefinition(id="orders", type="list", items=["a", "b"]),
+        ]
+    )
+    state = EspressoJobRuntimeState(definition=_input_job("send_welcome_email"))
+
+    try:
+        await (await executor.submit(state, input_manager))
+    finally:
+        executor.shutdown()
+
+    assert not await input_manager.has_data("users")
+    assert await input_manager.poll_input("orders") == ["a", "b"]
+
+
+def test_poll_unknown_input(input_manager):
+    with pytest.raises(ValueError):
+        asyncio.run(input_manager.poll_input("missing"))
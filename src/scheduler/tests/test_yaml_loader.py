@@ -3,7 +3,7 @@ from pathlib import Path
 from datetime import datetime
 import tempfile
 import yaml
-from scheduler.yaml_loader import load_jobs_from_yaml
+from scheduler.yaml_loader import load_jobs_from_yaml, load_worker_pools_from_yaml
 from scheduler.models import (
     EspressoJobDefinition,
     EspressoInputDefinition,
@@ -331,6 +331,73 @@ class TestLoadJobsFromYaml:
         assert job.enabled is True
         assert job.trigger is None
 
+    def test_load_execution_mode(self, temp_yaml_file):
+        """Test loading the execution mode of a job."""
+        data = {
+            "jobs": [
+                {
+                    "id": "cpu_job",
+                    "type": "espresso_job",
+                    "module": "test.module",
+                    "function": "test_func",
+                    "schedule": {"kind": "interval", "every_seconds": 60},
+                    "execution_mode": "process",
+                },
+                {
+                    "id": "io_job",
+                    "type": "espresso_job",
+                    "module": "test.module",
+                    "function": "test_func",
+                    "schedule": {"kind": "interval", "every_seconds": 60},
+                },
+            ]
+        }
+        yaml.dump(data, temp_yaml_file)
+        temp_yaml_file.flush()
+
+        _, jobs = load_jobs_from_yaml(temp_yaml_file.name)
+
+        assert jobs[0].execution_mode == "process"
+        assert jobs[1].execution_mode == "thread"
+
+    def test_load_worker_pools(self, temp_yaml_file):
+        """Test loading named worker pools and assigning jobs to them."""
+        data = {
+            "worker_pools": [
+                {"id": "reports", "num_workers": 2, "overflow_policy": "reject"},
+            ],
+            "jobs": [
+                {
+                    "id": "report_job",
+                    "type": "espresso_job",
+                    "module": "test.module",
+                    "function": "test_func",
+                    "schedule": {"kind": "interval", "every_seconds": 60},
+                    "worker_pool": "reports",
+                },
+                {
+                    "id": "io_job",
+                    "type": "espresso_job",
+                    "module": "test.module",
+                    "function": "test_func",
+                    "schedule": {"kind": "interval", "every_seconds": 60},
+                },
+            ],
+        }
+        yaml.dump(data, temp_yaml_file)
+        temp_yaml_file.flush()
+
+        pools = load_worker_pools_from_yaml(temp_yaml_file.name)
+        _, jobs = load_jobs_from_yaml(temp_yaml_file.name)
+
+        assert len(pools) == 1
+        assert pools[0].id == "reports"
+        assert pools[0].num_workers == 2
+        assert pools[0].queue_size == 1000
+        assert pools[0].overflow_policy == "reject"
+        assert jobs[0].worker_pool == "reports"
+        assert jobs[1].worker_pool == "default"
+
 
 class TestIntegrationWithRealFiles:
     """Integration tests using actual job definition files."""
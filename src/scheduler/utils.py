@@ -1,5 +1,10 @@
+import calendar
 from datetime import datetime, timedelta
-from typing import List
+from functools import lru_cache
+from typing import Dict, Iterable, List
+
+# A day-of-month/weekday combination such as Feb 29 on a Monday repeats within 28 years
+_CRON_SEARCH_YEARS = 28
 
 
 def _parse_cron_field(field: str, min_val: int, max_val: int) -> List[int]:
@@ -26,31 +31,183 @@ def _parse_cron_field(field: str, min_val: int, max_val: int) -> List[int]:
     return sorted(set(values))
 
 
+def _to_bitset(values: List[int], min_val: int, max_val: int) -> int:
+    mask = 0
+    for value in values:
+        if not min_val <= value <= max_val:
+            raise ValueError(f"Cron value {value} out of range {min_val}-{max_val}")
+        mask |= 1 << value
+    return mask
+
+
+def _next_bit(mask: int, start: int) -> int:
+    """Return the lowest set bit at or above start, or -1 if there is none."""
+    shifted = mask >> start
+    if not shifted:
+        return -1
+    return start + (shifted & -shifted).bit_length() - 1
+
+
+class _CompiledCron:
+    """A cron expression parsed once into bitsets of the allowed field values."""
+
+    __slots__ = (
+        "expr",
+        "minutes",
+        "hours",
+        "days",
+        "months",
+        "weekdays",
+        "day_minutes",
+    )
+
+    def __init__(self, cron_expr: str):
+        parts = cron_expr.split()
+        if len(parts) != 5:
+            raise ValueError(f"Invalid cron expression: {cron_expr}")
+
+        self.expr = cron_expr
+        self.minutes = _to_bitset(_parse_cron_field(parts[0], 0, 59), 0, 59)
+        self.hours = _to_bitset(_parse_cron_field(parts[1], 0, 23), 0, 23)
+        self.days = _to_bitset(_parse_cron_field(parts[2], 1, 31), 1, 31)
+        self.months = _to_bitset(_parse_cron_field(parts[3], 1, 12), 1, 12)
+
+        # Cron counts weekdays from Sunday=0, datetime.weekday() from Monday=0
+        self.weekdays = _to_bitset(
+            [(d + 6) % 7 for d in _parse_cron_field(parts[4], 0, 6)], 0, 6
+        )
+
+        # Every allowed minute of a matching day, bit n being minute n after midnight
+        self.day_minutes = 0
+        for hour in range(24):
+            if self.hours >> hour & 1:
+                self.day_minutes |= self.minutes << (hour * 60)
+
+    def _day_matches(self, when: datetime) -> bool:
+        return bool(self.days >> when.day & 1 and self.weekdays >> when.weekday() & 1)
+
+    def next_after(self, current_time: datetime) -> datetime:
+        """
+        Return the first matching minute strictly after current_time.
+
+        Fields are resolved from the largest to the smallest: a month that does
+        not match jumps to the next allowed month, a day to the next day, and so
+        on, so the search never steps through individual minutes.
+        """
+        next_time = current_time.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        last_year = next_time.year + _CRON_SEARCH_YEARS
+
+        while next_time.year <= last_year:
+            if not self.months >> next_time.month & 1:
+                month = _next_bit(self.months, next_time.month + 1)
+                if month == -1:
+                    next_time = next_time.replace(
+                        year=next_time.year + 1,
+                        month=_next_bit(self.months, 1),
+                        day=1,
+                        hour=0,
+                        minute=0,
+                    )
+                else:
+                    next_time = next_time.replace(month=month, day=1, hour=0, minute=0)
+                continue
+
+            if not self._day_matches(next_time):
+                day = _next_bit(self.days, next_time.day + 1)
+                month_days = calendar.monthrange(next_time.year, next_time.month)[1]
+                if day == -1 or day > month_days:
+                    next_time = next_time.replace(
+                        day=month_days, hour=0, minute=0
+                    ) + timedelta(days=1)
+                else:
+                    next_time = next_time.replace(day=day, hour=0, minute=0)
+                continue
+
+            if not self.hours >> next_time.hour & 1:
+                hour = _next_bit(self.hours, next_time.hour + 1)
+                if hour == -1:
+                    next_time = next_time.replace(hour=0, minute=0) + timedelta(days=1)
+                else:
+                    next_time = next_time.replace(hour=hour, minute=0)
+                continue
+
+            if not self.minutes >> next_time.minute & 1:
+                minute = _next_bit(self.minutes, next_time.minute + 1)
+                if minute == -1:
+                    next_time = next_time.replace(minute=0) + timedelta(hours=1)
+                else:
+                    next_time = next_time.replace(minute=minute)
+                continue
+
+            return next_time
+
+        raise ValueError(f"Could not find next run time for cron: {self.expr}")
+
+    def upcoming(self, current_time: datetime, count: int) -> List[datetime]:
+        """
+        Return the next count fire times after current_time.
+
+        Only the first fire time of each matching day goes through next_after;
+        the rest of that day is read straight off the minute-of-day mask.
+        """
+        fire_times: List[datetime] = []
+        previous = current_time
+
+        while len(fire_times) < count:
+            first = self.next_after(previous)
+            day_start = first.replace(hour=0, minute=0)
+            offset = first.hour * 60 + first.minute
+            mask = self.day_minutes >> offset << offset
+
+            while mask and len(fire_times) < count:
+                lowest = mask & -mask
+                fire_times.append(
+                    day_start + timedelta(minutes=lowest.bit_length() - 1)
+                )
+                mask ^= lowest
+
+            previous = fire_times[-1]
+
+        return fire_times
+
+
+@lru_cache(maxsize=4096)
+def _compile_cron(cron_expr: str) -> _CompiledCron:
+    """Compile a cron expression, sharing one compiled object per expression."""
+    return _CompiledCron(cron_expr)
+
+
 def _get_next_cron_time(cron_expr: str, current_time: datetime) -> datetime:
     """Calculate next run time for a cron expression (minute hour day month weekday)."""
-    parts = cron_expr.split()
-    if len(parts) != 5:
-        raise ValueError(f"Invalid cron expression: {cron_expr}")
-
-    minutes = _parse_cron_field(parts[0], 0, 59)
-    hours = _parse_cron_field(parts[1], 0, 23)
-    days = _parse_cron_field(parts[2], 1, 31)
-    months = _parse_cron_field(parts[3], 1, 12)
-    weekdays = _parse_cron_field(parts[4], 0, 6)  # 0 = Sunday
-
-    # Start from next minute
-    next_time = current_time.replace(second=0, microsecond=0) + timedelta(minutes=1)
-
-    # Search for next valid time (max 366 days to avoid infinite loop)
-    for _ in range(366 * 24 * 60):
-        if (
-            next_time.minute in minutes
-            and next_time.hour in hours
-            and next_time.day in days
-            and next_time.month in months
-            and next_time.weekday() in [(d + 1) % 7 for d in weekdays]
-        ):  # Convert Sun=0 to Mon=0
-            return next_time
-        next_time += timedelta(minutes=1)
+    return _compile_cron(cron_expr).next_after(current_time)
+
+
+def _get_next_cron_times(
+    cron_exprs: Iterable[str], current_time: datetime
+) -> List[datetime]:
+    """
+    Calculate next run times for many cron expressions at once.
+
+    Each distinct expression is compiled and resolved once, and the result is
+    shared by every job that uses it.
+    """
+    resolved: Dict[str, datetime] = {}
+    next_times = []
+    for cron_expr in cron_exprs:
+        if cron_expr not in resolved:
+            resolved[cron_expr] = _compile_cron(cron_expr).next_after(current_time)
+        next_times.append(resolved[cron_expr])
+    return next_times
+
 
-    raise ValueError(f"Could not find next run time for cron: {cron_expr}")
+def _get_upcoming_cron_times(
+    cron_exprs: Iterable[str], current_time: datetime, count: int
+) -> List[List[datetime]]:
+    """Calculate the next count run times for each of many cron expressions."""
+    resolved: Dict[str, List[datetime]] = {}
+    upcoming = []
+    for cron_expr in cron_exprs:
+        if cron_expr not in resolved:
+            resolved[cron_expr] = _compile_cron(cron_expr).upcoming(current_time, count)
+        upcoming.append(list(resolved[cron_expr]))
+    return upcoming
@@ -2,10 +2,39 @@ import logging
 import importlib
 import traceback
 import asyncio
+import functools
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Callable
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+from .models import (
+    DEFAULT_POOL,
+    EspressoJobDefinition,
+    EspressoWorkerPoolDefinition,
+    OverflowPolicy,
+)
 from .runtime import EspressoJobRuntimeState
 from .input_manager import EspressoInputManager
+from .process_pool import (
+    EspressoDeadlineExceeded,
+    EspressoProcessPool,
+    wait_for_deadline,
+)
+from .interpreter_pool import EspressoInterpreterPool, SUBINTERPRETERS_AVAILABLE
+from .concurrency import EspressoAdaptiveLimiter
 
 logger = logging.getLogger(__name__)
 
@@ -16,78 +45,488 @@ def resolve_callable(module_name: str, function_name: str) -> Callable:
     return func
 
 
-class EspressoJobExecutor:
-    def __init__(self, num_workers: int = 5):
+class EspressoJobTimeoutError(TimeoutError):
+    """Raised when a job runs longer than its timeout_seconds."""
+
+
+class EspressoQueueFullError(Exception):
+    """Raised when a run is submitted to a full queue under the "reject" policy."""
+
+
+@dataclass
+class _QueuedRun:
+    job_state: EspressoJobRuntimeState
+    input_manager: EspressoInputManager
+    future: asyncio.Future
+    enqueued_at: float
+
+
+def _picklable_items(items: List[Any]) -> List[Any]:
+    """Strip live broker message handles, which cannot cross a process boundary."""
+    return [
+        {k: v for k, v in item.items() if k != "message"}
+        if isinstance(item, dict) and "message" in item
+        else item
+        for item in items
+    ]
+
+
+class EspressoWorkerPool:
+    """
+    A named bulkhead: its own workers, run queue and thread pool.
+
+    Jobs assigned to one pool cannot occupy the workers of another, so a slow
+    input-driven job cannot hold up latency-sensitive jobs in a different pool.
+    With a limiter, the number of workers follows its limit at runtime.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        num_workers: int,
+        execute: Callable[
+            [EspressoJobRuntimeState, EspressoInputManager, "EspressoWorkerPool"],
+            Awaitable[bool],
+        ],
+        queue_size: int = 1000,
+        overflow_policy: OverflowPolicy = "block",
+        thread_pool: Optional[ThreadPoolExecutor] = None,
+        limiter: Optional[EspressoAdaptiveLimiter] = None,
+    ):
+        self.name = name
         self.num_workers = num_workers
-        self.semaphore = asyncio.Semaphore(num_workers)
+        self.queue_size = queue_size
+        self.overflow_policy = overflow_policy
+        # None runs sync jobs on the event loop's default executor
+        self.thread_pool = thread_pool
+        self.limiter = limiter
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        # Runs held back by the "block" policy until the queue has room
+        self._deferred: Deque[_QueuedRun] = deque()
+        self._execute = execute
+        self._workers: List[asyncio.Task] = []
+        self._idle: Set[asyncio.Task] = set()
+        self.active = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+        self.dequeued_total = 0
+        self.dropped_total = 0
+        self.rejected_total = 0
+
+    def _ensure_workers(self) -> None:
+        if not self._workers:
+            self._workers = [
+                asyncio.create_task(self._worker_loop())
+                for _ in range(self.num_workers)
+            ]
+
+    def resize(self, num_workers: int) -> None:
+        """
+        Change the number of workers.
+
+        Idle workers are stopped right away; busy ones finish their current run
+        first, so shrinking never interrupts a job.
+        """
+        self.num_workers = num_workers
+        if not self._workers:
+            return
+
+        for worker in list(self._idle):
+            if len(self._workers) <= num_workers:
+                break
+            worker.cancel()
+            self._idle.discard(worker)
+            self._workers.remove(worker)
+
+        while len(self._workers) < num_workers:
+            self._workers.append(asyncio.create_task(self._worker_loop()))
 
     async def submit(
         self, job_state: EspressoJobRuntimeState, input_manager: EspressoInputManager
-    ):
-        async def _run():
-            async with self.semaphore:
-                task_id = id(asyncio.current_task())
-                job = job_state.definition
+    ) -> asyncio.Future:
+        """
+        Queue a job run and return a future that completes when the run does.
 
-                items = []
-                input_id = None
+        When the queue is full the overflow policy applies: "block" holds the run
+        back until there is space, "drop_oldest" cancels the longest-waiting run
+        to make room, and "reject" raises EspressoQueueFullError. Submitting
+        never waits, so a full pool cannot stall dispatch to the others.
+        """
+        self._ensure_workers()
 
-                try:
-                    job_state.is_running = True
-                    job_state.last_run_time = datetime.now()
-                    trigger = job.trigger
-
-                    func = resolve_callable(job.module, job.function)
-
-                    # Handle trigger based jobs
-                    if trigger:
-                        if trigger.kind == "input":
-                            input_id = trigger.input_id
-                            if not input_id:
-                                raise ValueError(
-                                    f"Input trigger for job {job.id} missing input_id"
-                                )
-
-                            batch_size = getattr(job, "batch_size", 10)
-                            result = await input_manager.poll(batch_size=batch_size)
-                            items = result.get(input_id, [])
-
-                            if asyncio.iscoroutinefunction(func):
-                                await func(items, *job.args, **job.kwargs)
-                            else:
-                                await asyncio.to_thread(
-                                    func, items, *job.args, **job.kwargs
-                                )  # Run sync function in thread pool
-
-                            # Acknowledge messages after successful processing
-                            await input_manager.ack_batch(input_id, items)
-
-                    # Handle normal scheduled jobs
-                    else:
-                        if asyncio.iscoroutinefunction(func):
-                            await func(*job.args, **job.kwargs)
-                        else:
-                            await asyncio.to_thread(func, *job.args, **job.kwargs)
+        future = asyncio.get_running_loop().create_future()
+        run = _QueuedRun(job_state, input_manager, future, time.monotonic())
+
+        if self.queue.full() or self._deferred:
+            if self.overflow_policy == "reject":
+                self.rejected_total += 1
+                raise EspressoQueueFullError(
+                    f"Job queue of pool '{self.name}' is full "
+                    f"({self.queue_size} pending runs), "
+                    f"rejected job {job_state.definition.id}"
+                )
+            elif self.overflow_policy == "block":
+                job_state.is_queued = True
+                self._deferred.append(run)
+                return future
+            elif self.overflow_policy == "drop_oldest":
+                oldest = self.queue.get_nowait()
+                self.queue.task_done()
+                oldest.job_state.is_queued = False
+                oldest.future.cancel()
+                self.dropped_total += 1
+                logger.warning(
+                    f"Job queue of pool '{self.name}' is full, dropped queued run "
+                    f"of job {oldest.job_state.definition.id}"
+                )
+
+        job_state.is_queued = True
+        self.queue.put_nowait(run)
+        return future
 
-                    job_state.retries_attempted = 0
-                    job_state.last_error = None
+    def _admit_deferred(self) -> None:
+        """Move held-back runs into the queue, oldest first, while it has room."""
+        while self._deferred and not self.queue.full():
+            self.queue.put_nowait(self._deferred.popleft())
 
-                    logger.info(f"[Task {task_id}] Successfully executed job {job.id}")
+    async def _worker_loop(self):
+        worker = asyncio.current_task()
+        while len(self._workers) <= self.num_workers:
+            self._idle.add(worker)
+            try:
+                run = await self.queue.get()
+            finally:
+                self._idle.discard(worker)
+            self._admit_deferred()
+            try:
+                if run.future.cancelled():
+                    continue
 
-                except Exception:
-                    # Negative-acknowledge messages on failure (requeue them)
-                    if input_id and items:
-                        await input_manager.nack_batch(input_id, items, requeue=True)
+                run.job_state.is_queued = False
+                wait = time.monotonic() - run.enqueued_at
+                self.queue_wait_total += wait
+                self.queue_wait_max = max(self.queue_wait_max, wait)
+                self.dequeued_total += 1
 
-                    job_state.retries_attempted += 1
-                    job_state.last_error = traceback.format_exc()
-                    logger.error(
-                        f"[Task {task_id}] Error executing job {job.id}: {job_state.last_error}"
+                self.active += 1
+                started = time.monotonic()
+                backlogged = False
+                try:
+                    backlogged = await self._execute(
+                        run.job_state, run.input_manager, self
                     )
+                except asyncio.CancelledError:
+                    run.future.cancel()
                     raise
-
+                except Exception as e:
+                    self._record(time.monotonic() - started, True, backlogged)
+                    if not run.future.done():
+                        run.future.set_exception(e)
+                else:
+                    self._record(time.monotonic() - started, False, backlogged)
+                    if not run.future.done():
+                        run.future.set_result(None)
                 finally:
-                    job_state.is_running = False
-                    job_state.schedule_next_run(datetime.now())
+                    self.active -= 1
+            finally:
+                self.queue.task_done()
+
+        # The pool shrank while this worker was busy
+        self._workers.remove(worker)
+
+    def _record(self, latency: float, failed: bool, backlogged: bool) -> None:
+        """Feed a finished run to the limiter and follow its new limit."""
+        if self.limiter is None:
+            return
+
+        limit = self.limiter.record(
+            latency, failed, backlogged or not self.queue.empty()
+        )
+        if limit != self.num_workers:
+            self.resize(limit)
+
+    @property
+    def queued(self) -> int:
+        """Runs waiting for a worker, including those held back by "block"."""
+        return self.queue.qsize() + len(self._deferred)
+
+    def queue_stats(self) -> Dict[str, Any]:
+        """Queue depth and wait times, for sizing num_workers."""
+        return {
+            "num_workers": self.num_workers,
+            "adaptive": self.limiter is not None,
+            "utilization": self.active / self.num_workers if self.num_workers else 0.0,
+            "queue_depth": self.queued,
+            "queue_capacity": self.queue_size,
+            "active_runs": self.active,
+            "avg_queue_wait_seconds": (
+                self.queue_wait_total / self.dequeued_total
+                if self.dequeued_total
+                else 0.0
+            ),
+            "max_queue_wait_seconds": self.queue_wait_max,
+            "dropped_runs": self.dropped_total,
+            "rejected_runs": self.rejected_total,
+        }
+
+    def shutdown(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        self._workers = []
+
+        while not self.queue.empty():
+            run = self.queue.get_nowait()
+            run.job_state.is_queued = False
+            run.future.cancel()
+            self.queue.task_done()
+        while self._deferred:
+            run = self._deferred.popleft()
+            run.job_state.is_queued = False
+            run.future.cancel()
+
+        if self.thread_pool is not None:
+            self.thread_pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _limiter(
+    num_workers: int, min_workers: Optional[int], max_workers: Optional[int]
+) -> Optional[EspressoAdaptiveLimiter]:
+    """An adaptive limiter when either bound is configured, otherwise None."""
+    if min_workers is None and max_workers is None:
+        return None
+    return EspressoAdaptiveLimiter(
+        min_limit=min_workers or 1,
+        max_limit=max_workers or num_workers,
+        initial_limit=num_workers,
+    )
+
+
+class EspressoJobExecutor:
+    def __init__(
+        self,
+        num_workers: int = 5,
+        num_processes: Optional[int] = None,
+        process_preload: Iterable[Tuple[str, str]] = (),
+        queue_size: int = 1000,
+        overflow_policy: OverflowPolicy = "block",
+        worker_pools: Iterable[EspressoWorkerPoolDefinition] = (),
+        min_workers: Optional[int] = None,
+        max_workers: Optional[int] = None,
+    ):
+        self.num_workers = num_workers
+        limiter = _limiter(num_workers, min_workers, max_workers)
+        self.pools: Dict[str, EspressoWorkerPool] = {
+            DEFAULT_POOL: EspressoWorkerPool(
+                DEFAULT_POOL,
+                limiter.limit if limiter else num_workers,
+                self._execute,
+                queue_size=queue_size,
+                overflow_policy=overflow_policy,
+                limiter=limiter,
+            )
+        }
+        for pool_def in worker_pools:
+            if pool_def.id in self.pools:
+                raise ValueError(f"Duplicate worker pool: {pool_def.id}")
+            limiter = _limiter(
+                pool_def.num_workers, pool_def.min_workers, pool_def.max_workers
+            )
+            self.pools[pool_def.id] = EspressoWorkerPool(
+                pool_def.id,
+                limiter.limit if limiter else pool_def.num_workers,
+                self._execute,
+                queue_size=pool_def.queue_size,
+                overflow_policy=pool_def.overflow_policy,
+                thread_pool=ThreadPoolExecutor(
+                    max_workers=limiter.max_limit if limiter else pool_def.num_workers,
+                    thread_name_prefix=f"espresso-{pool_def.id}",
+                ),
+                limiter=limiter,
+            )
+        self.num_processes = num_processes or num_workers
+        self.process_preload = tuple(process_preload)
+        self.process_pool: Optional[EspressoProcessPool] = None
+        self.interpreter_pool: Optional[EspressoInterpreterPool] = None
+        self.timeouts_total = 0
+
+    def _get_process_pool(self) -> EspressoProcessPool:
+        if self.process_pool is None:
+            self.process_pool = EspressoProcessPool(
+                self.num_processes, preload=self.process_preload
+            )
+        return self.process_pool
+
+    def _get_interpreter_pool(self) -> Optional[EspressoInterpreterPool]:
+        if self.interpreter_pool is None and SUBINTERPRETERS_AVAILABLE:
+            self.interpreter_pool = EspressoInterpreterPool(
+                self.num_processes, preload=self.process_preload
+            )
+        return self.interpreter_pool
+
+    async def _call(
+        self, job: EspressoJobDefinition, pool: EspressoWorkerPool, *args: Any
+    ) -> None:
+        """Run the job function with the backend selected by its execution mode."""
+        try:
+            await self._call_with_timeout(job, pool, *args)
+        except EspressoDeadlineExceeded as e:
+            raise EspressoJobTimeoutError(
+                f"Job {job.id} exceeded timeout of {job.timeout_seconds}s"
+            ) from e
+
+    async def _call_with_timeout(
+        self, job: EspressoJobDefinition, pool: EspressoWorkerPool, *args: Any
+    ) -> None:
+        job_args = [*args, *(job.args or [])]
+        job_kwargs = job.kwargs or {}
+        timeout = job.timeout_seconds if job.timeout_seconds else None
+
+        if job.execution_mode == "subinterpreter":
+            interpreters = self._get_interpreter_pool()
+            if interpreters and await interpreters.supports(job.module, job.function):
+                # A running interpreter cannot be interrupted; the slot is freed anyway
+                await wait_for_deadline(
+                    interpreters.run(job.module, job.function, job_args, job_kwargs),
+                    timeout,
+                )
+                return
+            logger.debug(f"Job {job.id} cannot use a subinterpreter, using a process")
+
+        if job.execution_mode in ("process", "subinterpreter"):
+            await self._get_process_pool().run(
+                job.module, job.function, job_args, job_kwargs, timeout=timeout
+            )
+            return
+
+        func = resolve_callable(job.module, job.function)
+        if asyncio.iscoroutinefunction(func):
+            await wait_for_deadline(func(*job_args, **job_kwargs), timeout)
+        else:
+            # Run sync function in thread pool. A timed-out thread cannot be
+            # killed, but the worker slot is released and the run fails.
+            if pool.thread_pool is None:
+                call = asyncio.to_thread(func, *job_args, **job_kwargs)
+            else:
+                call = asyncio.get_running_loop().run_in_executor(
+                    pool.thread_pool, functools.partial(func, *job_args, **job_kwargs)
+                )
+            await wait_for_deadline(call, timeout)
+
+    @property
+    def active(self) -> int:
+        return sum(pool.active for pool in self.pools.values())
+
+    async def submit(
+        self, job_state: EspressoJobRuntimeState, input_manager: EspressoInputManager
+    ) -> asyncio.Future:
+        """Queue a job run on the worker pool the job is assigned to."""
+        pool_name = job_state.definition.worker_pool
+        pool = self.pools.get(pool_name)
+        if pool is None:
+            raise ValueError(
+                f"Job {job_state.definition.id} assigned to unknown pool '{pool_name}'"
+            )
+        return await pool.submit(job_state, input_manager)
+
+    def queue_stats(self) -> Dict[str, Any]:
+        """Queue depth and wait times summed over every pool."""
+        pools = self.pools.values()
+        dequeued = sum(pool.dequeued_total for pool in pools)
+        return {
+            "concurrency_limit": sum(pool.num_workers for pool in pools),
+            "queue_depth": sum(pool.queued for pool in pools),
+            "queue_capacity": sum(pool.queue_size for pool in pools),
+            "active_runs": self.active,
+            "avg_queue_wait_seconds": (
+                sum(pool.queue_wait_total for pool in pools) / dequeued
+                if dequeued
+                else 0.0
+            ),
+            "max_queue_wait_seconds": max(pool.queue_wait_max for pool in pools),
+            "dropped_runs": sum(pool.dropped_total for pool in pools),
+            "rejected_runs": sum(pool.rejected_total for pool in pools),
+        }
+
+    def pool_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Utilization and queue metrics of each worker pool."""
+        return {name: pool.queue_stats() for name, pool in self.pools.items()}
+
+    def shutdown(self) -> None:
+        for pool in self.pools.values():
+            pool.shutdown()
+
+        if self.process_pool is not None:
+            self.process_pool.shutdown()
+            self.process_pool = None
+        if self.interpreter_pool is not None:
+            self.interpreter_pool.shutdown()
+            self.interpreter_pool = None
+
+    async def _execute(
+        self,
+        job_state: EspressoJobRuntimeState,
+        input_manager: EspressoInputManager,
+        pool: EspressoWorkerPool,
+    ) -> bool:
+        task_id = id(asyncio.current_task())
+        job = job_state.definition
+
+        items = []
+        input_id = None
+
+        try:
+            job_state.is_running = True
+            job_state.last_run_time = datetime.now()
+            trigger = job.trigger
+
+            # Handle trigger based jobs
+            if trigger:
+                if trigger.kind == "input":
+                    input_id = trigger.input_id
+                    if not input_id:
+                        raise ValueError(
+                            f"Input trigger for job {job.id} missing input_id"
+                        )
+
+                    batch_size = getattr(job, "batch_size", 10)
+                    items = await input_manager.poll_input(input_id, batch_size)
+
+                    if job.execution_mode != "thread":
+                        await self._call(job, pool, _picklable_items(items))
+                    else:
+                        await self._call(job, pool, items)
+
+                    # Acknowledge messages after successful processing
+                    await input_manager.ack_batch(input_id, items)
+
+            # Handle normal scheduled jobs
+            else:
+                await self._call(job, pool)
+
+            job_state.retries_attempted = 0
+            job_state.last_error = None
+
+            logger.info(f"[Task {task_id}] Successfully executed job {job.id}")
+
+            # A full batch means the input likely has more items waiting
+            return input_id is not None and len(items) >= batch_size
+
+        except Exception as e:
+            # Negative-acknowledge messages on failure (requeue them)
+            if input_id and items:
+                await input_manager.nack_batch(input_id, items, requeue=True)
+
+            if isinstance(e, EspressoJobTimeoutError):
+                job_state.timeout_count += 1
+                self.timeouts_total += 1
+
+            job_state.retries_attempted += 1
+            job_state.last_error = traceback.format_exc()
+            logger.error(
+                f"[Task {task_id}] Error executing job {job.id}: {job_state.last_error}"
+            )
+            raise
 
-        return asyncio.create_task(_run())
+        finally:
+            job_state.is_running = False
+            job_state.schedule_next_run(datetime.now())
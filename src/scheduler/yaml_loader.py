@@ -10,6 +10,8 @@ from .models import (
     EspressoListInputDefinition,
     EspressoRabbitMQInputDefinition,
     EspressoRedisStreamsInputDefinition,
+    EspressoWorkerPoolDefinition,
+    DEFAULT_POOL,
 )
 
 
@@ -35,6 +37,8 @@ def load_jobs_from_yaml(path: str | Path):
                     url=raw_input.get("url"),
                     queue=raw_input.get("queue"),
                     prefetch_count=raw_input.get("prefetch_count", 10),
+                    consume_mode=raw_input.get("consume_mode", "get"),
+                    status_ttl_seconds=raw_input.get("status_ttl_seconds", 1.0),
                 )
             elif raw_input["type"] == "redis_streams":
                 input_def = EspressoRedisStreamsInputDefinition(
@@ -48,6 +52,21 @@ def load_jobs_from_yaml(path: str | Path):
                     consumer_group=raw_input.get("consumer_group", "espresso_group"),
                     consumer_name=raw_input.get("consumer_name", "worker_1"),
                     start_id=raw_input.get("start_id", "0"),
+                    health_check_interval=raw_input.get("health_check_interval", 30),
+                    long_poll=raw_input.get("long_poll", False),
+                    block_ms=raw_input.get("block_ms", 5000),
+                    buffer_size=raw_input.get("buffer_size", 100),
+                    claim_min_idle_ms=raw_input.get("claim_min_idle_ms", 600_000),
+                    claim_interval_seconds=raw_input.get(
+                        "claim_interval_seconds", 30.0
+                    ),
+                    claim_count=raw_input.get("claim_count", 100),
+                    retention=raw_input.get("retention", "none"),
+                    retention_maxlen=raw_input.get("retention_maxlen", 100_000),
+                    retention_age_seconds=raw_input.get(
+                        "retention_age_seconds", 86_400.0
+                    ),
+                    trim_interval_seconds=raw_input.get("trim_interval_seconds", 60.0),
                 )
             else:
                 input_def = EspressoInputDefinition(
@@ -91,8 +110,33 @@ def load_jobs_from_yaml(path: str | Path):
                 retry_delay_seconds=raw_job.get("retry_delay_seconds", 60),
                 timeout_seconds=raw_job.get("timeout_seconds", 300),
                 enabled=raw_job.get("enabled", True),
+                execution_mode=raw_job.get("execution_mode", "thread"),
+                worker_pool=raw_job.get("worker_pool", DEFAULT_POOL),
             )
 
             jobs.append(job)
 
         return inputs, jobs
+
+
+def load_worker_pools_from_yaml(path: str | Path) -> List[EspressoWorkerPoolDefinition]:
+    path = Path(path)
+
+    with path.open("r") as file:
+        data = yaml.safe_load(file) or {}
+
+        pools = []
+
+        for raw_pool in data.get("worker_pools", []):
+            pools.append(
+                EspressoWorkerPoolDefinition(
+                    id=raw_pool["id"],
+                    num_workers=raw_pool["num_workers"],
+                    queue_size=raw_pool.get("queue_size", 1000),
+                    overflow_policy=raw_pool.get("overflow_policy", "block"),
+                    min_workers=raw_pool.get("min_workers"),
+                    max_workers=raw_pool.get("max_workers"),
+                )
+            )
+
+        return pools
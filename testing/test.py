@@ -1,5 +1,8 @@
 from typing import List
+import asyncio
 import json
+import socket
+import time
 
 
 def print_hello_world():
@@ -43,3 +46,30 @@ def process_notification(notifications: List[dict]):
         print(f"  Type: {notification_type}")
         print(f"  User: {user_id}")
         print(f"  Message: {message}")
+
+
+def count_primes(limit: int) -> int:
+    """CPU-bound job: count primes below limit by trial division."""
+    count = 0
+    for n in range(2, limit):
+        for d in range(2, int(n**0.5) + 1):
+            if n % d == 0:
+                break
+        else:
+            count += 1
+    return count
+
+
+def sleep_for(*items, seconds: float = 3):
+    """Sync job that blocks its thread, for exercising timeouts."""
+    time.sleep(seconds)
+
+
+async def async_sleep_for(*items, seconds: float = 3):
+    """Async job that never yields a result in time, for exercising timeouts."""
+    await asyncio.sleep(seconds)
+
+
+def raise_timeout(*items):
+    """Job that fails with a timeout of its own, not the scheduler's."""
+    raise socket.timeout("timed out talking to a downstream service")